@@ -4,6 +4,7 @@ from typing import List
 
 from autogen_core import (
     AgentId,
+    CancellationToken,
     FunctionCall,
     MessageContext,
     RoutedAgent,
@@ -23,7 +24,11 @@ from autogen_core.models import (
 from autogen_core.tools import Tool
 from messaging.messaging_protocols import AgentTask, UserTask, BroadCastMessage, AgentResponse
 from reflection.base_reflection import BaseReflection
-from tools.communication_tools import set_communication_tools
+from tools.communication_tools import (
+    DEFAULT_DELEGATION_TIMEOUT,
+    dispatch_delegation_tasks,
+    set_communication_tools,
+)
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 from utils.logger import get_logger
@@ -43,6 +48,7 @@ class BaseThinkingAgent(RoutedAgent):
         broadcast_topic: str = None,
         tools: List[Tool] = [],
         communication_tools: List[Tool] = [],
+        delegation_timeout: float = DEFAULT_DELEGATION_TIMEOUT,
     ):
 
         super().__init__(description)
@@ -55,6 +61,7 @@ class BaseThinkingAgent(RoutedAgent):
             else None
         )
         self._communication_tools = communication_tools
+        self._delegation_timeout = delegation_timeout
         self._agent_topics = agent_topics
         self._broadcast_topic = broadcast_topic
         self._chat_history: List[LLMMessage] = []
@@ -142,7 +149,7 @@ class BaseThinkingAgent(RoutedAgent):
             await self.handle_response(llm_result, ctx)
 
     @message_handler
-    async def handle_agent_task(self, message: AgentTask, ctx: MessageContext) -> None:
+    async def handle_agent_task(self, message: AgentTask, ctx: MessageContext) -> AgentResponse:
         """
         Handles AgentTask message.
 
@@ -157,7 +164,8 @@ class BaseThinkingAgent(RoutedAgent):
             ctx: The message context.
 
         Returns:
-            None
+            AgentResponse: The final answer; when the task was sent directly (a
+            delegation), it is returned to the sender instead of published.
         """
         # add message to chat history
         if self._chat_history and self._chat_history[-1].type == "UserMessage":
@@ -193,11 +201,12 @@ class BaseThinkingAgent(RoutedAgent):
         ):
             self._tool_result = []
             self._delegate_tool_result = []
-            await self.handle_function_calls(llm_result, ctx)
+            return await self.handle_function_calls(llm_result, ctx)
+        return await self.handle_response(llm_result, ctx)
 
     async def handle_function_calls(
         self, llm_result: CreateResult, ctx: MessageContext
-    ) -> None:
+    ) -> AgentResponse:
         """
         Process a list of function calls returned by the LLM and execute them using
         the appropriate tools or delegate tools.
@@ -214,7 +223,7 @@ class BaseThinkingAgent(RoutedAgent):
                 managing task cancellation.
 
         Returns:
-            None
+            AgentResponse: The final answer, once the LLM stops calling tools.
         """
 
         # add message to chat history
@@ -254,6 +263,17 @@ class BaseThinkingAgent(RoutedAgent):
                             is_error=True,
                         )
                     )
+            elif call.name == "delegate_tasks" and call.name in self._communication_tools:
+                # all target agents work concurrently, each under its own deadline
+                logger.info("Delegating tasks")
+                tool_results.append(
+                    await dispatch_delegation_tasks(
+                        arguments.get("delegation_tasks", []),
+                        self._send_agent_task,
+                        call.id,
+                        self._delegation_timeout,
+                    )
+                )
             elif call.name in self._communication_tools:
                 try:
                     tool_result = await self._communication_tools[call.name].run_json(
@@ -339,25 +359,42 @@ class BaseThinkingAgent(RoutedAgent):
         if isinstance(llm_result.content, list) and all(
             isinstance(m, FunctionCall) for m in llm_result.content
         ):
-            await self.handle_function_calls(llm_result, ctx)
+            return await self.handle_function_calls(llm_result, ctx)
 
         # if LLM response is not a list of function calls, and no agent delegation
         # is required send it back to sender
         else:
-            await self.handle_response(llm_result, ctx)
+            return await self.handle_response(llm_result, ctx)
 
     async def handle_response(
         self, llm_result: CreateResult, ctx: MessageContext
-    ) -> None:
+    ) -> AgentResponse:
         self._chat_history.append(AssistantMessage(content=llm_result.content, source=self.id.type))
-        await self.publish_message(
-            AgentResponse(
-                sender_topic_type=self.id.type,
-                context=[
-                    AssistantMessage(
-                        content=llm_result.content, source=self.id.type
-                    )
-                ],
-            ),
-            topic_id=TopicId(self._sender_agent_topic, source=self.id.key),
-        )
\ No newline at end of file
+        response = AgentResponse(
+            sender_topic_type=self.id.type,
+            context=[
+                AssistantMessage(
+                    content=llm_result.content, source=self.id.type
+                )
+            ],
+        )
+        # a delegating agent awaits the answer directly
+        if not ctx.is_rpc:
+            await self.publish_message(
+                response,
+                topic_id=TopicId(self._sender_agent_topic, source=self.id.key),
+            )
+        return response
+
+    async def _send_agent_task(
+        self, agent: str, messages: List[LLMMessage], cancellation_token: CancellationToken
+    ) -> str:
+        """Send a delegated task to another agent and wait for its answer."""
+        response = await self.send_message(
+            AgentTask(sender_topic_type=self.id.type, context=messages),
+            AgentId(agent, self.id.key),
+            cancellation_token=cancellation_token,
+        )
+        if isinstance(response, AgentResponse) and response.context:
+            return response.context[-1].content
+        return str(response)
\ No newline at end of file
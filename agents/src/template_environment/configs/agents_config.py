@@ -1,5 +1,9 @@
 from models.model import model
-from tools import web_tools, arxiv_tools, note_tool
+from configs import tools_config
+from tools import (
+    web_tools, arxiv_tools, arxiv_index, note_tool, search_cache, page_cache, paper_store, passage_index, http_client,
+    dedup_index, note_store, source_registry,
+)
 
 user_cfgs = [
     {
@@ -12,11 +16,51 @@ user_cfgs = [
     }
 ]
 
-duck_api = web_tools.DuckDuckGoAPI()
-web_search_tools = web_tools.WebSearchTool(duck_api).get_tools()
-api = arxiv_tools.ArxivAPI()
-arxiv_search_tools = arxiv_tools.ArxivSearchTool(api).get_tools()
-note_tools = note_tool.NoteTool().get_tools()
+http_client.set_http_client(http_client.HttpClient(**tools_config.http_client_cfg))
+
+shared_search_cache = search_cache.SearchCache(**tools_config.search_cache_cfg)
+shared_page_cache = page_cache.PageCache(**tools_config.page_cache_cfg)
+shared_paper_store = paper_store.PaperStore(**tools_config.paper_store_cfg)
+shared_arxiv_index = arxiv_index.ArxivMetadataIndex(**tools_config.arxiv_index_cfg)
+shared_note_store = note_store.NoteStore(**tools_config.note_store_cfg)
+
+duck_api = web_tools.DuckDuckGoAPI(
+    cache=shared_search_cache,
+    page_cache=shared_page_cache,
+    **tools_config.web_fetch_cfg,
+)
+passage_reranker = (
+    passage_index.EmbeddingReranker(**tools_config.passage_rerank_cfg)
+    if tools_config.passage_rerank_cfg["endpoint"]
+    else None
+)
+
+# documents opened this session, shared so web and arXiv tools see each other's reads
+session_dedup_index = dedup_index.DedupIndex()
+# citation ids ([S12]) of the sources the tools surfaced, cited by notes and the answer
+notes_session = tools_config.note_tool_cfg["session"] or note_store.new_session_id()
+session_sources = source_registry.SourceRegistry(**tools_config.source_registry_cfg, session=notes_session)
+
+web_search_tools = web_tools.WebSearchTool(
+    duck_api,
+    dedup_index=session_dedup_index,
+    source_registry=session_sources,
+    reranker=passage_reranker,
+    **tools_config.web_tool_cfg,
+).get_tools()
+api = arxiv_tools.ArxivAPI(cache=shared_search_cache, index=shared_arxiv_index)
+arxiv_search_tools = arxiv_tools.ArxivSearchTool(
+    api,
+    dedup_index=session_dedup_index,
+    source_registry=session_sources,
+    paper_store=shared_paper_store,
+    reranker=passage_reranker,
+    **tools_config.arxiv_tool_cfg,
+).get_tools()
+session_notes = note_tool.NoteTool(
+    store=shared_note_store, session=notes_session, embedder=passage_reranker, source_registry=session_sources
+)
+note_tools = session_notes.get_tools()
 
 autonomous_agents_cfgs = [
     {
@@ -26,7 +70,7 @@ autonomous_agents_cfgs = [
 You will be provided with user queries and you will answer them using a combination of tools and techniques to retrieve relevant information from the internet.
 Use the available tools to answer user queries.
 
-Make sure that your answers are well researched and well supported by relevant sources (quote the sources/links in your answer). Do make use of more than one source for your research.
+Make sure that your answers are well researched and well supported by relevant sources (cite them in your answer). Do make use of more than one source for your research.
 The research should focus more on a variety of information about the query, like a survey paper (unless the user specifically asks for specific information about a topic).
 A good research result should consist of information from more web pages/papers than just one webpage/research paper.
 
@@ -37,18 +81,20 @@ Use the note tools to help you note down the important findings during your sear
 A good research answer should contain:
 - A clear and concise summary of the topic
 - A list of key findings from the research
-- A list of sources that were used in the research
+- A list of sources that were used in the research: cite sources inline by the citation ids the tools give them (e.g. [S12]) and end the answer with the bibliography from get_bibliography
 - Answering all parts of the user query
 - Should be comprehensive and well researched (minimally from 5 sources)
 - Should NOT be a summary of your notes
 
 NOTE: Do note that search results using any of the search tools are overwritten once a new search tool call is made.
-Remember the user DOES NOT HAVE access to your notes so you will have to answer the user queries DIRECTLY after reading ALL your notes at the end of the research.
+Remember the user DOES NOT HAVE access to your notes so you will have to answer the user queries DIRECTLY at the end of the research.
+To recall your findings (while researching and before writing the answer), use retrieve_notes with a focused query for each part of the user query instead of reading all notes.
 
 Your name: Research
         """,
         "model_client": model,
         "agent_topics": [],
         "tools": web_search_tools + arxiv_search_tools + note_tools,
+        "delegation_timeout": tools_config.delegate_cfg["timeout_seconds"],
     }
 ]
@@ -8,8 +8,12 @@ delegate_cfg = {
         "are any tasks outside of your expertise. "
         "Only delegate to these agents:\n\n{agents}\n\n"
         "Each DelegationTask data model should contain the fields "
-        "'task', 'agent' and 'name'."
-    )
+        "'task', 'agent' and 'name', and optionally 'timeout_seconds'. "
+        "Tasks for different agents run at the same time: delegate all "
+        "independent tasks in one call."
+    ),
+    # deadline of each delegated agent's answer, unless the task sets its own
+    "timeout_seconds": float(os.environ.get("DELEGATE_TIMEOUT", 300)),
 }
 
 PLACEHOLDER_tool_cfg = {"description": ""}
@@ -43,3 +47,88 @@ rag_cfg = {
     "embedding_api_endpoint": "http://localhost:8000/embeddings",
     "embedding_model": "bge-m3",
 }
+
+# caches shared by the search/browse tools
+TOOL_CACHE_DIR = os.environ.get("TOOL_CACHE_DIR", "cache")
+
+search_cache_cfg = {
+    "path": os.path.join(TOOL_CACHE_DIR, "search_cache.sqlite"),
+    "ttl_seconds": {
+        "duckduckgo": float(os.environ.get("SEARCH_CACHE_TTL_WEB", 6 * 3600)),
+        "arxiv": float(os.environ.get("SEARCH_CACHE_TTL_ARXIV", 24 * 3600)),
+    },
+    "stale_seconds": float(os.environ.get("SEARCH_CACHE_STALE", 24 * 3600)),
+}
+
+page_cache_cfg = {
+    "path": os.path.join(TOOL_CACHE_DIR, "page_cache.sqlite"),
+    "max_bytes": int(os.environ.get("PAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    "fresh_seconds": float(os.environ.get("PAGE_CACHE_FRESH", 24 * 3600)),
+}
+
+paper_store_cfg = {
+    "path": os.path.join(TOOL_CACHE_DIR, "paper_store.sqlite"),
+    "max_bytes": int(os.environ.get("PAPER_STORE_MAX_BYTES", 1024 * 1024 * 1024)),
+}
+
+# research notes, namespaced by session; set NOTES_SESSION to resume an earlier session's notes
+note_store_cfg = {
+    "path": os.environ.get("NOTE_STORE_PATH", os.path.join(TOOL_CACHE_DIR, "notes.sqlite")),
+}
+
+note_tool_cfg = {
+    "session": os.environ.get("NOTES_SESSION") or None,
+}
+
+# citation ids of the sources surfaced by the search tools, kept next to the notes that cite them
+source_registry_cfg = {
+    "path": note_store_cfg["path"],
+}
+
+# local arXiv metadata index, searched before the live API once built with
+# `python -m tools.arxiv_index import <snapshot>`
+arxiv_index_cfg = {
+    "path": os.environ.get("ARXIV_INDEX_PATH", os.path.join(TOOL_CACHE_DIR, "arxiv_index.sqlite")),
+    "recency_boost": float(os.environ.get("ARXIV_INDEX_RECENCY_BOOST", 0.5)),
+    "recency_scale_days": float(os.environ.get("ARXIV_INDEX_RECENCY_SCALE_DAYS", 730)),
+}
+
+arxiv_tool_cfg = {
+    # memory budget for papers kept open side by side
+    "workspace_max_bytes": int(os.environ.get("WORKSPACE_MAX_BYTES", 256 * 1024 * 1024)),
+    # tokens each rendered result listing may put into the prompt
+    "token_budgets": {
+        "search_arxiv": int(os.environ.get("TOKENS_SEARCH_ARXIV", 700)),
+        "search_arxiv_batch": int(os.environ.get("TOKENS_SEARCH_ARXIV_BATCH", 1200)),
+        "next_arxiv_page": int(os.environ.get("TOKENS_SEARCH_ARXIV", 700)),
+        "lookup_arxiv_papers": int(os.environ.get("TOKENS_LOOKUP_ARXIV", 900)),
+        "related_papers": int(os.environ.get("TOKENS_RELATED_PAPERS", 1200)),
+    },
+}
+
+web_tool_cfg = {
+    "token_budgets": {
+        "search_web": int(os.environ.get("TOKENS_SEARCH_WEB", 500)),
+        "search_web_batch": int(os.environ.get("TOKENS_SEARCH_WEB_BATCH", 900)),
+        "next_search_page": int(os.environ.get("TOKENS_SEARCH_WEB", 500)),
+    },
+}
+
+web_fetch_cfg = {
+    "max_pdf_bytes": int(os.environ.get("WEB_MAX_PDF_BYTES", 25 * 1024 * 1024)),
+    "max_ready_wait_ms": int(os.environ.get("WEB_MAX_READY_WAIT_MS", 8000)),
+}
+
+http_client_cfg = {
+    "user_agent": os.environ.get("HTTP_USER_AGENT", "knowledge-research-agent/0.1"),
+    "timeout": float(os.environ.get("HTTP_TIMEOUT", 15)),
+    "default_max_concurrency": int(os.environ.get("HTTP_MAX_CONCURRENCY_PER_HOST", 4)),
+    "respect_robots": os.environ.get("HTTP_RESPECT_ROBOTS", "true").lower() == "true",
+}
+
+# embedding re-ranking for find_passages; opt-in, enabled by setting
+# PASSAGE_RERANK_ENDPOINT (e.g. to the RAG embedding endpoint)
+passage_rerank_cfg = {
+    "endpoint": os.environ.get("PASSAGE_RERANK_ENDPOINT") or None,
+    "model": os.environ.get("PASSAGE_RERANK_MODEL", rag_cfg["embedding_model"]),
+}
@@ -0,0 +1,71 @@
+from tools.arxiv_feed import AtomFeedParser, normalize_arxiv_id, parse_atom_feed
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>ArXiv Query</title>
+  <entry>
+    <id>http://arxiv.org/abs/2506.18096v2</id>
+    <published>2025-06-22T17:00:00Z</published>
+    <updated>2025-07-01T09:30:00Z</updated>
+    <title>Masked Diffusion
+      Language Models</title>
+    <summary>  We study masked diffusion.  </summary>
+    <author><name>Ada Lovelace</name></author>
+    <author><name>Alan  Turing</name></author>
+    <link href="http://arxiv.org/abs/2506.18096v2" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2506.18096v2" rel="related" type="application/pdf"/>
+    <arxiv:primary_category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/api/errors#incorrect_id_format_for_1234</id>
+    <title>Error</title>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/cs/0101001v1</id>
+    <published>2001-01-01T00:00:00Z</published>
+    <title>An Old Paper</title>
+  </entry>
+</feed>
+"""
+
+
+def test_parse_atom_feed():
+    first, old = parse_atom_feed(FEED)
+
+    assert first == {
+        "arxiv_id": "2506.18096",
+        "version": 2,
+        "title": "Masked Diffusion Language Models",
+        "authors": ["Ada Lovelace", "Alan Turing"],
+        "summary": "We study masked diffusion.",
+        "pdf_url": "http://arxiv.org/pdf/2506.18096v2",
+        "published": "2025-06-22",
+        "updated": "2025-07-01",
+        "categories": ["cs.CL", "cs.LG"],
+    }
+    # without a pdf link the abs URL is rewritten
+    assert old["arxiv_id"] == "cs/0101001"
+    assert old["pdf_url"] == "http://arxiv.org/pdf/cs/0101001v1"
+
+
+def test_chunked_feed_matches_whole_document():
+    parser = AtomFeedParser()
+    papers = []
+    for i in range(0, len(FEED), 7):
+        papers += parser.feed(FEED[i:i + 7])
+    papers += parser.close()
+
+    assert papers == parse_atom_feed(FEED)
+    # completed entries are dropped from the tree as they are parsed
+    assert len(parser._root) == 1
+
+
+def test_normalize_arxiv_id():
+    assert normalize_arxiv_id(" arXiv:2506.18096v2 ") == "2506.18096v2"
+    assert normalize_arxiv_id("cs/0101001") == "cs/0101001"
+    assert normalize_arxiv_id("https://arxiv.org/pdf/2506.18096v3.pdf") == "2506.18096v3"
+    assert normalize_arxiv_id("https://arxiv.org/abs/2506.18096") == "2506.18096"
+    assert normalize_arxiv_id("not an id") is None
+    assert normalize_arxiv_id(None) is None
@@ -0,0 +1,136 @@
+import asyncio
+
+from tools.arxiv_index import ArxivMetadataIndex, to_match_query, update_from_api
+
+
+def paper(arxiv_id, title, categories=("cs.CL",), published="2024-01-01"):
+    return {
+        "arxiv_id": arxiv_id,
+        "version": 1,
+        "title": title,
+        "authors": ["A. Author"],
+        "summary": "An abstract about " + title.lower(),
+        "categories": list(categories),
+        "published": published,
+    }
+
+
+class FakeAPI:
+    def __init__(self, pages=None):
+        self.pages = list(pages or [])
+        self.queries = []
+
+    async def fetch(self, params):
+        self.queries.append(params["search_query"])
+        return self.pages.pop(0) if self.pages else []
+
+
+# ------------------------------------------------------------
+# to_match_query
+# ------------------------------------------------------------
+def test_to_match_query_maps_prefixes_and_operators():
+    assert to_match_query('cat:cs.CL AND ti:"masked diffusion"') == 'categories:"cs.CL" AND title:"masked diffusion"'
+    assert to_match_query("au:vaswani ANDNOT abs:rnn") == 'authors:"vaswani" NOT summary:"rnn"'
+    assert to_match_query("(ti:bert OR ti:gpt) AND cat:cs.CL") == '( title:"bert" OR title:"gpt" ) AND categories:"cs.CL"'
+
+
+def test_to_match_query_quotes_bare_terms():
+    assert to_match_query("diffusion language model") == '"diffusion" "language" "model"'
+    assert to_match_query("diffusion language", any_term=True) == '"diffusion" OR "language"'
+    # field filters stay required when bare terms are OR-ed
+    assert to_match_query("cat:cs.CL diffusion language", any_term=True) == 'categories:"cs.CL" AND ( "diffusion" OR "language" )'
+    assert to_match_query("diffusion ti:bert model", any_term=True) == '( "diffusion" ) AND title:"bert" AND ( "model" )'
+    # FTS5 syntax in user input stays literal
+    assert to_match_query('NEAR(a b) "x""y"') == '"NEAR" ( "a" "b" ) "x" "y"'
+
+
+def test_to_match_query_gives_up_on_unsupported_filters():
+    assert to_match_query("cat:cs.CL AND submittedDate:[202401010000 TO 202412312359]") is None
+    assert to_match_query("ti:diffusion AND [2024 TO 2025]") is None
+    assert to_match_query("id:2401.00001") is None
+
+
+def test_to_match_query_partial_drops_unsupported_terms():
+    assert to_match_query("cat:cs.CL AND submittedDate:[2024 TO 2025]", partial=True) == 'categories:"cs.CL"'
+    assert to_match_query("see https://example.org", partial=True) == '"see"'
+    assert to_match_query("submittedDate:[2024 TO 2025]", partial=True) is None
+
+
+# ------------------------------------------------------------
+# ArxivMetadataIndex
+# ------------------------------------------------------------
+def test_search_leaves_unsupported_queries_to_the_api():
+    index = ArxivMetadataIndex(":memory:")
+    index.upsert([paper("2401.00001", "Masked Diffusion Language Models")])
+
+    assert [p["arxiv_id"] for p in index.search("ti:diffusion")] == ["2401.00001"]
+    assert index.search("ti:diffusion AND submittedDate:[202401010000 TO 202412312359]") == []
+
+
+def test_any_term_fallback_keeps_field_filters():
+    index = ArxivMetadataIndex(":memory:")
+    index.upsert([
+        paper("2401.00001", "Masked Diffusion Models"),
+        paper("2401.00002", "Diffusion for Images", categories=("cs.CV",)),
+        paper("2401.00003", "Sparse Language Models"),
+    ])
+
+    # no paper has all terms: the fallback still requires cs.CL
+    found = {p["arxiv_id"] for p in index.search("cat:cs.CL diffusion language")}
+    assert found == {"2401.00001", "2401.00003"}
+
+
+def test_papers_without_a_date_rank_last():
+    index = ArxivMetadataIndex(":memory:")
+    index.upsert([
+        paper("2401.00001", "Masked Diffusion", published=""),
+        paper("2401.00002", "Masked Diffusion Models Revisited", published="2020-01-01"),
+    ])
+
+    assert [p["arxiv_id"] for p in index.search("masked diffusion")] == ["2401.00002", "2401.00001"]
+
+
+def test_upsert_only_rewrites_changed_papers():
+    index = ArxivMetadataIndex(":memory:")
+    assert index.upsert([paper("2401.00001", "First Title")]) == 1
+    assert index.upsert([paper("2401.00001", "First Title")]) == 0
+    assert index.upsert([{**paper("2401.00001", "Second Title"), "version": 2}]) == 1
+    assert index.get_many(["2401.00001"])["2401.00001"]["title"] == "Second Title"
+
+
+def test_update_without_snapshot_does_not_claim_coverage():
+    index = ArxivMetadataIndex(":memory:")
+    api = FakeAPI([[paper("2610.00001", "New Paper", published="2026-10-10")]])
+
+    summary = asyncio.run(update_from_api(index, api, ["cs.CL"]))
+
+    assert summary["changed"] == 1
+    assert summary["coverage_advanced"] is False
+    assert index.covered_until() is None
+    assert index.covered_until(["cs.CL"]) is None
+
+
+def test_update_records_coverage_per_category():
+    index = ArxivMetadataIndex(":memory:")
+    index.set_covered_until("2024-01-01")
+
+    summary = asyncio.run(update_from_api(index, FakeAPI(), ["cs.CL"]))
+
+    assert summary["coverage_advanced"] is True
+    # the global date only moves with snapshot imports
+    assert index.covered_until() == "2024-01-01"
+    assert index.covered_until(["cs.CL"]) > "2024-01-01"
+    # a query also covering a category that was not harvested is only as fresh as the snapshot
+    assert index.covered_until(["cs.CL", "cs.LG"]) == "2024-01-01"
+    assert set(index.category_coverage()) == {"cs.CL"}
+
+
+def test_update_harvests_from_the_category_coverage():
+    index = ArxivMetadataIndex(":memory:")
+    index.set_covered_until("2024-01-01")
+    index.set_covered_until("2025-06-01", "cs.CL")
+    api = FakeAPI()
+
+    asyncio.run(update_from_api(index, api, ["cs.CL"]))
+
+    assert "submittedDate:[202506010000 TO" in api.queries[0]
@@ -0,0 +1,67 @@
+from tools.citations import extract_references, find_bibliography, split_entries
+
+WRAPPED_TITLES = """\
+Language models [1] build on word vectors [2]; [1] is the classic reference.
+
+References
+
+[1] Y. Bengio, R. Ducharme, and P. Vincent. 2003.
+A Neural Probabilistic Language Model
+Journal of Machine Learning Research.
+[2] T. Mikolov, K. Chen, G. Corrado, and J. Dean. 2013.
+Efficient Estimation of Word Representations in Vector Space. arXiv:1301.3781.
+
+A Proofs
+
+The appendix text, which is not part of the bibliography.
+"""
+
+
+def bibliography(text):
+    start, end = find_bibliography(text)
+    return text[start:end]
+
+
+def test_wrapped_title_lines_do_not_end_the_bibliography():
+    entries = split_entries(bibliography(WRAPPED_TITLES))
+
+    assert [label for label, _ in entries] == ["1", "2"]
+    assert "A Neural Probabilistic Language Model" in entries[0][1]
+
+
+def test_bibliography_stops_at_appendix_headings():
+    assert "appendix text" not in bibliography(WRAPPED_TITLES)
+    explicit = WRAPPED_TITLES.replace("A Proofs\n", "Appendix A: Proofs\n")
+    assert "appendix text" not in bibliography(explicit)
+
+
+def test_references_keep_labels_and_mentions():
+    references = extract_references(WRAPPED_TITLES)
+
+    assert [r["mentions"] for r in references] == [2, 1]
+    assert references[1]["arxiv_id"] == "1301.3781"
+    assert references[1]["title"].startswith("Efficient Estimation of Word Representations")
+
+
+def test_single_numbered_entry_keeps_its_label():
+    text = "As shown in [7], it works.\n\nReferences\n\n[7] A. Author. A Title of Some Paper. NeurIPS, 2020.\n"
+    references = extract_references(text)
+
+    assert len(references) == 1
+    assert references[0]["mentions"] == 1
+
+
+def test_split_entries_layouts():
+    dotted = "1. A. Author. First Paper Title Here. 2020.\n2. B. Author. Second Paper Title Here. 2021.\n"
+    assert [label for label, _ in split_entries(dotted)] == ["1", "2"]
+
+    bullets = "* A. Author. First Paper Title Here. 2020.\n* B. Author. Second Paper Title Here. 2021.\n"
+    assert [label for label, _ in split_entries(bullets)] == [None, None]
+
+    author_year = (
+        "Bengio, Y. and Vincent, P. A neural probabilistic language model. 2003.\n"
+        "Mikolov, T. Efficient estimation of word representations. 2013.\n"
+    )
+    entries = split_entries(author_year)
+    assert len(entries) == 2
+    assert entries[1][1].startswith("Mikolov")
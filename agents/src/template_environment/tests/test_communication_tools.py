@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from tools.communication_tools import DelegationTask, group_delegation_tasks, parse_delegation_tasks
+
+TASKS = [
+    {"agent": "researcher", "task": "Find papers on masked diffusion.", "name": "planner"},
+    {"agent": "writer", "task": "Draft the introduction.", "name": "planner", "timeout_seconds": 60},
+    {"agent": "researcher", "task": "Summarise the best one.", "name": "planner", "timeout_seconds": 120},
+]
+
+
+def test_parse_accepts_dicts_models_and_json():
+    from_dicts = parse_delegation_tasks(TASKS)
+    from_json = parse_delegation_tasks(json.dumps(TASKS))
+    from_models = parse_delegation_tasks([DelegationTask(**task) for task in TASKS])
+
+    assert from_dicts == from_json == from_models
+    assert from_dicts[1].timeout_seconds == 60
+    assert from_dicts[0].timeout_seconds is None
+
+
+@pytest.mark.parametrize(
+    "tasks",
+    [
+        "not json",
+        json.dumps([{"agent": "researcher", "name": "planner"}]),
+        [{"agent": "researcher", "task": "x", "name": "planner", "timeout_seconds": 0}],
+        [{"agent": "researcher", "task": "x", "name": "planner", "timeout_seconds": "soon"}],
+    ],
+)
+def test_parse_rejects_malformed_tasks(tasks):
+    with pytest.raises(ValidationError):
+        parse_delegation_tasks(tasks)
+
+
+def test_group_combines_tasks_per_agent():
+    groups = group_delegation_tasks(parse_delegation_tasks(TASKS))
+
+    assert [agent for agent, _, _ in groups] == ["researcher", "writer"]
+    agent, messages, timeout = groups[0]
+    assert len(messages) == 1
+    assert messages[0].content == "Find papers on masked diffusion.\n\nSummarise the best one."
+    assert messages[0].source == "planner"
+    # the tightest deadline among an agent's tasks applies
+    assert timeout == 120
+    assert groups[1][2] == 60
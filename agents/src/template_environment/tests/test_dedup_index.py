@@ -0,0 +1,57 @@
+import random
+
+from tools.dedup_index import DedupIndex, document_key, extract_arxiv_id, extract_arxiv_version, simhash
+
+ARTICLE = " ".join(random.Random(0).choices([f"word{i}" for i in range(500)], k=400))
+
+
+def test_arxiv_identity():
+    assert extract_arxiv_id("https://arxiv.org/abs/2506.18096v2") == "2506.18096"
+    assert extract_arxiv_id("http://arxiv.org/pdf/2506.18096.pdf") == "2506.18096"
+    assert extract_arxiv_id("https://arxiv.org/abs/cs/0101001") == "cs/0101001"
+    assert extract_arxiv_id("https://example.org/2506.18096") is None
+    assert extract_arxiv_version("https://arxiv.org/html/2506.18096v3") == 3
+    assert extract_arxiv_version("https://arxiv.org/abs/2506.18096") is None
+
+    assert document_key("https://arxiv.org/pdf/2506.18096v1") == document_key("http://arxiv.org/html/2506.18096")
+    assert document_key("http://www.example.org/a/") == document_key("https://example.org/a?utm_source=x")
+
+
+def test_collapse_results_flags_opened_documents():
+    index = DedupIndex()
+    index.register("https://arxiv.org/abs/2506.18096", ARTICLE, title="A Paper", source="open_paper")
+    results = [
+        {"id": 0, "url": "https://example.org/post"},
+        {"id": 1, "url": "https://www.example.org/post/"},
+        {"id": 2, "url": "https://arxiv.org/pdf/2506.18096v2"},
+    ]
+
+    collapsed = index.collapse_results(results)
+    assert [r["id"] for r in collapsed] == [0, 1]
+    assert collapsed[1]["already_opened"] == "https://arxiv.org/abs/2506.18096"
+    assert "already_opened" not in results[2]
+
+
+def test_aliases_and_near_duplicates():
+    index = DedupIndex()
+    record = index.register("https://arxiv.org/abs/2506.18096", ARTICLE, source="open_paper")
+
+    assert index.find_alias("https://arxiv.org/pdf/2506.18096") is record
+    # re-opening the same URL is allowed
+    assert index.find_alias("https://arxiv.org/abs/2506.18096") is None
+
+    mirrored = "Mirrored from arXiv. " + ARTICLE
+    assert index.find_near_duplicate(mirrored) is record
+    assert index.find_near_duplicate("an unrelated page about cooking " * 20) is None
+    assert "already read" in DedupIndex.pointer(record, "https://mirror.org/x")["message"]
+
+
+def test_short_texts_get_no_fingerprint_until_set():
+    assert simhash("too short") is None
+
+    index = DedupIndex()
+    index.register("https://arxiv.org/abs/2506.18096", "")
+    assert index.find_near_duplicate(ARTICLE) is None
+
+    index.set_fingerprint("https://arxiv.org/pdf/2506.18096", simhash(ARTICLE))
+    assert index.find_near_duplicate(ARTICLE)["url"] == "https://arxiv.org/abs/2506.18096"
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from tools.document_reader import DocumentReader, count_windows, detect_sections, window_end
+
+PARAGRAPH = "Diffusion models denoise text in parallel over many steps. " * 4
+
+DOCUMENT = "\n\n".join(
+    ["Abstract", PARAGRAPH, "1 Introduction", PARAGRAPH, PARAGRAPH, "2 Method", PARAGRAPH, "References", "[1] A. Author."]
+)
+
+
+def load(text, window_size=400):
+    reader = DocumentReader(window_size)
+    asyncio.run(reader.load_text(text))
+    return reader
+
+
+def test_windows_cover_the_text_and_end_on_breaks():
+    reader = load(DOCUMENT)
+
+    assert "".join(reader.windows) == DOCUMENT
+    assert all(len(window) <= 400 for window in reader.windows)
+    for window in reader.windows[:-1]:
+        assert window.endswith("\n\n") or window.endswith("\n")
+    assert len(reader.windows) == count_windows(DOCUMENT, 400)
+
+
+def test_windows_prefer_section_headings():
+    segment = "x " * 150 + "\n\n" + "y " * 20 + "\n\n2 Method\n\n" + "z " * 200
+    assert segment[window_end(segment, 400):].startswith("2 Method")
+
+
+def test_unbroken_text_is_cut_at_the_window_size():
+    assert window_end("x" * 1000, 400) == 400
+
+
+def test_detect_sections():
+    titles = [s["title"] for s in detect_sections(DOCUMENT)]
+    assert titles == ["Abstract", "1 Introduction", "2 Method", "References"]
+    # numbered sentences are not headings
+    assert detect_sections("2 The model is trained on web text.") == []
+
+
+def test_navigation_and_keyword_search():
+    reader = load(DOCUMENT)
+
+    async def run():
+        first = await reader.get_window(0)
+        second = await reader.next_window()
+        back = await reader.prev_window()
+        out_of_range = await reader.get_window(len(reader.windows))
+        search = await reader.keyword_search("denoise text", window_words=3)
+        return first, second, back, out_of_range, search
+
+    first, second, back, out_of_range, search = asyncio.run(run())
+    assert back == first != second
+    assert "error" in out_of_range
+    assert search["match_type"] == "phrase"
+    assert search["total_matches"] == DOCUMENT.count("denoise text")
+    assert search["matches"][0]["window"] == 0
+    assert search["matches"][-1]["window"] == len(reader.windows) - 1
+
+
+async def chunks(pieces, gate=None, error=None):
+    for i, piece in enumerate(pieces):
+        if gate is not None and i == 1:
+            # hold the rest back until the test releases it
+            await gate.wait()
+        yield piece
+    if error is not None:
+        raise error
+
+
+def test_load_stream_returns_after_the_first_window():
+    pieces = [PARAGRAPH * 3, PARAGRAPH, "2 Method", PARAGRAPH]
+    expected = load("\n\n".join(pieces))
+    reader = DocumentReader(400)
+
+    async def run():
+        gate = asyncio.Event()
+        ready = await reader.load_stream(chunks(pieces, gate))
+        partial = reader.complete
+        gate.set()
+        # waits for the window to be extracted
+        last = await reader.get_window(len(expected.windows) - 1)
+        await reader.wait_until_loaded()
+        return ready, partial, last
+
+    ready, partial, last = asyncio.run(run())
+    assert ready >= 1 and not partial
+    assert reader.complete
+    assert reader.text == expected.text
+    assert list(reader.windows) == list(expected.windows)
+    assert last == expected.windows[-1]
+    assert [s["title"] for s in reader.sections] == ["2 Method"]
+
+
+def test_load_stream_failures():
+    async def run():
+        reader = DocumentReader(400)
+        with pytest.raises(RuntimeError, match="no pdf"):
+            await reader.load_stream(chunks([], error=RuntimeError("no pdf")))
+
+        await reader.load_stream(chunks([PARAGRAPH * 3, PARAGRAPH], error=RuntimeError("page 3")))
+        await reader.wait_until_loaded()
+        return reader
+
+    reader = asyncio.run(run())
+    # the pages extracted before the failure stay readable
+    assert reader.complete and str(reader.load_error) == "page 3"
+    assert reader.text == PARAGRAPH * 3 + "\n\n" + PARAGRAPH
+
+
+def test_windows_are_offsets_into_one_text():
+    reader = load(DOCUMENT)
+
+    offsets = reader.window_offsets()
+    assert offsets[0][0] == 0 and offsets[-1][1] == len(DOCUMENT)
+    assert all(a[1] == b[0] for a, b in zip(offsets, offsets[1:]))
+    assert [DOCUMENT[start:end] for start, end in offsets] == list(reader.windows)
+    assert reader.windows[-1] == reader.windows[len(reader.windows) - 1]
+    assert reader.windows[1:3] == [reader.windows[1], reader.windows[2]]
+    with pytest.raises(IndexError):
+        reader.windows[len(reader.windows)]
+
+
+def test_snapshot_restores_windows_sections_and_index():
+    reader = load(DOCUMENT)
+    restored = DocumentReader(400)
+    restored.restore(reader.snapshot())
+
+    assert list(restored.windows) == list(reader.windows)
+    assert restored.section_windows() == reader.section_windows()
+    assert asyncio.run(restored.keyword_search("denoise"))["total_matches"] == DOCUMENT.count("denoise")
+
+    # a different window size re-splits the text
+    resized = DocumentReader(200)
+    resized.restore(reader.snapshot())
+    assert "".join(resized.windows) == DOCUMENT
+    assert len(resized.windows) == count_windows(DOCUMENT, 200)
@@ -0,0 +1,84 @@
+from tools.html_extraction import arxiv_html_to_markdown, html_to_markdown
+
+ARTICLE_TEXT = (
+    "Masked diffusion language models denoise all positions in parallel, "
+    "and recent work shows they match autoregressive models at scale, "
+    "while sampling far fewer steps. "
+) * 3
+
+PAGE = f"""
+<html><head><script>var tracking = 1;</script><style>p {{ color: red; }}</style></head>
+<body>
+  <header><a href="/">Home</a> <a href="/blog">Blog</a></header>
+  <nav><ul><li><a href="/a">Menu item</a></li></ul></nav>
+  <div class="cookie-banner">We use cookies to improve your experience.</div>
+  <div id="content">
+    <h1>Diffusion for text</h1>
+    <p>{ARTICLE_TEXT}</p>
+    <figure><img src="plot.png"><figcaption>Figure 1: Perplexity versus steps.</figcaption></figure>
+    <figure><img src="decoration.png"></figure>
+  </div>
+  <aside>Related posts you may like</aside>
+  <footer>Copyright 2024, all rights reserved.</footer>
+</body></html>
+"""
+
+
+def test_page_chrome_is_pruned():
+    markdown = html_to_markdown(PAGE)
+
+    assert "Masked diffusion language models" in markdown
+    for chrome in ("tracking", "color: red", "Menu item", "cookies", "Related posts", "Copyright", "Blog"):
+        assert chrome not in markdown
+
+
+def test_figures_are_reduced_to_captions():
+    markdown = html_to_markdown(PAGE)
+
+    assert "Figure 1: Perplexity versus steps." in markdown
+    assert "plot.png" not in markdown
+    assert "decoration.png" not in markdown
+
+
+def test_article_header_is_kept():
+    page = f"<body><header>Site</header><article><header><h1>Post title</h1></header><p>{ARTICLE_TEXT}</p></article></body>"
+    markdown = html_to_markdown(page)
+
+    assert "# Post title" in markdown
+    assert "Site" not in markdown
+
+
+LATEXML_PAGE = """
+<html><body>
+<nav class="ltx_page_navbar">Contents</nav>
+<article class="ltx_document">
+  <h1 class="ltx_title ltx_title_document">A Paper</h1>
+  <div class="ltx_dates">(Dated: today)</div>
+  <section class="ltx_section">
+    <h2 class="ltx_title ltx_title_section">1 Introduction</h2>
+    <p>The loss <math alttext="x_i^2" display="inline"><mi>x</mi></math> is minimized, with
+    <math alttext="a*b" display="block"><mi>a</mi></math> as the bound.</p>
+    <figure class="ltx_figure"><img src="x1.png"><figcaption>Figure 1: Overview.</figcaption></figure>
+    <figure class="ltx_table"><figcaption>Table 1: Results.</figcaption>
+      <table><tr><td>BLEU</td><td>30.1</td></tr></table></figure>
+  </section>
+</article>
+</body></html>
+"""
+
+
+def test_arxiv_html_keeps_latex_sections_and_tables():
+    markdown = arxiv_html_to_markdown(LATEXML_PAGE)
+
+    assert "## 1 Introduction" in markdown
+    assert "$x_i^2$" in markdown
+    assert "$$a*b$$" in markdown
+    assert "Figure 1: Overview." in markdown
+    assert "x1.png" not in markdown
+    assert "| BLEU | 30.1 |" in markdown
+    assert "Dated" not in markdown
+    assert "Contents" not in markdown
+
+
+def test_non_latexml_pages_are_rejected():
+    assert arxiv_html_to_markdown(PAGE) is None
@@ -0,0 +1,83 @@
+from tools.note_store import NoteStore, fuse_rankings
+
+SESSION = "test-session"
+
+
+def uncached_render(path, section=None, subsection=""):
+    # a new store has empty caches, so it renders from the database
+    return NoteStore(str(path)).render(SESSION, section, subsection)
+
+
+def test_render_cache_matches_the_database(tmp_path):
+    path = tmp_path / "notes.sqlite"
+    store = NoteStore(str(path))
+
+    store.create(SESSION, "Methods")
+    store.create(SESSION, "Results")
+    store.create(SESSION, "Methods", "Data")
+    store.append(SESSION, "Methods", "", "We compare two models.")
+    assert store.render(SESSION) == uncached_render(path)
+
+    # appends to a part that is already rendered extend the cached text
+    store.append(SESSION, "Methods", "Data", "Web pages and arXiv papers.")
+    store.append(SESSION, "Methods", "", "Both are trained for 10 epochs.")
+    store.append(SESSION, "Results", "", "Model B wins.")
+    assert store.render(SESSION) == uncached_render(path)
+    assert store.render(SESSION, "Methods") == uncached_render(path, "Methods")
+
+    store.replace(SESSION, "Methods", "", "We compare three models.")
+    assert store.render(SESSION) == uncached_render(path)
+
+    store.delete(SESSION, "Methods", "Data")
+    assert store.render(SESSION) == uncached_render(path)
+    assert store.render(SESSION, "Methods", "Data") is None
+
+    store.delete(SESSION, "Methods")
+    assert store.render(SESSION) == uncached_render(path)
+    assert store.layout(SESSION) == [("Results", "")]
+
+
+def test_delete_on_a_fresh_store_and_missing_parts(tmp_path):
+    path = tmp_path / "notes.sqlite"
+    store = NoteStore(str(path))
+    store.create(SESSION, "Methods")
+    store.create(SESSION, "Methods", "Data")
+    store.create(SESSION, "Results")
+
+    # a new store has not loaded the session's layout yet
+    reopened = NoteStore(str(path))
+    reopened.delete(SESSION, "Methods", "Data")
+    reopened.delete(SESSION, "Methods", "Missing")
+    reopened.delete(SESSION, "Missing")
+    assert reopened.layout(SESSION) == [("Methods", ""), ("Results", "")]
+    assert uncached_render(path) == reopened.render(SESSION)
+
+
+def test_render_layout_and_sessions_are_separate():
+    store = NoteStore(":memory:")
+    store.create(SESSION, "Intro")
+    store.create(SESSION, "Intro", "Background")
+    store.create(SESSION, "Outro")
+    store.create(SESSION, "Intro", "Motivation")
+    store.append(SESSION, "Intro", "Motivation", "Why this matters.")
+
+    assert store.layout(SESSION) == [("Intro", ""), ("Intro", "Background"), ("Intro", "Motivation"), ("Outro", "")]
+    assert store.render(SESSION, "Intro", "Motivation") == "## Motivation\nWhy this matters.\n"
+    assert store.render("other-session") == ""
+    assert not store.create(SESSION, "Intro")
+
+
+def test_search_requires_all_terms_then_any():
+    store = NoteStore(":memory:")
+    store.create(SESSION, "Notes")
+    store.append(SESSION, "Notes", "", "Masked diffusion language models [S1].")
+    store.append(SESSION, "Notes", "", "Autoregressive models remain strong.")
+
+    assert [hit["text"] for hit in store.search(SESSION, "masked diffusion")] == ["Masked diffusion language models [S1]."]
+    assert len(store.search(SESSION, "diffusion autoregressive")) == 2
+    # prefixes the index does not know are ignored in free-text note searches
+    assert len(store.search(SESSION, "masked todo:later")) == 1
+
+
+def test_fuse_rankings_prefers_items_ranked_well_by_both():
+    assert fuse_rankings([1, 2, 3], [3, 1, 4])[:2] == [1, 3]
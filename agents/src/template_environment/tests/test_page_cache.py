@@ -0,0 +1,51 @@
+from tools.page_cache import PageCache
+from tools.url_utils import canonicalize_url
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("HTTPS://www.Example.org:443//a//b/?utm_source=x&b=2&a=1#top") == "https://example.org/a/b?a=1&b=2"
+    assert canonicalize_url("example.org/page/") == "http://example.org/page"
+    assert canonicalize_url("http://example.org:8080/x") == "http://example.org:8080/x"
+    # "ref" selects content (e.g. a GitHub branch) and is kept
+    assert canonicalize_url("https://github.com/a/b/blob/x?ref=dev&fbclid=1") == "https://github.com/a/b/blob/x?ref=dev"
+
+
+def test_canonicalize_url_keeps_malformed_ports():
+    assert canonicalize_url("http://Host:99999/x") == "http://host:99999/x"
+    assert canonicalize_url("host:abc") == "http://host:abc"
+
+
+def test_put_and_get_by_canonical_url(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite"))
+    cache.put("https://www.example.org/a?utm_medium=x", "page text", etag='"v1"')
+
+    entry = PageCache(str(tmp_path / "pages.sqlite")).get("https://example.org/a")
+    assert entry["content"] == "page text"
+    assert entry["etag"] == '"v1"'
+    assert entry["fresh"]
+    assert cache.get("https://example.org/other") is None
+
+
+def test_entries_go_stale_and_revalidate():
+    cache = PageCache(":memory:", fresh_seconds=0)
+    cache.put("https://example.org/a", "text", last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    cache._db.execute("UPDATE page_cache SET fetched_at = fetched_at - 10")
+
+    assert not cache.get("https://example.org/a")["fresh"]
+    cache.fresh_seconds = 5
+    cache.mark_revalidated("https://example.org/a")
+    assert cache.get("https://example.org/a")["fresh"]
+    assert cache.metrics["revalidated"] == 1
+
+
+def test_size_bound_evicts_least_recently_used():
+    cache = PageCache(":memory:", max_bytes=70, compression_level=0)
+    cache.put("https://example.org/a", "a" * 20)
+    cache.put("https://example.org/b", "b" * 20)
+    cache._db.execute("UPDATE page_cache SET accessed_at = accessed_at - 10 WHERE url LIKE '%/b'")
+    cache.put("https://example.org/c", "c" * 20)
+
+    assert cache.get("https://example.org/b") is None
+    assert cache.get("https://example.org/a") is not None
+    assert cache.metrics["evictions"] == 1
+    assert cache.total_bytes <= 70
@@ -0,0 +1,67 @@
+import asyncio
+
+from test_pdf_extraction import make_pdf
+from tools.paper_store import UNVERSIONED, PaperStore, import_papers
+
+
+def snapshot(text, **state):
+    return {"text": text, "window_size": 3000, "windows": [[0, len(text)]], "sections": [], **state}
+
+
+class FakeAPI:
+    def __init__(self, titles):
+        self.titles = titles
+        self.requests = []
+
+    async def lookup(self, arxiv_ids):
+        self.requests.append(list(arxiv_ids))
+        return {key: {"title": title} for key, title in self.titles.items()}
+
+
+def test_put_and_get(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.sqlite"))
+    store.put("2506.18096", 1, snapshot("version one"), title="A Paper")
+    store.put("2506.18096", 2, snapshot("version two", source_format="html"))
+    store.put("2401.01234", None, snapshot(""))
+
+    restarted = PaperStore(str(tmp_path / "papers.sqlite"))
+    assert restarted.get("2506.18096")["text"] == "version two"
+    assert restarted.get("2506.18096", 1)["title"] == "A Paper"
+    assert restarted.get("2506.18096")["source_format"] == "html"
+    # empty extractions are not stored
+    assert not restarted.contains("2401.01234")
+    assert restarted.get("2401.01234") is None
+    assert restarted.stats()["entries"] == 2
+
+
+def test_formats_outlive_evicted_papers():
+    store = PaperStore(":memory:", max_bytes=10_000, compression_level=0)
+    store.set_format("2506.18096", None, "pdf")
+    store.put("2506.18096", None, snapshot("a" * 4000))
+    store.put("2401.01234", None, snapshot("b" * 4000))
+    store._db.execute("UPDATE papers SET accessed_at = accessed_at - 10 WHERE arxiv_id = '2506.18096'")
+    store.put("2312.00001", None, snapshot("c" * 4000))
+
+    assert not store.contains("2506.18096")
+    assert store.contains("2401.01234")
+    assert store.get_format("2506.18096", UNVERSIONED) == "pdf"
+    assert store.total_bytes <= 10_000
+
+
+def test_import_papers_from_a_pdf_directory(tmp_path):
+    (tmp_path / "2506.18096v2.pdf").write_bytes(make_pdf(["Masked diffusion language models"]))
+    (tmp_path / "2401.01234.pdf").write_bytes(b"not a pdf")
+    (tmp_path / "notes.pdf").write_bytes(b"")
+    store = PaperStore(":memory:")
+    store.put("2312.00001", None, snapshot("already stored"))
+    api = FakeAPI({"2506.18096v2": "Masked Diffusion"})
+
+    summary = asyncio.run(import_papers(store, ["2312.00001"], str(tmp_path), api=api))
+
+    assert summary == {"imported": 1, "skipped": 1, "failed": 2}
+    # one batched lookup for the papers still to import
+    assert api.requests == [["https://arxiv.org/pdf/2401.01234", "https://arxiv.org/pdf/2506.18096v2"]]
+    paper = store.get("2506.18096", 2)
+    assert paper["title"] == "Masked Diffusion"
+    assert paper["source_format"] == "pdf"
+    assert "Masked diffusion language models" in paper["text"]
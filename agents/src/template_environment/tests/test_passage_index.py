@@ -0,0 +1,75 @@
+import asyncio
+
+from tools.document_reader import DocumentReader
+from tools.passage_index import EmbeddingReranker, PassageIndex, split_passages
+
+TEXT = "\n\n".join([
+    "Masked diffusion language models denoise every position in parallel. " * 4,
+    "Autoregressive transformers generate text one token at a time, left to right. " * 4,
+    "Short note.",
+    "Evaluation uses perplexity and generative perplexity on OpenWebText. " * 4,
+])
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"data": self.data}
+
+
+class FakeEmbeddings:
+    """Embeds each text as [1, 0] if it mentions `topic`, else [0, 1]."""
+
+    def __init__(self, topic, fail=False):
+        self.topic = topic
+        self.fail = fail
+        self.calls = 0
+
+    async def request(self, method, url, json=None, timeout=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("embedder down")
+        # the query itself is always the first input
+        vectors = [[1.0, 0.0]] + [[1.0, 0.0] if self.topic in t else [0.0, 1.0] for t in json["input"][1:]]
+        return FakeResponse([{"index": i, "embedding": v} for i, v in reversed(list(enumerate(vectors)))])
+
+
+def test_split_passages_merges_short_and_splits_long_paragraphs():
+    passages = split_passages(TEXT, max_chars=400, min_chars=200)
+    texts = [TEXT[start:end] for start, end in passages]
+
+    assert all(len(t) <= 400 for t in texts)
+    assert any("Short note." in t and "Evaluation" in t for t in texts)
+    assert "".join("".join(t.split()) for t in texts) == "".join(TEXT.split())
+
+
+def test_bm25_ranks_the_matching_passage_first():
+    index = PassageIndex(TEXT)
+    best, _ = index.search("perplexity evaluation", k=1)[0]
+
+    assert "perplexity" in TEXT[slice(*index.passages[best])]
+    assert index.search("unknownterm") == []
+
+
+def test_reranker_reorders_and_backs_off():
+    reader = DocumentReader()
+    asyncio.run(reader.load_text(TEXT))
+    embeddings = FakeEmbeddings("Autoregressive")
+    reranker = EmbeddingReranker("http://embedder/v1/embeddings", "model", http_client=embeddings)
+
+    result = asyncio.run(reader.find_passages("masked diffusion text", k=1, reranker=reranker))
+    assert "Autoregressive" in result["passages"][0]["text"]
+    assert result["passages"][0]["similarity"] == 1.0
+
+    embeddings.fail = True
+    for _ in range(3):
+        result = asyncio.run(reader.find_passages("masked diffusion text", k=1, reranker=reranker))
+        # BM25 order while the embedder is down
+        assert "Masked diffusion" in result["passages"][0]["text"]
+    # only the first failure reached the endpoint
+    assert embeddings.calls == 2
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from tools import pdf_extraction
+from tools.pdf_extraction import extract_pdf_pages, extract_pdf_text_async, iter_pdf_pages
+
+
+def make_pdf(pages: list) -> bytes:
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(count)), count),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode("latin-1")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+            b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+PAGES = [f"Page {i} text" for i in range(7)]
+
+
+def test_pages_come_back_in_order():
+    assert asyncio.run(extract_pdf_pages(make_pdf(PAGES), pages_per_task=2)) == PAGES
+    assert asyncio.run(extract_pdf_text_async(make_pdf(PAGES[:2]))) == "Page 0 text\n\nPage 1 text"
+
+
+def test_stopping_early_cancels_the_rest():
+    async def first_page():
+        async for index, text in iter_pdf_pages(make_pdf(PAGES), pages_per_task=1):
+            return index, text
+
+    assert asyncio.run(first_page()) == (0, "Page 0 text")
+
+
+def test_pages_are_extracted_in_a_thread_without_a_pool(monkeypatch):
+    def unavailable():
+        raise RuntimeError("cannot start workers")
+
+    monkeypatch.setattr(pdf_extraction, "get_pdf_pool", unavailable)
+    assert asyncio.run(extract_pdf_pages(make_pdf(PAGES), pages_per_task=3)) == PAGES
+
+
+def test_invalid_pdfs_raise():
+    with pytest.raises(Exception):
+        asyncio.run(extract_pdf_pages(b"%PDF-1.4 truncated"))
@@ -0,0 +1,63 @@
+from tools.result_rendering import (
+    count_tokens,
+    render_arxiv_results,
+    render_table,
+    render_web_results,
+    short_authors,
+    truncate,
+)
+
+ABSTRACT = "We study masked diffusion language models, which denoise every position in parallel. " * 6
+
+
+def arxiv_result(i, **extra):
+    return {
+        "id": i,
+        "arxiv_id": f"2401.{i:05d}",
+        "title": f"Paper number {i} on masked diffusion",
+        "authors": ["Jonathan Ho", "Ajay Jain", "Pieter Abbeel"],
+        "summary": ABSTRACT,
+        "published": "2024-01-15",
+        **extra,
+    }
+
+
+def test_truncate_and_short_authors():
+    assert truncate("  a   b\nc ") == "a b c"
+    assert truncate("masked diffusion language models", 20) == "masked diffusion…"
+    assert truncate(None) == ""
+    assert short_authors(["Jonathan Ho", "Ajay Jain", "Pieter Abbeel"]) == "Ho, Jain +1"
+    assert count_tokens("") == 0
+
+
+def test_arxiv_results_fit_the_budget():
+    results = [arxiv_result(i) for i in range(10)]
+    text = render_arxiv_results(results, budget_tokens=400, header="query: diffusion | page 1")
+
+    assert count_tokens(text) <= 400
+    lines = text.splitlines()
+    assert lines[0] == "query: diffusion | page 1"
+    assert lines[1] == "id | title | authors | date | abstract"
+    assert "Ho, Jain +1 | 2024-01" in lines[2]
+    assert lines[-1].startswith("Abstracts are truncated")
+
+
+def test_rows_are_dropped_when_columns_cannot_shrink_further():
+    rows = [{"id": i, "text": "word " * 30} for i in range(50)]
+    text = render_table(rows, [("id", None), ("text", 40)], budget_tokens=200)
+
+    assert count_tokens(text) <= 200
+    assert "more results not shown" in text.splitlines()[-1]
+
+
+def test_optional_columns_and_notes():
+    text = render_arxiv_results(
+        [arxiv_result(0, citation="S1", stored=True, mentions=3), arxiv_result(1)], budget_tokens=2000
+    )
+    assert text.splitlines()[0] == "id | cite | title | authors | date | abstract | notes"
+    assert "stored cited 3x" in text
+
+    web = render_web_results([{"id": 0, "title": "A | B", "url": "https://example.org", "snippet": "text"}])
+    # cell separators inside values are replaced
+    assert web.splitlines()[1] == "0 | A / B | https://example.org | text"
+    assert render_web_results([], header="query: x") == "query: x\nNo results."
@@ -0,0 +1,87 @@
+import asyncio
+
+from tools.search_cache import SearchCache, normalize_query
+
+
+class Backend:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        return [dict(r) for r in self.results]
+
+
+def lookup(cache, backend, query="masked diffusion", name="arxiv"):
+    return asyncio.run(cache.get_or_fetch(name, query, 1, 10, backend.fetch))
+
+
+def test_normalize_query():
+    assert normalize_query("  Masked   Diffusion?! ") == "masked diffusion"
+    assert normalize_query("ti:BERT AND cat:cs.CL") == "ti:bert AND cat:cs.cl"
+    assert normalize_query("Ｍasked") == "masked"
+
+
+def test_hits_are_served_without_the_backend(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"))
+    backend = Backend([{"title": "A"}])
+
+    assert lookup(cache, backend) == [{"title": "A"}]
+    assert lookup(cache, backend, "Masked  DIFFUSION?") == [{"title": "A"}]
+    assert backend.calls == 1
+
+    # persisted: a new process serves it from SQLite
+    restarted = SearchCache(str(tmp_path / "cache.sqlite"))
+    assert lookup(restarted, backend) == [{"title": "A"}]
+    assert backend.calls == 1
+    assert restarted.stats()["hit_rate"] == 1.0
+
+
+def test_results_are_copies():
+    cache = SearchCache(":memory:")
+    backend = Backend([{"title": "A"}])
+    lookup(cache, backend)[0]["title"] = "changed"
+
+    assert lookup(cache, backend) == [{"title": "A"}]
+
+
+def test_empty_results_are_not_cached(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"))
+    backend = Backend([])
+
+    assert lookup(cache, backend) == []
+    assert lookup(cache, backend) == []
+    assert backend.calls == 2
+    assert SearchCache(str(tmp_path / "cache.sqlite"))._read(cache.make_key("arxiv", "masked diffusion", 1, 10)) is None
+
+
+def test_memory_layer_evicts_least_recently_used():
+    cache = SearchCache(":memory:", max_memory_entries=2)
+    backend = Backend([{"title": "A"}])
+    for query in ("first", "second"):
+        lookup(cache, backend, query)
+    lookup(cache, backend, "first")
+    lookup(cache, backend, "third")
+
+    assert [key for key in cache._memory] == [
+        cache.make_key("arxiv", "first", 1, 10),
+        cache.make_key("arxiv", "third", 1, 10),
+    ]
+
+
+def test_stale_entries_are_served_while_refreshing():
+    cache = SearchCache(":memory:", ttl_seconds={"arxiv": 0}, stale_seconds=3600)
+    backend = Backend([{"title": "A"}])
+
+    async def run():
+        await cache.get_or_fetch("arxiv", "q", 1, 10, backend.fetch)
+        backend.results = [{"title": "B"}]
+        stale = await cache.get_or_fetch("arxiv", "q", 1, 10, backend.fetch)
+        await asyncio.gather(*cache._refreshing.values())
+        return stale
+
+    assert asyncio.run(run()) == [{"title": "A"}]
+    assert cache.metrics["stale_hits"] == 1
+    assert cache.metrics["refreshes"] == 1
+    assert cache._memory[cache.make_key("arxiv", "q", 1, 10)][1] == [{"title": "B"}]
@@ -0,0 +1,39 @@
+from tools.source_registry import SourceRegistry, canonical_source_url
+
+
+def test_links_of_one_paper_share_a_citation():
+    registry = SourceRegistry()
+    assert registry.register("https://arxiv.org/pdf/2506.18096v2", title="A Paper", tool="search_arxiv") == "S1"
+    assert registry.register("http://arxiv.org/html/2506.18096") == "S1"
+    assert registry.register("https://www.example.org/post/") == "S2"
+    assert registry.lookup("https://example.org/post") == "S2"
+    assert registry.get("[S1]")["url"] == canonical_source_url("https://arxiv.org/abs/2506.18096")
+
+
+def test_results_without_a_url_get_no_citation():
+    registry = SourceRegistry()
+    results = registry.register_results([
+        {"id": 0, "title": "Error entry", "pdf_url": None},
+        {"id": 1, "title": "A Paper", "pdf_url": "https://arxiv.org/pdf/2506.18096"},
+        {"id": 2, "title": "No link"},
+    ], url_field="pdf_url")
+
+    assert [r.get("citation") for r in results] == [None, "S1", None]
+    assert registry.stats()["sources"] == 1
+
+
+def test_bibliography_lists_cited_sources_in_order(tmp_path):
+    path = str(tmp_path / "sources.sqlite")
+    registry = SourceRegistry(path, session="s")
+    registry.register("https://example.org/a", title="Page A", tool="search_web")
+    registry.register("https://arxiv.org/abs/2506.18096", title="A Paper", tool="open_paper", opened=True, content="text")
+
+    # persisted per session
+    resumed = SourceRegistry(path, session="s")
+    lines = resumed.bibliography("As shown in [S2] and [S1], and again [S2].").splitlines()
+    assert lines[0].startswith("[S2] A Paper. https://arxiv.org/abs/2506.18096 (retrieved ")
+    assert lines[0].endswith("via open_paper)")
+    assert lines[1] == "[S1] Page A. https://example.org/a"
+    # only opened sources without a text
+    assert resumed.bibliography().count("\n") == 0
+    assert SourceRegistry(path, session="other").stats()["sources"] == 0
@@ -0,0 +1,53 @@
+import random
+
+from tools.text_index import PositionalIndex, tokenize
+
+WORDS = "the model of masked diffusion language noise schedule a training".split()
+
+
+def brute_force_phrase(index, terms):
+    positions = [set(index.postings.get(term, ())) for term in terms]
+    first = sorted(positions[0])
+    return [p for p in first if all(p + shift in positions[shift] for shift in range(1, len(terms)))]
+
+
+def test_phrase_matches_brute_force():
+    random.seed(7)
+    index = PositionalIndex()
+    index.add(" ".join(random.choice(WORDS) for _ in range(5000)))
+
+    for query in ["masked diffusion", "the model of", "noise schedule a training", "model", "a a a"]:
+        terms = tokenize(query)
+        assert index.phrase(terms) == brute_force_phrase(index, terms), query
+
+
+def test_phrase_edge_cases():
+    index = PositionalIndex()
+    index.add("masked diffusion models beat masked language models")
+
+    assert index.phrase([]) == []
+    assert index.phrase(tokenize("unknown diffusion")) == []
+    assert index.phrase(tokenize("masked")) == [0, 4]
+    assert index.phrase(tokenize("masked diffusion")) == [0]
+    # the rarest term need not be the first one
+    assert index.phrase(tokenize("beat masked")) == [3]
+    assert index.phrase(tokenize("models masked")) == []
+
+
+def test_phrase_across_appended_pieces():
+    index = PositionalIndex()
+    index.add("the noise ", 0)
+    index.add("schedule matters", 10)
+
+    assert index.phrase(tokenize("noise schedule")) == [1]
+
+
+def test_search_phrase_then_near():
+    index = PositionalIndex()
+    index.add("we vary the noise schedule and report that the training loss of the model drops")
+
+    assert index.search("noise schedule") == ("phrase", [(3, 4)])
+    mode, spans = index.search('"noise schedule" loss', window=10)
+    assert mode == "near"
+    assert spans == [(3, 10)]
+    assert index.search('"noise schedule" unrelated') == ("near", [])
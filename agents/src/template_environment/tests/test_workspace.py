@@ -0,0 +1,62 @@
+import asyncio
+
+from tools.document_reader import DocumentReader
+from tools.workspace import DocumentWorkspace
+
+TEXTS = {name: f"{name} document text. " * 400 for name in ("a", "b", "c")}
+
+
+def loader(name, calls):
+    async def load(reader):
+        calls.append(name)
+        return await reader.load_text(TEXTS[name])
+    return load
+
+
+def document_size():
+    reader = DocumentReader(500)
+    asyncio.run(reader.load_text(TEXTS["a"]))
+    return reader.memory_bytes()
+
+
+def test_least_recently_used_documents_are_evicted_and_reloaded():
+    size = document_size()
+    workspace = DocumentWorkspace(lambda: DocumentReader(500), max_bytes=int(size * 2.5))
+    calls = []
+
+    async def run():
+        for name in ("a", "b"):
+            await workspace.open(name, loader(name, calls), title=name.upper())
+        # "a" becomes the most recently used
+        await workspace.get("a")
+        await workspace.open("c", loader("c", calls))
+        evicted = [doc_id for doc_id in TEXTS if not workspace.is_resident(doc_id)]
+        reloaded = await workspace.get("b")
+        return evicted, reloaded
+
+    evicted, reloaded = asyncio.run(run())
+    assert evicted == ["b"]
+    assert calls == ["a", "b", "c", "b"]
+    assert reloaded.text == TEXTS["b"]
+    assert workspace.metrics["reloads"] == 1
+
+    listing = {doc["doc_id"]: doc for doc in workspace.list()}
+    assert listing["b"]["current"] and listing["a"]["title"] == "A"
+    assert workspace.resident_bytes == sum(
+        workspace._resident[doc_id].memory_bytes() for doc_id in workspace._resident
+    ) <= workspace.max_bytes
+
+
+def test_reloaded_documents_keep_their_position():
+    size = document_size()
+    workspace = DocumentWorkspace(lambda: DocumentReader(500), max_bytes=int(size * 1.5))
+    calls = []
+
+    async def run():
+        (await workspace.open("a", loader("a", calls))).position = 4
+        await workspace.open("b", loader("b", calls))
+        return await workspace.get("a")
+
+    assert asyncio.run(run()).position == 4
+    assert not workspace.is_resident("b")
+    assert workspace.stats()["resident_bytes"] == workspace.resident_bytes
@@ -0,0 +1,147 @@
+import re
+import xml.etree.ElementTree as ET
+
+from tools.dedup_index import extract_arxiv_id, extract_arxiv_version
+
+# Fully qualified tag names, resolved once instead of per entry lookup
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+ENTRY_TAG = ATOM_NS + "entry"
+ID_TAG = ATOM_NS + "id"
+TITLE_TAG = ATOM_NS + "title"
+SUMMARY_TAG = ATOM_NS + "summary"
+PUBLISHED_TAG = ATOM_NS + "published"
+UPDATED_TAG = ATOM_NS + "updated"
+AUTHOR_TAG = ATOM_NS + "author"
+NAME_TAG = ATOM_NS + "name"
+LINK_TAG = ATOM_NS + "link"
+CATEGORY_TAG = ATOM_NS + "category"
+PRIMARY_CATEGORY_TAG = ARXIV_NS + "primary_category"
+
+BARE_ARXIV_ID = re.compile(
+    r"^(?:arxiv:)?(?P<id>\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?P<version>v\d+)?$", re.I
+)
+
+
+def normalize_arxiv_id(reference: str):
+    """
+    Normalize an arXiv reference to the form accepted by the API's `id_list`.
+
+    Parameters
+    ----------
+    reference : str
+        A bare id ("2506.18096", "2506.18096v2", "arXiv:cs/0101001") or an
+        abs/pdf/html URL.
+
+    Returns
+    -------
+    str or None
+        e.g. "2506.18096" or "2506.18096v2"; None if not an arXiv reference.
+    """
+    reference = (reference or "").strip()
+    match = BARE_ARXIV_ID.match(reference)
+    if match:
+        return match.group("id") + (match.group("version") or "")
+
+    arxiv_id = extract_arxiv_id(reference)
+    if arxiv_id is None:
+        return None
+    version = extract_arxiv_version(reference)
+    return arxiv_id if version is None else f"{arxiv_id}v{version}"
+
+
+def _text(element, tag: str) -> str:
+    return " ".join((element.findtext(tag) or "").split())
+
+
+def parse_atom_entry(entry):
+    """
+    Convert one Atom <entry> of an arXiv API response into paper metadata.
+
+    Parameters
+    ----------
+    entry : xml.etree.ElementTree.Element
+        A complete entry element.
+
+    Returns
+    -------
+    dict or None
+        arxiv_id (version-less), version, title, authors, summary, pdf_url,
+        published / updated (YYYY-MM-DD) and categories (primary first);
+        None for the error entries arXiv returns for unknown ids.
+    """
+    entry_url = (entry.findtext(ID_TAG) or "").strip()
+    arxiv_id = extract_arxiv_id(entry_url)
+    if arxiv_id is None:
+        return None
+
+    pdf_url = None
+    for link in entry.iter(LINK_TAG):
+        if link.get("title") == "pdf":
+            pdf_url = link.get("href")
+    if not pdf_url:
+        pdf_url = entry_url.replace("abs", "pdf")
+
+    primary = entry.find(PRIMARY_CATEGORY_TAG)
+    categories = [primary.get("term")] if primary is not None else []
+    categories += [c.get("term") for c in entry.iter(CATEGORY_TAG) if c.get("term") not in categories]
+
+    return {
+        "arxiv_id": arxiv_id,
+        "version": extract_arxiv_version(entry_url),
+        "title": _text(entry, TITLE_TAG),
+        "authors": [_text(author, NAME_TAG) for author in entry.iter(AUTHOR_TAG)],
+        "summary": (entry.findtext(SUMMARY_TAG) or "").strip(),
+        "pdf_url": pdf_url,
+        "published": (entry.findtext(PUBLISHED_TAG) or "")[:10],
+        "updated": (entry.findtext(UPDATED_TAG) or "")[:10],
+        "categories": categories,
+    }
+
+
+# ------------------------------------------------------------
+# Incremental Atom Parsing
+# ------------------------------------------------------------
+class AtomFeedParser:
+    """
+    Push parser for arXiv Atom feeds (iterparse over a byte stream).
+
+    Response chunks are fed as they arrive; each entry is converted as soon
+    as its closing tag has been seen and then dropped from the tree, so
+    parsing overlaps the download and memory stays flat for large pages.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+
+    def feed(self, data: bytes) -> list:
+        """Feed the next chunk of the response; return the entries it completed."""
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> list:
+        """Finish parsing; return any remaining entries."""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list:
+        papers = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag != ENTRY_TAG:
+                continue
+            paper = parse_atom_entry(element)
+            if paper is not None:
+                papers.append(paper)
+            self._root.remove(element)
+        return papers
+
+
+def parse_atom_feed(data: bytes) -> list:
+    """Parse a complete Atom document into paper metadata dicts."""
+    parser = AtomFeedParser()
+    return parser.feed(data) + parser.close()
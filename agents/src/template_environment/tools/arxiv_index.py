@@ -0,0 +1,560 @@
+import argparse
+import asyncio
+import gzip
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# arXiv query field prefixes -> index columns (None: all columns)
+FIELD_PREFIXES = {"ti": "title", "au": "authors", "abs": "summary", "cat": "categories", "all": None}
+BOOLEAN_OPERATORS = {"AND": "AND", "OR": "OR", "ANDNOT": "NOT"}
+QUERY_TOKEN = re.compile(r'(\()|(\))|(?:(\w+):)?(\[[^\]]*\]|"[^"]*"|[^\s()"]+)')
+QUERY_CATEGORY = re.compile(r'\bcat:"?([\w.\-]+)"?')
+
+# BM25 column weights: title, authors, summary, categories
+BM25_WEIGHTS = (8.0, 2.0, 1.0, 1.0)
+# best BM25 matches re-ranked with the recency boost
+RECENCY_CANDIDATES = 100
+RECENCY_CANDIDATES_PER_RESULT = 5
+IMPORT_BATCH_SIZE = 5000
+
+
+def to_match_query(query: str, any_term: bool = False, partial: bool = False):
+    """
+    Translate an arXiv API query into an FTS5 MATCH expression.
+
+    Field prefixes (ti:, au:, abs:, cat:, all:) map to index columns,
+    AND / OR / ANDNOT to FTS5 operators and every term becomes a quoted
+    string, so user input cannot produce FTS5 syntax. A query with terms
+    the index cannot search (other prefixes such as submittedDate:, or
+    [... TO ...] ranges) has no translation: matching only the rest of it
+    would answer a different, broader query.
+
+    Parameters
+    ----------
+    query : str
+        e.g. 'cat:cs.CL AND ti:"masked diffusion"' or 'diffusion language model'.
+    any_term : bool, optional
+        Join bare terms with OR instead of requiring all of them; terms with
+        a field prefix remain required.
+    partial : bool, optional
+        Drop the terms the index cannot search instead of giving up, for
+        free-text searches where a looser match is acceptable.
+
+    Returns
+    -------
+    str or None
+        MATCH expression, or None when the query cannot be translated
+        (or, with partial, when nothing searchable is left).
+    """
+    tokens = QUERY_TOKEN.findall(query)
+    # field-filtered terms (cat:, ti:, ...) stay required with any_term; the
+    # bare terms around them are OR-ed inside a group, joined by explicit ANDs
+    # (FTS5 only allows implicit AND between phrases)
+    group_bare = any_term and any(prefix for _, _, prefix, _ in tokens)
+    group_open = False
+    parts = []
+
+    def join_with_and():
+        if group_bare and parts and parts[-1] not in ("(", "AND", "OR", "NOT"):
+            parts.append("AND")
+
+    for open_paren, close_paren, prefix, term in tokens:
+        is_operator = not prefix and term in BOOLEAN_OPERATORS
+        if group_open and (open_paren or close_paren or is_operator or prefix):
+            parts.append(")")
+            group_open = False
+        if open_paren:
+            join_with_and()
+        if open_paren or close_paren:
+            parts.append(open_paren or close_paren)
+            continue
+        if is_operator:
+            parts.append(BOOLEAN_OPERATORS[term])
+            continue
+        if (prefix and prefix.lower() not in FIELD_PREFIXES) or term.startswith("["):
+            if not partial:
+                return None
+            continue
+
+        quoted = '"' + term.strip('"').replace('"', '""') + '"'
+        column = FIELD_PREFIXES.get((prefix or "").lower())
+        if any_term and not prefix:
+            if group_open:
+                parts.append("OR")
+            elif group_bare:
+                join_with_and()
+                parts.append("(")
+                group_open = True
+            elif parts and parts[-1] not in ("(", "AND", "OR", "NOT"):
+                parts.append("OR")
+        else:
+            join_with_and()
+        parts.append(f"{column}:{quoted}" if column else quoted)
+    if group_open:
+        parts.append(")")
+
+    # drop operators left dangling by removed terms
+    operators = ("AND", "OR", "NOT")
+    cleaned = []
+    for part in parts:
+        if part in operators and (not cleaned or cleaned[-1] in ("(", *operators)):
+            continue
+        if part == ")" and cleaned and cleaned[-1] in operators:
+            cleaned.pop()
+        cleaned.append(part)
+    while cleaned and cleaned[-1] in operators:
+        cleaned.pop()
+
+    if not any(part not in ("(", ")", *operators) for part in cleaned):
+        return None
+    return " ".join(cleaned)
+
+
+def _paper_row(paper: dict) -> tuple:
+    return (
+        paper["arxiv_id"],
+        paper.get("version") or 1,
+        paper["title"],
+        json.dumps(paper["authors"]),
+        paper["summary"],
+        " ".join(paper.get("categories") or []),
+        paper.get("published") or "",
+        paper.get("updated") or paper.get("published") or "",
+    )
+
+
+def _snapshot_paper(record: dict) -> dict:
+    """Convert one record of the public arXiv metadata snapshot (JSON lines)."""
+    versions = record.get("versions") or []
+    published = ""
+    if versions:
+        published = parsedate_to_datetime(versions[0]["created"]).date().isoformat()
+
+    if record.get("authors_parsed"):
+        authors = [" ".join(part for part in reversed(name[:2]) if part).strip() for name in record["authors_parsed"]]
+    else:
+        authors = [a.strip() for a in re.split(r",| and ", record.get("authors", "")) if a.strip()]
+
+    return {
+        "arxiv_id": record["id"],
+        "version": len(versions) or 1,
+        "title": " ".join(record.get("title", "").split()),
+        "authors": authors,
+        "summary": " ".join(record.get("abstract", "").split()),
+        "categories": record.get("categories", "").split(),
+        "published": published,
+        "updated": record.get("update_date") or published,
+    }
+
+
+# ------------------------------------------------------------
+# Local arXiv Metadata Index (SQLite FTS5)
+# ------------------------------------------------------------
+class ArxivMetadataIndex:
+    """
+    Full-text index of arXiv paper metadata, so searches run locally in
+    milliseconds instead of round trips to export.arxiv.org.
+
+    Built from the public metadata snapshot and kept current incrementally:
+    re-imports and API results only rewrite papers that changed. Results are
+    ranked by BM25 (title weighted highest), boosted towards recent papers,
+    and returned in the same form as `ArxivAPI.search`.
+
+    Attributes
+    ----------
+    recency_boost : float
+        Maximum relative BM25 boost, given to papers published today.
+    recency_scale_days : float
+        Age over which the boost decays by a factor of e.
+    """
+
+    def __init__(
+        self,
+        path: str = "cache/arxiv_index.sqlite",
+        recency_boost: float = 0.5,
+        recency_scale_days: float = 730.0,
+    ):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Location of the SQLite file. Use ":memory:" to disable persistence.
+        recency_boost : float, optional
+            Maximum relative score boost for new papers (0 disables it).
+        recency_scale_days : float, optional
+            Decay constant of the recency boost, in days.
+        """
+        self.recency_boost = recency_boost
+        self.recency_scale_days = recency_scale_days
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # searched from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                rowid INTEGER PRIMARY KEY,
+                arxiv_id TEXT NOT NULL UNIQUE,
+                version INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                authors TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                categories TEXT NOT NULL,
+                published TEXT NOT NULL,
+                updated TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                title, authors, summary, categories,
+                content='papers', content_rowid='rowid', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts (rowid, title, authors, summary, categories)
+                VALUES (new.rowid, new.title, new.authors, new.summary, new.categories);
+            END;
+            CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                INSERT INTO papers_fts (papers_fts, rowid, title, authors, summary, categories)
+                VALUES ('delete', old.rowid, old.title, old.authors, old.summary, old.categories);
+                INSERT INTO papers_fts (rowid, title, authors, summary, categories)
+                VALUES (new.rowid, new.title, new.authors, new.summary, new.categories);
+            END;
+            CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            """
+        )
+        self._db.commit()
+
+    # ------------------- WRITE -------------------
+
+    def upsert(self, papers: list) -> int:
+        """
+        Add papers or refresh changed ones (newer version or update date).
+
+        Parameters
+        ----------
+        papers : list[dict]
+            Paper metadata as returned by the arXiv feed parser.
+
+        Returns
+        -------
+        int
+            Number of papers inserted or updated.
+        """
+        rows = [_paper_row(paper) for paper in papers if paper.get("arxiv_id")]
+        with self._lock:
+            cursor = self._db.executemany(
+                "INSERT INTO papers (arxiv_id, version, title, authors, summary, categories, published, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (arxiv_id) DO UPDATE SET"
+                " version = excluded.version, title = excluded.title, authors = excluded.authors,"
+                " summary = excluded.summary, categories = excluded.categories,"
+                " published = excluded.published, updated = excluded.updated"
+                " WHERE excluded.version > papers.version OR excluded.updated > papers.updated",
+                rows,
+            )
+            self._db.commit()
+            return max(cursor.rowcount, 0)
+
+    def import_snapshot(self, path: str) -> dict:
+        """
+        Import (or re-import) the public arXiv metadata snapshot: one JSON
+        record per line, optionally gzip-compressed. Unchanged papers are
+        skipped, so re-running on a newer snapshot only applies the delta.
+
+        Parameters
+        ----------
+        path : str
+            Snapshot file (e.g. arxiv-metadata-oai-snapshot.json).
+
+        Returns
+        -------
+        dict
+            Number of records read, papers changed and malformed lines.
+        """
+        summary = {"read": 0, "changed": 0, "malformed": 0}
+        latest = ""
+        opener = gzip.open if str(path).endswith(".gz") else open
+
+        with opener(path, "rt", encoding="utf-8") as lines:
+            batch = []
+            for line in lines:
+                try:
+                    paper = _snapshot_paper(json.loads(line))
+                except (ValueError, KeyError, TypeError, IndexError):
+                    summary["malformed"] += 1
+                    continue
+                summary["read"] += 1
+                latest = max(latest, paper["published"])
+                batch.append(paper)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    summary["changed"] += self.upsert(batch)
+                    batch = []
+            summary["changed"] += self.upsert(batch)
+
+        if latest:
+            self.set_covered_until(latest)
+        return summary
+
+    def set_covered_until(self, day: str, category: str = None):
+        """
+        Record the date up to which the index holds every paper (YYYY-MM-DD),
+        of all categories (snapshot imports) or of one category (API updates).
+        """
+        key = f"covered_until:{category}" if category else "covered_until"
+        with self._lock:
+            current = self._db.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+            if current and current[0] >= day:
+                return
+            self._db.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, day))
+            self._db.commit()
+
+    # ------------------- READ -------------------
+
+    def covered_until(self, categories: list = None):
+        """
+        Date (YYYY-MM-DD) up to which the index is complete, or None if it was
+        never built from a snapshot. Papers added from live API results do not
+        advance it.
+
+        Parameters
+        ----------
+        categories : list[str], optional
+            Categories a query is restricted to: when `update_from_api`
+            harvested all of them since the snapshot, the index is complete up
+            to the oldest of their updates.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM index_meta WHERE key = 'covered_until'").fetchone()
+            if row is None:
+                return None
+            updates = [
+                self._db.execute("SELECT value FROM index_meta WHERE key = ?", (f"covered_until:{c}",)).fetchone()
+                for c in dict.fromkeys(categories or [])
+            ]
+        if updates and all(updates):
+            return max(row[0], min(update[0] for update in updates))
+        return row[0]
+
+    def category_coverage(self) -> dict:
+        """Categories updated from the live API since the snapshot, with their coverage dates."""
+        with self._lock:
+            rows = self._db.execute("SELECT key, value FROM index_meta WHERE key LIKE 'covered_until:%'").fetchall()
+        return {key.split(":", 1)[1]: value for key, value in sorted(rows)}
+
+    def _rows(self, match: str, limit: int, offset: int) -> list:
+        # the recency boost is bounded, so it only reorders the best BM25
+        # candidates instead of being computed for every matching paper
+        candidates = max(RECENCY_CANDIDATES, RECENCY_CANDIDATES_PER_RESULT * (offset + limit))
+        with self._lock:
+            return self._db.execute(
+                "SELECT p.arxiv_id, p.version, p.title, p.authors, p.summary, p.published,"
+                " c.score * (1.0 + ? * exp((julianday(p.published) - julianday('now')) / ?)) AS boosted"
+                " FROM (SELECT rowid, bm25(papers_fts, ?, ?, ?, ?) AS score FROM papers_fts"
+                "       WHERE papers_fts MATCH ? ORDER BY score LIMIT ?) AS c"
+                " JOIN papers p ON p.rowid = c.rowid"
+                # papers without a publication date have no boost (NULL): rank them last
+                " ORDER BY COALESCE(boosted, 0) LIMIT ? OFFSET ?",
+                (self.recency_boost, self.recency_scale_days, *BM25_WEIGHTS, match, candidates, limit, offset),
+            ).fetchall()
+
+    def search(self, query: str, page: int = 1, max_results: int = 10) -> list:
+        """
+        Search the index with an arXiv-style query.
+
+        All terms are required first; a plain query (no AND / OR) that finds
+        too few papers is retried with any term matching.
+
+        Parameters
+        ----------
+        query : str
+            Search query (e.g., "machine learning", "cat:cs.CL AND ti:diffusion").
+        page : int, optional
+            Page number.
+        max_results : int, optional
+            Number of items per page.
+
+        Returns
+        -------
+        list[dict]
+            Same fields as ArxivAPI.search: id, arxiv_id, title, authors,
+            summary, pdf_url, published.
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            If the query is not a valid boolean expression.
+        """
+        offset = (page - 1) * max_results
+        match = to_match_query(query)
+        if match is None:
+            return []
+
+        rows = self._rows(match, max_results, offset)
+        explicit = any(op in query.split() for op in BOOLEAN_OPERATORS)
+        if len(rows) < max_results and not explicit:
+            rows = self._rows(to_match_query(query, any_term=True), max_results, offset)
+
+        return [
+            {
+                "id": i,
+                "arxiv_id": arxiv_id,
+                "title": title,
+                "authors": json.loads(authors),
+                "summary": summary,
+                "pdf_url": f"http://arxiv.org/pdf/{arxiv_id}v{version}",
+                "published": published,
+            }
+            for i, (arxiv_id, version, title, authors, summary, published, _) in enumerate(rows)
+        ]
+
+    def get_many(self, arxiv_ids: list) -> dict:
+        """
+        Return stored metadata for version-less ids.
+
+        Returns
+        -------
+        dict[str, dict]
+            arxiv_id -> metadata in the form of the arXiv feed parser.
+        """
+        papers = {}
+        with self._lock:
+            for arxiv_id in arxiv_ids:
+                row = self._db.execute(
+                    "SELECT arxiv_id, version, title, authors, summary, categories, published, updated"
+                    " FROM papers WHERE arxiv_id = ?",
+                    (arxiv_id,),
+                ).fetchone()
+                if row is None:
+                    continue
+                papers[arxiv_id] = {
+                    "arxiv_id": row[0],
+                    "version": row[1],
+                    "title": row[2],
+                    "authors": json.loads(row[3]),
+                    "summary": row[4],
+                    "pdf_url": f"http://arxiv.org/pdf/{row[0]}v{row[1]}",
+                    "published": row[6],
+                    "updated": row[7],
+                    "categories": row[5].split(),
+                }
+        return papers
+
+    def stats(self) -> dict:
+        """Return the number of indexed papers and the coverage date."""
+        with self._lock:
+            papers = self._db.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        return {"papers": papers, "covered_until": self.covered_until(), "categories": self.category_coverage()}
+
+
+# ------------------------------------------------------------
+# Incremental Update from the Live API
+# ------------------------------------------------------------
+async def update_from_api(index: ArxivMetadataIndex, api, categories: list, page_size: int = 200, max_papers: int = 10000):
+    """
+    Add papers submitted since the index's coverage date, for some categories.
+
+    Coverage is tracked per category and only on top of an imported snapshot:
+    a harvest of a few categories says nothing about the others, and without
+    a snapshot the index only holds the last days of papers, so searches must
+    keep going to the live API.
+
+    Parameters
+    ----------
+    index : ArxivMetadataIndex
+        Index to update.
+    api : ArxivAPI
+        Live client (its request spacing applies).
+    categories : list[str]
+        arXiv categories to harvest, e.g. ["cs.CL", "cs.LG"].
+    page_size : int, optional
+        Papers requested per API call.
+    max_papers : int, optional
+        Stop after this many papers; coverage is only advanced when the
+        harvest completed.
+
+    Returns
+    -------
+    dict
+        Number of papers fetched and changed, and whether coverage advanced.
+    """
+    snapshot = index.covered_until()
+    if snapshot is None:
+        logger.warning("No arXiv snapshot imported: papers are added, but searches keep using the live API")
+    since = min(index.covered_until([c]) for c in categories) if snapshot else None
+    since = since or (date.today() - timedelta(days=7)).isoformat()
+    started = date.today().isoformat()
+    window = f"submittedDate:[{since.replace('-', '')}0000 TO {datetime.now():%Y%m%d%H%M}]"
+    query = "(" + " OR ".join(f"cat:{c}" for c in categories) + f") AND {window}"
+
+    summary = {"fetched": 0, "changed": 0, "coverage_advanced": False}
+    start = 0
+    while start < max_papers:
+        papers = await api.fetch({
+            "search_query": query, "start": start, "max_results": page_size,
+            "sortBy": "submittedDate", "sortOrder": "ascending",
+        })
+        summary["fetched"] += len(papers)
+        summary["changed"] += await asyncio.to_thread(index.upsert, papers)
+        if len(papers) < page_size:
+            if snapshot is not None:
+                for category in categories:
+                    index.set_covered_until(started, category)
+                summary["coverage_advanced"] = True
+            break
+        start += page_size
+    return summary
+
+
+def main():
+    """
+    Command line entry point, run from the template_environment directory:
+
+        python -m tools.arxiv_index import arxiv-metadata-oai-snapshot.json
+        python -m tools.arxiv_index update --categories cs.CL cs.LG
+        python -m tools.arxiv_index search "cat:cs.CL AND ti:diffusion"
+        python -m tools.arxiv_index stats
+    """
+    from configs.tools_config import arxiv_index_cfg
+
+    parser = argparse.ArgumentParser(description="Manage the local arXiv metadata index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = commands.add_parser("import", help="Import the public arXiv metadata snapshot (JSON lines).")
+    import_cmd.add_argument("snapshot", help="Snapshot file, optionally .gz.")
+    update_cmd = commands.add_parser("update", help="Fetch papers submitted since the last import or update.")
+    update_cmd.add_argument("--categories", nargs="+", required=True, help="arXiv categories, e.g. cs.CL cs.LG.")
+    search_cmd = commands.add_parser("search", help="Search the index.")
+    search_cmd.add_argument("query")
+    commands.add_parser("stats", help="Show index size and coverage.")
+
+    args = parser.parse_args()
+    index = ArxivMetadataIndex(**arxiv_index_cfg)
+
+    if args.command == "import":
+        print(json.dumps(index.import_snapshot(args.snapshot), indent=2))
+    elif args.command == "update":
+        # imported here: arxiv_tools itself depends on this module
+        from tools.arxiv_tools import ArxivAPI
+        print(json.dumps(asyncio.run(update_from_api(index, ArxivAPI(), args.categories)), indent=2))
+    elif args.command == "search":
+        start = time.perf_counter()
+        results = index.search(args.query)
+        for paper in results:
+            print(f"{paper['arxiv_id']}  {paper['published']}  {paper['title']}")
+        print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,31 @@
 from autogen_core.tools import FunctionTool
-import requests
-import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import date
 from markdownify import markdownify as html_to_md
-from pypdf import PdfReader
 import re
-import io
-
+from typing import List
+import asyncio
+import sqlite3
+
+from tools.arxiv_feed import AtomFeedParser, normalize_arxiv_id
+from tools.arxiv_index import QUERY_CATEGORY, ArxivMetadataIndex
+from tools.async_utils import gather_bounded
+from tools.citations import extract_references, title_similarity
+from tools.dedup_index import DedupIndex, document_key, extract_arxiv_id, extract_arxiv_version, simhash
+from tools.document_reader import DocumentReader
+from tools.html_extraction import arxiv_html_to_markdown
+from tools.http_client import HttpClient, get_http_client
+from tools.paper_store import PaperStore
+from tools.passage_index import EmbeddingReranker
+from tools.pdf_extraction import iter_pdf_pages
+from tools.result_rendering import DEFAULT_TOKEN_BUDGET, count_tokens, render_arxiv_results, truncate
+from tools.search_cache import SearchCache
+from tools.source_registry import SourceRegistry
 from tools.tool_tracing_utils import trace_span_info
+from tools.workspace import DocumentWorkspace
+from utils.logger import get_logger
+
+logger = get_logger()
 
 # ------------------------------------------------------------
 # Text Normalization Helper
@@ -43,15 +62,26 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+ARXIV_HTML_URL = "https://arxiv.org/html/{paper}"
+# HTML renderings shorter than this are failed conversions; use the PDF.
+MIN_HTML_TEXT_CHARS = 2000
+
+# Source format ("html" / "pdf") that worked per (arxiv_id, version) in this
+# process; persisted in the PaperStore when one is configured.
+_format_choices = {}
+
+
 # ------------------------------------------------------------
-# PDF Content Reader — Provides Scrolling Windows
+# Paper Content Reader — Provides Scrolling Windows
 # ------------------------------------------------------------
-class ArxivPaperReader:
+class ArxivPaperReader(DocumentReader):
     """
-    Extracts text from a PDF and provides scrollable "windows" of content.
+    Loads an arXiv paper (HTML rendering first, PDF as fallback) and
+    provides scrollable "windows" of content.
 
     This allows an LLM agent to read a paper chunk-by-chunk, simulating
-    a scrolling browser window.
+    a scrolling browser window. Windowing and keyword search are inherited
+    from DocumentReader.
 
     Attributes
     ----------
@@ -61,101 +91,203 @@ class ArxivPaperReader:
         The split windows of text.
     position : int
         Current window index.
+    source_format : str or None
+        "html" or "pdf", the source the loaded paper was extracted from.
     """
 
-    def __init__(self, window_size_chars=3000):
+    def __init__(self, window_size_chars=3000, http_client: HttpClient = None, store: PaperStore = None):
         """
         Initialize the reader.
 
+        Pages are extracted incrementally: loading returns once the first
+        window is available and the rest of the paper is extracted in the
+        background (see DocumentReader.load_stream).
+
         Parameters
         ----------
         window_size_chars : int, optional
-            Maximum size of each scrolling window, by async default 3000.
+            Maximum size of each scrolling window, by default 3000.
+        http_client : HttpClient, optional
+            Outbound HTTP layer; the process-wide client is used by default.
+        store : PaperStore, optional
+            Local paper store; papers found there are restored instead of
+            downloaded, and newly extracted ones are saved to it.
         """
-        self.window_size = window_size_chars
-        self.windows = []
-        self.position = 0
-
-    async def load_pdf(self, pdf_url: str) -> int:
+        super().__init__(window_size_chars)
+        self.http = http_client or get_http_client()
+        self.store = store
+        self.from_store = False
+        self.source_format = None
+        self.title = None
+        self._store_key = None
+
+    async def load_paper(self, pdf_url: str, title: str = None) -> int:
         """
-        Download and parse a PDF from a URL, extract text, clean it,
-        and split into windows.
+        Load an arXiv paper: from the local store if it was extracted before,
+        else from its HTML rendering, else from the PDF. Which of HTML / PDF
+        worked is remembered per paper id, so papers without HTML go straight
+        to the PDF next time. Only a definite "no rendering" answer is
+        remembered: after a timeout, server error or unusable page the PDF
+        is used this time and HTML is tried again on the next load.
 
         Parameters
         ----------
         pdf_url : str
-            Direct URL to the PDF.
+            PDF URL of the paper (as listed in search results).
+        title : str, optional
+            Paper title, saved with the paper in the store.
 
         Returns
         -------
         int
-            Number of windows created.
+            Number of windows ready so far (at least the first one).
         """
-        response = requests.get(pdf_url, timeout=15)
-        response.raise_for_status()
-
-        reader = PdfReader(io.BytesIO(response.content))
-        full_text = ""
+        self.title = title
+        arxiv_id = extract_arxiv_id(pdf_url)
+        version = extract_arxiv_version(pdf_url)
+        if arxiv_id is None:
+            return await self.load_pdf(pdf_url)
+
+        if self.store is not None:
+            snapshot = await asyncio.to_thread(self.store.get, arxiv_id, version)
+            if snapshot is not None:
+                self.from_store = True
+                return self.restore(snapshot)
+
+        key = (arxiv_id, version)
+        if await self._known_format(key) != "pdf":
+            try:
+                num_windows = await self.load_html(arxiv_id, version)
+            except Exception as e:
+                # network, server and parser errors alike: fall back to the PDF
+                logger.info("HTML rendering of %s unavailable for now (%s), using the PDF", arxiv_id, e)
+            else:
+                if num_windows is not None:
+                    await self._remember_format(key, "html")
+                    return num_windows
+                await self._remember_format(key, "pdf")
+
+        return await self.load_pdf(pdf_url, store_key=key)
+
+    async def _known_format(self, key: tuple):
+        if key not in _format_choices and self.store is not None:
+            known = await asyncio.to_thread(self.store.get_format, *key)
+            if known is not None:
+                _format_choices[key] = known
+        return _format_choices.get(key)
+
+    async def _remember_format(self, key: tuple, source_format: str):
+        if _format_choices.get(key) == source_format:
+            return
+        _format_choices[key] = source_format
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set_format, *key, source_format)
+
+    async def load_html(self, arxiv_id: str, version: int = None):
+        """
+        Load a paper from its arXiv HTML rendering, with sections taken from
+        the document's own headings.
 
-        for page in reader.pages:
-            extracted = page.extract_text() or ""
-            full_text += extracted + "\n\n"
+        Parameters
+        ----------
+        arxiv_id : str
+            Version-less arXiv id.
+        version : int, optional
+            Paper version; the latest rendering is used when omitted.
 
-        full_text = clean_text(full_text)
+        Returns
+        -------
+        int or None
+            Number of windows, or None when arXiv has no HTML rendering of
+            the paper (404).
+
+        Raises
+        ------
+        httpx.HTTPError
+            If the rendering could not be fetched (timeout, server error).
+        ValueError
+            If the page holds too little text to be the paper.
+        """
+        url = ARXIV_HTML_URL.format(paper=arxiv_id + (f"v{version}" if version else ""))
+        response = await self.http.get(url, timeout=15)
+        if response.status_code in (404, 410):
+            return None
+        response.raise_for_status()
 
-        self.windows = [
-            full_text[i:i + self.window_size]
-            for i in range(0, len(full_text), self.window_size)
-        ]
-        self.position = 0
+        markdown = await asyncio.to_thread(arxiv_html_to_markdown, response.text)
+        text = clean_text(markdown or "")
+        if len(text) < MIN_HTML_TEXT_CHARS:
+            raise ValueError(f"HTML rendering has only {len(text)} characters of text")
 
-        return len(self.windows)
+        self.from_store = False
+        self.source_format = "html"
+        self._store_key = (arxiv_id, version)
+        num_windows = await self.load_text(text)
+        await self.on_loaded()
+        return num_windows
 
-    async def get_window(self, index: int) -> str:
+    async def load_pdf(self, pdf_url: str, store_key: tuple = None) -> int:
         """
-        Return a specific window of text.
+        Download a PDF from a URL and start extracting it into windows.
 
         Parameters
         ----------
-        index : int
-            Window index.
+        pdf_url : str
+            Direct URL to the PDF.
+        store_key : tuple, optional
+            (arxiv_id, version) under which the paper is saved to the store
+            once fully extracted.
 
         Returns
         -------
-        str or dict
-            Text of the window, or error dict if out of range.
+        int
+            Number of windows ready so far (at least the first one).
         """
-        if index < 0 or index >= len(self.windows):
-            return {"error": "Window index out of range"}
-        return self.windows[index]
+        response = await self.http.get(pdf_url, timeout=15)
+        response.raise_for_status()
 
-    async def next_window(self) -> str:
-        """
-        Move to the next window.
+        return await self.load_pdf_bytes(response.content, store_key=store_key)
 
-        Returns
-        -------
-        str or dict
-            Next window text or error dict.
+    async def load_pdf_bytes(self, data: bytes, store_key: tuple = None) -> int:
         """
-        if self.position + 1 >= len(self.windows):
-            return {"error": "Already at last window"}
-        self.position += 1
-        return await self.get_window(self.position)
+        Start extracting an already downloaded PDF into windows, page by page.
 
-    async def prev_window(self) -> str:
-        """
-        Move to the previous window.
+        Parameters
+        ----------
+        data : bytes
+            Raw PDF file content.
+        store_key : tuple, optional
+            (arxiv_id, version) under which the paper is saved to the store
+            once fully extracted.
 
         Returns
         -------
-        str or dict
-            Previous window text or error dict.
+        int
+            Number of windows ready so far (at least the first one).
         """
-        if self.position - 1 < 0:
-            return {"error": "Already at first window"}
-        self.position -= 1
-        return await self.get_window(self.position)
+        self.from_store = False
+        self.source_format = "pdf"
+        self._store_key = store_key
+        return await self.load_stream(self._page_texts(data))
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "source_format": self.source_format}
+
+    def restore(self, snapshot: dict) -> int:
+        num_windows = super().restore(snapshot)
+        self.source_format = snapshot.get("source_format", "pdf")
+        return num_windows
+
+    async def on_loaded(self):
+        if self.store is None or self._store_key is None or self.load_error is not None:
+            return
+        arxiv_id, version = self._store_key
+        await asyncio.to_thread(self.store.put, arxiv_id, version, self.snapshot(), self.title)
+
+    @staticmethod
+    async def _page_texts(data: bytes):
+        async for _, text in iter_pdf_pages(data):
+            yield clean_text(text)
 
 
 # ------------------------------------------------------------
@@ -163,16 +295,75 @@ class ArxivPaperReader:
 # ------------------------------------------------------------
 class ArxivAPI:
     """
-    A minimal wrapper around the ArXiv API, supporting searching
-    and extracting metadata needed to locate PDFs.
+    A minimal wrapper around the ArXiv API, supporting searching,
+    batched metadata lookups by id and extracting metadata needed to
+    locate PDFs.
+
+    Responses are streamed and parsed incrementally. Requests go through the
+    shared HttpClient, which spaces calls to export.arxiv.org according to
+    arXiv's usage policy.
 
     Methods
     -------
     search(query, page, max_results)
         Perform a paginated ArXiv search.
+    lookup(arxiv_ids)
+        Fetch metadata for known ids, many per request.
+    find_titles(titles)
+        Match paper titles to arXiv papers, several per request.
     """
 
     ARXIV_URL = "http://export.arxiv.org/api/query"
+    # Fields of each search result (besides its "id" in the result list)
+    SEARCH_FIELDS = ("arxiv_id", "title", "authors", "summary", "pdf_url", "published")
+
+    def __init__(
+        self,
+        cache: SearchCache = None,
+        http_client: HttpClient = None,
+        id_batch_size: int = 50,
+        title_batch_size: int = 10,
+        max_cached_papers: int = 5000,
+        timeout: float = 10.0,
+        index: ArxivMetadataIndex = None,
+        max_index_lag_days: float = 2.0,
+    ):
+        """
+        Parameters
+        ----------
+        cache : SearchCache, optional
+            Shared search cache; when provided, repeated queries are served
+            locally instead of hitting the ArXiv API.
+        http_client : HttpClient, optional
+            Outbound HTTP layer (applies arXiv's request spacing); the
+            process-wide client is used by default.
+        id_batch_size : int, optional
+            Maximum number of ids sent in one `id_list` request.
+        title_batch_size : int, optional
+            Maximum number of titles OR-ed into one title search.
+        max_cached_papers : int, optional
+            Number of paper metadata records remembered in memory, so ids seen
+            in earlier searches or lookups are not requested again.
+        timeout : float, optional
+            Request timeout in seconds.
+        index : ArxivMetadataIndex, optional
+            Local metadata index; when built, searches and lookups are served
+            from it and the live API is only asked about papers newer than it.
+        max_index_lag_days : float, optional
+            How far the index may lag behind today before searches also query
+            the live API for papers submitted since.
+        """
+        self.cache = cache
+        self.http = http_client or get_http_client()
+        self.id_batch_size = id_batch_size
+        self.title_batch_size = title_batch_size
+        self.max_cached_papers = max_cached_papers
+        self.timeout = timeout
+        self.index = index
+        self.max_index_lag_days = max_index_lag_days
+        self.metrics = {"lookups": 0, "lookup_requests": 0, "lookup_hits": 0, "index_searches": 0}
+
+        self._papers = OrderedDict()
 
     async def search(self, query: str, page: int = 1, max_results: int = 10):
         """
@@ -192,47 +383,221 @@ class ArxivAPI:
         list[dict]
             List of paper metadata dictionaries, each containing:
             - id
+            - arxiv_id
             - title
             - authors
             - summary
             - pdf_url
+            - published
         """
+        if self.index is not None:
+            results = await self._search_index(query, page, max_results)
+            if results:
+                return results
+
+        return await self._search_live(query, page, max_results)
+
+    async def _search_live(self, query: str, page: int, max_results: int):
+        if self.cache is None:
+            return await self._search(query, page, max_results)
+
+        return await self.cache.get_or_fetch(
+            "arxiv", query, page, max_results,
+            lambda: self._search(query, page, max_results),
+        )
+
+    async def _search(self, query: str, page: int, max_results: int):
         start = (page - 1) * max_results
 
         params = {"search_query": query, "start": start, "max_results": max_results}
-        response = requests.get(self.ARXIV_URL, params=params, timeout=10)
-        response.raise_for_status()
+        papers = await self.fetch(params)
+        for paper in papers:
+            self._remember(paper)
+        if self.index is not None:
+            await asyncio.to_thread(self.index.upsert, papers)
+
+        return [
+            {"id": i, **{field: paper[field] for field in self.SEARCH_FIELDS}}
+            for i, paper in enumerate(papers)
+        ]
+
+    async def _search_index(self, query: str, page: int, max_results: int):
+        """
+        Search the local index; None when it was never built, cannot parse the
+        query or finds nothing (the caller then asks the live API).
+        """
+        covered_until = await asyncio.to_thread(self.index.covered_until, QUERY_CATEGORY.findall(query))
+        if covered_until is None:
+            return None
+        try:
+            results = await asyncio.to_thread(self.index.search, query, page, max_results)
+        except sqlite3.Error as e:
+            logger.debug("Local arXiv index cannot run %r: %s", query, e)
+            return None
+        if not results:
+            return None
+        self.metrics["index_searches"] += 1
+
+        lag = date.today() - date.fromisoformat(covered_until)
+        if page != 1 or lag.days <= self.max_index_lag_days:
+            return results
+
+        # the index cannot know papers submitted after it was built
+        since = covered_until.replace("-", "")
+        recent_query = f"({query}) AND submittedDate:[{since}0000 TO 300001010000]"
+        try:
+            recent = await self._search_live(recent_query, 1, max(1, max_results // 2))
+        except Exception as e:
+            logger.warning("Live arXiv search for recent papers failed: %s", e)
+            return results
+
+        merged = {}
+        for paper in recent + results:
+            merged.setdefault(paper["arxiv_id"], paper)
+        return [{**paper, "id": i} for i, paper in enumerate(list(merged.values())[:max_results])]
+
+    async def fetch(self, params: dict) -> list:
+        """
+        Run a raw API query (search_query / id_list / start / max_results /
+        sortBy ...) and return the parsed papers, in feed order.
+        """
+        parser = AtomFeedParser()
+        papers = []
+        async with self.http.stream("GET", self.ARXIV_URL, params=params, timeout=self.timeout) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                papers.extend(parser.feed(chunk))
+        papers.extend(parser.close())
+        return papers
+
+    # ------------------- LOOKUP BY ID -------------------
+
+    def _remember(self, paper: dict, *keys: str):
+        versioned = f"{paper['arxiv_id']}v{paper['version']}" if paper["version"] else paper["arxiv_id"]
+        for key in (versioned, *keys):
+            self._papers[key] = paper
+            self._papers.move_to_end(key)
+        while len(self._papers) > self.max_cached_papers:
+            self._papers.popitem(last=False)
+
+    async def lookup(self, arxiv_ids: list) -> dict:
+        """
+        Fetch metadata for known arXiv ids.
+
+        Ids already seen are answered from memory; the rest are split into
+        `id_list` requests of up to `id_batch_size` ids. All batches are queued
+        at once and the HTTP client releases them back to back at arXiv's
+        allowed rate, so resolving 100 ids costs two requests rather than 100.
+
+        Parameters
+        ----------
+        arxiv_ids : list[str]
+            Ids ("2506.18096", "2506.18096v2", "arXiv:cs/0101001") or arXiv URLs.
+
+        Returns
+        -------
+        dict[str, dict]
+            Normalized id -> metadata (arxiv_id, version, title, authors,
+            summary, pdf_url, published, updated, categories). Ids arXiv
+            does not know, or whose request failed, are absent.
+        """
+        wanted = list(dict.fromkeys(filter(None, map(normalize_arxiv_id, arxiv_ids))))
+        missing = [arxiv_id for arxiv_id in wanted if arxiv_id not in self._papers]
+        if self.index is not None and missing:
+            # version-less ids the local index knows need no request
+            for arxiv_id, paper in (await asyncio.to_thread(self.index.get_many, missing)).items():
+                self._remember(paper, arxiv_id)
+            missing = [arxiv_id for arxiv_id in missing if arxiv_id not in self._papers]
+        self.metrics["lookups"] += len(wanted)
+        self.metrics["lookup_hits"] += len(wanted) - len(missing)
+
+        batches = [missing[i:i + self.id_batch_size] for i in range(0, len(missing), self.id_batch_size)]
+        outcomes = await asyncio.gather(*(self._lookup_batch(batch) for batch in batches), return_exceptions=True)
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("arXiv lookup of %d ids failed: %s", len(batch), outcome)
+
+        return {arxiv_id: self._papers[arxiv_id] for arxiv_id in wanted if arxiv_id in self._papers}
+
+    async def _lookup_batch(self, batch: list):
+        self.metrics["lookup_requests"] += 1
+        papers = await self.fetch({"id_list": ",".join(batch), "max_results": len(batch)})
+
+        requested = set(batch)
+        for paper in papers:
+            # a version-less request resolves to the latest version
+            keys = [paper["arxiv_id"]] if paper["arxiv_id"] in requested else []
+            self._remember(paper, *keys)
+        if self.index is not None:
+            await asyncio.to_thread(self.index.upsert, papers)
+
+    # ------------------- LOOKUP BY TITLE -------------------
+
+    async def find_titles(self, titles: list, min_similarity: float = 0.7) -> dict:
+        """
+        Match paper titles (e.g. from a bibliography) to arXiv papers.
 
-        root = ET.fromstring(response.text)
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
+        Titles are first searched in the local index, when built; the rest
+        are OR-ed together, `title_batch_size` per request, into live title
+        searches that are queued at once like id lookups.
 
-        results = []
+        Parameters
+        ----------
+        titles : list[str]
+            Titles, possibly with small extraction errors.
+        min_similarity : float, optional
+            Minimum term overlap (Jaccard) between a title and a paper's title.
 
-        for i, entry in enumerate(root.findall("atom:entry", ns)):
-            title = entry.find("atom:title", ns).text.strip()
-            summary = entry.find("atom:summary", ns).text.strip()
-            authors = [a.find("atom:name", ns).text.strip()
-                       for a in entry.findall("atom:author", ns)]
+        Returns
+        -------
+        dict[str, dict]
+            Title -> paper metadata, for the titles that matched.
+        """
+        remaining = list(dict.fromkeys(title for title in titles if title))
+        found = {}
+
+        if self.index is not None and await asyncio.to_thread(self.index.covered_until):
+            def search_index():
+                for title in remaining:
+                    candidates = self.index.search(f'ti:"{_title_terms(title)}"', 1, 3)
+                    match = _best_title_match(title, candidates, min_similarity)
+                    if match is not None:
+                        found[title] = match
+            await asyncio.to_thread(search_index)
+            remaining = [title for title in remaining if title not in found]
+
+        batches = [
+            remaining[i:i + self.title_batch_size] for i in range(0, len(remaining), self.title_batch_size)
+        ]
+        outcomes = await asyncio.gather(*(self._title_batch(batch) for batch in batches), return_exceptions=True)
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("arXiv title search for %d titles failed: %s", len(batch), outcome)
+                continue
+            for title in batch:
+                match = _best_title_match(title, outcome, min_similarity)
+                if match is not None:
+                    found[title] = match
+        return found
 
-            # Extract PDF link
-            pdf_url = None
-            for link in entry.findall("atom:link", ns):
-                if link.attrib.get("title") == "pdf":
-                    pdf_url = link.attrib["href"]
+    async def _title_batch(self, batch: list) -> list:
+        query = " OR ".join(f'ti:"{_title_terms(title)}"' for title in batch)
+        papers = await self.fetch({"search_query": query, "max_results": 3 * len(batch)})
+        for paper in papers:
+            self._remember(paper)
+        if self.index is not None:
+            await asyncio.to_thread(self.index.upsert, papers)
+        return papers
 
-            if not pdf_url:
-                id_url = entry.find("atom:id", ns).text
-                pdf_url = id_url.replace("abs", "pdf")
 
-            results.append({
-                "id": i,
-                "title": title,
-                "authors": authors,
-                "summary": summary,
-                "pdf_url": pdf_url,
-            })
+def _title_terms(title: str) -> str:
+    return " ".join(re.findall(r"\w+", title))
 
-        return results
+
+def _best_title_match(title: str, papers: list, min_similarity: float):
+    scored = [(title_similarity(title, paper["title"]), paper) for paper in papers]
+    best = max(scored, key=lambda item: item[0], default=(0.0, None))
+    return best[1] if best[0] >= min_similarity else None
 
 
 # ------------------------------------------------------------
@@ -242,14 +607,25 @@ class ArxivSearchTool:
     """
     Provides an Autogen FunctionTool interface for:
     - ArXiv search
-    - Opening a paper
+    - Opening papers (several can stay open, addressed by doc_id)
     - Scrolling through PDF content in windows
     - Changing pages of search results
 
     This class is designed to be plugged directly into an Autogen agent.
     """
 
-    def __init__(self, api: ArxivAPI, window_size_chars: int = 3000):
+    def __init__(
+        self,
+        api: ArxivAPI,
+        window_size_chars: int = 3000,
+        max_concurrency: int = 3,
+        dedup_index: DedupIndex = None,
+        paper_store: PaperStore = None,
+        reranker: EmbeddingReranker = None,
+        workspace_max_bytes: int = 256 * 1024 * 1024,
+        token_budgets: dict = None,
+        source_registry: SourceRegistry = None,
+    ):
         """
         Initialize the tool.
 
@@ -259,14 +635,41 @@ class ArxivSearchTool:
             Backend API used for searching.
         window_size_chars : int, optional
             Size of PDF text windows for scrolling.
+        max_concurrency : int, optional
+            Maximum number of searches in flight for batch searches.
+        dedup_index : DedupIndex, optional
+            Session-level index of opened documents, shared with the web tools.
+        paper_store : PaperStore, optional
+            Persistent store of extracted papers, shared across sessions.
+        reranker : EmbeddingReranker, optional
+            Embedding re-ranking for find_passages; BM25 order is used without it.
+        workspace_max_bytes : int, optional
+            Memory budget for papers kept open at the same time; least recently
+            used papers are evicted and reloaded from `paper_store` on access.
+        token_budgets : dict[str, int], optional
+            Token budget of the rendered results, per tool name (e.g. {"search_arxiv": 700});
+            DEFAULT_TOKEN_BUDGET for tools not listed.
+        source_registry : SourceRegistry, optional
+            Session-level citation ids of surfaced sources, shared with the web tools.
         """
         self.api = api
+        self.max_concurrency = max_concurrency
+        self.reranker = reranker
+        self.dedup = dedup_index or DedupIndex()
+        self.sources = source_registry or SourceRegistry()
+        self.paper_store = paper_store
+        self.token_budgets = token_budgets or {}
         self.current_query = None
         self.current_page = 1
         self.current_results = []
+        # background fingerprinting of opened papers, referenced until done
+        self._fingerprint_tasks = set()
 
-        # Reader for opened PDFs
-        self.reader = ArxivPaperReader(window_size_chars)
+        # Opened papers, one reader each, keyed by doc_id ("arxiv:<id>")
+        self.workspace = DocumentWorkspace(
+            lambda: ArxivPaperReader(window_size_chars, http_client=api.http, store=paper_store),
+            max_bytes=workspace_max_bytes,
+        )
 
         # Tools exposed to Autogen
         self.search_tool = FunctionTool(self.search, name="search_arxiv", description=self.search.__doc__)
@@ -277,7 +680,11 @@ class ArxivSearchTool:
         self.next_page_tool = FunctionTool(self.next_page, name="next_arxiv_page", description=self.next_page.__doc__)
         self.abstract_tool = FunctionTool(self.get_abstract, name="get_abstract", description=self.get_abstract.__doc__)
         self.keyword_tool = FunctionTool(self.keyword_search, name="search_keyword", description=self.keyword_search.__doc__)
-
+        self.passages_tool = FunctionTool(self.find_passages, name="find_passages", description=self.find_passages.__doc__)
+        self.batch_search_tool = FunctionTool(self.search_batch, name="search_arxiv_batch", description=self.search_batch.__doc__)
+        self.list_papers_tool = FunctionTool(self.list_open_papers, name="list_open_papers", description=self.list_open_papers.__doc__)
+        self.lookup_tool = FunctionTool(self.lookup_papers, name="lookup_arxiv_papers", description=self.lookup_papers.__doc__)
+        self.related_tool = FunctionTool(self.related_papers, name="related_papers", description=self.related_papers.__doc__)
 
     # ------------------- SEARCH -------------------
 
@@ -303,19 +710,111 @@ class ArxivSearchTool:
 
         Returns
         -------
-        dict
-            Search metadata including results list.
+        str
+            Compact table of results: id, title, first authors, date and the start of the abstract.
         """
         self.current_query = query
         self.current_page = page
-        self.current_results = await self.api.search(query, page)
+        self.current_results = self.dedup.collapse_results(await self.api.search(query, page), url_field="pdf_url")
 
-        return {
-            "query": query,
-            "page": page,
-            "results": self.current_results
-        }
+        return self._render_results("search_arxiv", f"query: {query} | page {page}")
+
+    def _render_results(self, tool_name: str, header: str, budget_used: int = 0) -> str:
+        self.current_results = self.sources.register_results(self.current_results, url_field="pdf_url", tool=tool_name)
+        budget = self.token_budgets.get(tool_name, DEFAULT_TOKEN_BUDGET) - budget_used
+        return render_arxiv_results(self.current_results, budget, header)
     
+    @trace_span_info
+    async def search_batch(self, queries: List[str], page: int = 1):
+        """
+        Run several ArXiv searches concurrently and return one merged, deduplicated result list
+        (replaces the current search results).
+
+        Use this instead of calling search_arxiv repeatedly when you already know the queries you need.
+
+        Parameters
+        ----------
+        queries : List[str]
+            Search queries to run (e.g. ["diffusion language model", "cat:cs.CL AND ti:diffusion"]).
+        page : int, optional
+            Result page fetched for every query.
+
+        Returns
+        -------
+        str
+            Compact table of merged results; each result has a stable "id" (usable with
+            open_paper and get_abstract) and notes the queries that found it ("q0,2").
+        """
+        queries = [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+        if not queries:
+            return {"error": "No queries provided"}
+
+        responses = await gather_bounded(
+            [lambda q=q: self.api.search(q, page) for q in queries],
+            self.max_concurrency,
+        )
+
+        merged = {}
+        errors = {}
+        for query_index, (query, results) in enumerate(zip(queries, responses)):
+            if isinstance(results, Exception):
+                errors[query] = str(results)
+                continue
+            for paper in results:
+                # the same paper can be listed under different versions
+                key = document_key(paper["pdf_url"])
+                if key in merged:
+                    merged[key]["queries"].append(query_index)
+                    continue
+                merged[key] = {**paper, "queries": [query_index]}
+
+        self.current_query = None
+        self.current_page = page
+        self.current_results = self.dedup.collapse_results(list(merged.values()), url_field="pdf_url")
+
+        header = "queries: " + "; ".join(f"q{i}={q}" for i, q in enumerate(queries)) + f" | page {page}"
+        if errors:
+            header += "\nfailed: " + "; ".join(f"{q} ({e})" for q, e in errors.items())
+        return self._render_results("search_arxiv_batch", header)
+
+    @trace_span_info
+    async def lookup_papers(self, arxiv_ids: List[str]):
+        """
+        Look up papers whose arXiv ids you already know (e.g. cited in a paper or a web page)
+        and make them the current search results, so they can be opened with open_paper.
+
+        Many ids are resolved with a single request: pass them all in one call.
+
+        Parameters
+        ----------
+        arxiv_ids : List[str]
+            arXiv ids or URLs (e.g. ["2506.18096", "2401.01234v2", "https://arxiv.org/abs/1706.03762"]).
+
+        Returns
+        -------
+        str
+            Results in the same form as search_arxiv, plus the ids that were not found.
+        """
+        papers = await self.api.lookup(arxiv_ids)
+        if not papers:
+            return {"error": "None of the ids were found on arXiv", "not_found": arxiv_ids}
+
+        self.current_query = None
+        self.current_page = 1
+        self.current_results = self.dedup.collapse_results(
+            [
+                {"id": i, **{field: paper[field] for field in ArxivAPI.SEARCH_FIELDS}}
+                for i, paper in enumerate(papers.values())
+            ],
+            url_field="pdf_url",
+        )
+
+        header = f"{len(papers)} of {len(arxiv_ids)} ids found"
+        not_found = [i for i in arxiv_ids if normalize_arxiv_id(i) not in papers]
+        if not_found:
+            header += " | not found: " + ", ".join(not_found)
+        return self._render_results("lookup_arxiv_papers", header)
+
     @trace_span_info
     async def get_abstract(self, result_id: int):
         """
@@ -331,7 +830,7 @@ class ArxivSearchTool:
         Returns
         -------
         dict
-            Dictionary containing title, authors, and abstract (summary).
+            Full details: citation id, title, all authors, arXiv id, publication date, PDF URL and abstract.
         """
         if not self.current_results:
             return {"error": "No active search results."}
@@ -341,18 +840,26 @@ class ArxivSearchTool:
 
         paper = self.current_results[result_id]
 
-        return {
+        details = {
+            "citation": self.sources.register(paper["pdf_url"], paper["title"], tool="get_abstract", opened=True),
             "title": paper["title"],
             "authors": paper["authors"],
-            "abstract": paper["summary"]
+            "arxiv_id": paper.get("arxiv_id"),
+            "published": paper.get("published"),
+            "pdf_url": paper["pdf_url"],
+            "abstract": paper["summary"],
         }
+        return {key: value for key, value in details.items() if value is not None}
 
     # ------------------- OPEN PAPER + LOAD PDF -------------------
     @trace_span_info
     async def open_paper(self, result_id: int):
         """
-        Open a paper by ID from the current search results,
-        download the PDF, extract text, and create windows.
+        Open a paper by ID from the current search results, load its text
+        (arXiv HTML version when available, otherwise the PDF) and create windows.
+
+        Previously opened papers stay available: pass their "doc_id" to the window and
+        search tools to go back to them (see list_open_papers).
 
         Parameters
         ----------
@@ -362,7 +869,8 @@ class ArxivSearchTool:
         Returns
         -------
         dict
-            Paper metadata and first window of content.
+            Paper doc_id, citation id (cite it in notes and answers as e.g. [S12]),
+            metadata and first window of content.
         """
         if not self.current_results:
             return {"error": "No active search results."}
@@ -372,130 +880,286 @@ class ArxivSearchTool:
 
         paper = self.current_results[result_id]
         pdf_url = paper["pdf_url"]
-        num_windows = await self.reader.load_pdf(pdf_url)
-
-        return {
+        doc_id = document_key(pdf_url)
+
+        # The paper's full text is only skipped when it is already in the workspace
+        # (under any version or link). Having read its abs page with open_webpage, or
+        # another version that was evicted since, is no reason to withhold the paper.
+        if doc_id in self.workspace:
+            # opened before in this session: no download, no re-parse
+            reader = await self.workspace.get(doc_id)
+            reader.position = 0
+            return await self._paper_response(doc_id, paper, reader)
+
+        reader = await self.workspace.open(
+            doc_id,
+            lambda r: r.load_paper(pdf_url, paper["title"]),
+            title=paper["title"],
+            url=pdf_url,
+        )
+        # fingerprinted once the background extraction has finished
+        self.dedup.register(pdf_url, "", title=paper["title"], source="open_paper")
+        task = asyncio.create_task(self._fingerprint_when_loaded(pdf_url, reader))
+        self._fingerprint_tasks.add(task)
+        task.add_done_callback(self._fingerprint_tasks.discard)
+
+        return await self._paper_response(doc_id, paper, reader)
+
+    async def _paper_response(self, doc_id: str, paper: dict, reader: ArxivPaperReader) -> dict:
+        response = {
+            "doc_id": doc_id,
+            "citation": self.sources.register(paper["pdf_url"], paper["title"], tool="open_paper", opened=True),
             "title": paper["title"],
             "authors": paper["authors"],
-            "total_windows": num_windows,
-            "first_window": await self.reader.get_window(0)
+            "format": reader.source_format,
+            "first_window": await reader.get_window(0)
         }
-    
+        if reader.complete:
+            response["total_windows"] = len(reader.windows)
+            if reader.sections:
+                response["sections"] = reader.section_windows()
+        else:
+            response["windows_ready"] = len(reader.windows)
+            response["loading"] = "The rest of the paper is still being extracted; later windows will be returned once ready."
+        return response
+
+    async def _fingerprint_when_loaded(self, pdf_url: str, reader: ArxivPaperReader):
+        try:
+            await reader.wait_until_loaded()
+            self.dedup.set_fingerprint(pdf_url, await asyncio.to_thread(simhash, reader.text))
+            self.sources.set_content(pdf_url, reader.text)
+        except Exception as e:
+            # the paper stays readable; it is only not recognised as a near-duplicate
+            logger.warning("Fingerprinting %s failed: %s", pdf_url, e)
+
+    async def _reader(self, doc_id: str = None):
+        reader = await self.workspace.get(doc_id)
+        if reader is None:
+            if doc_id:
+                return None, {"error": f"Unknown doc_id {doc_id!r}. Use list_open_papers to see open papers."}
+            return None, {"error": "No PDF loaded. Use open_paper first."}
+        return reader, None
+
     @trace_span_info
-    async def keyword_search(self, keyword: str, window_words: int = 256):
+    async def list_open_papers(self):
+        """
+        List the papers opened in this session with their doc_id, title, number of windows
+        and current reading position. Use a doc_id with the window and search tools to
+        switch between papers without re-opening them.
+
+        Returns
+        -------
+        dict
+            Open papers, the current one marked with "current": true.
         """
-        Search for a single keyword in the currently opened paper and return 
+        return {"papers": self.workspace.list()}
+
+    @trace_span_info
+    async def related_papers(self, doc_id: str = None, max_results: int = 20):
+        """
+        List the papers cited by an opened paper (its bibliography, plus arXiv ids and DOIs
+        in its text), resolved to arXiv papers in one call and ranked by how often the paper
+        cites them. Use this instead of searching for references one by one.
+
+        The resolved papers become the current search results: open any of them with
+        open_paper(result_id).
+
+        References are matched by arXiv id (including arXiv DOIs, 10.48550/arXiv.*) or
+        by title. Other DOIs are not looked up: a bibliography entry with such a DOI is
+        matched by its title, and a DOI that appears only in the text stays unresolved.
+
+        Parameters
+        ----------
+        doc_id : str, optional
+            Paper to take the references from; defaults to the current paper.
+        max_results : int, optional
+            Maximum number of related papers returned.
+
+        Returns
+        -------
+        str
+            Compact table of related papers, rendered like search_arxiv; notes give the
+            citations in the text ("cited 3x") and "stored" for papers that open instantly
+            from the local store. The most cited unresolved references (not on arXiv or
+            not recognized) follow the table.
+        """
+        reader, error = await self._reader(doc_id)
+        if error:
+            return error
+        doc_id = doc_id or self.workspace.current
+        await reader.wait_until_loaded()
+
+        references = await asyncio.to_thread(extract_references, reader.text)
+        if not references:
+            return {"error": "No references found in this paper."}
+
+        by_id, by_title = await asyncio.gather(
+            self.api.lookup([ref["arxiv_id"] for ref in references if ref["arxiv_id"]]),
+            self.api.find_titles([ref["title"] for ref in references if not ref["arxiv_id"] and ref["title"]]),
+        )
+
+        related = {}
+        unresolved = []
+        for order, ref in enumerate(references):
+            paper = by_id.get(ref["arxiv_id"]) if ref["arxiv_id"] else by_title.get(ref["title"])
+            if paper is None:
+                unresolved.append(ref)
+                continue
+            key = f"arxiv:{paper['arxiv_id']}"
+            if key == doc_id:
+                continue
+            if key in related:
+                related[key]["mentions"] += ref["mentions"]
+                continue
+            related[key] = {"paper": paper, "mentions": ref["mentions"], "order": order}
+
+        ranked = sorted(related.values(), key=lambda item: (-item["mentions"], item["order"]))[:max_results]
+        results = [
+            {**{field: item["paper"][field] for field in ArxivAPI.SEARCH_FIELDS}, "mentions": item["mentions"]}
+            for item in ranked
+        ]
+        if self.paper_store is not None:
+            for result in results:
+                if await asyncio.to_thread(self.paper_store.contains, result["arxiv_id"]):
+                    result["stored"] = True
+
+        self.current_query = None
+        self.current_page = 1
+        self.current_results = self.dedup.collapse_results(results, url_field="pdf_url")
+
+        unresolved.sort(key=lambda ref: -ref["mentions"])
+        footer = ""
+        if unresolved:
+            footer = "\nunresolved references (most cited first):\n" + "\n".join(
+                f"- {truncate(ref['reference'] or ref['doi'] or ref['arxiv_id'], 150)} (cited {ref['mentions']}x)"
+                for ref in unresolved[:5]
+            )
+        header = f"doc_id: {doc_id} | {len(references)} references, {len(related)} on arXiv"
+        return self._render_results("related_papers", header, budget_used=count_tokens(footer)) + footer
+
+    @trace_span_info
+    async def keyword_search(self, keyword: str, window_words: int = 256, doc_id: str = None):
+        """
+        Search for a keyword or phrase in the currently opened paper and return
         context snippets around each match.
 
-        **Only single-word searches are allowed. Multi-word phrases are not supported.**
+        Matching is case-insensitive and ignores word endings ("model" also finds
+        "models" and "modeling"). A multi-word query matches as an exact phrase, or,
+        if the phrase does not occur, wherever all the words appear close together.
+        Wrap parts in double quotes to require them as phrases (e.g. '"noise schedule" ablation').
 
         Parameters
         ----------
         keyword : str
-            A single keyword to search for (case-insensitive).
-            If multiple words or a phrase is provided, an error is returned.
+            Keyword, phrase or several words to search for.
         window_words : int, optional
-            Number of words before and after the keyword to include in each context snippet.
+            Number of words before and after the match to include in each context snippet.
+        doc_id : str, optional
+            Paper to search (from open_paper / list_open_papers); defaults to the current paper.
 
         Returns
         -------
         dict
             {
                 "keyword": keyword,
+                "match_type": "phrase" or "near",
                 "total_matches": N,
                 "matches": [
                     {
                         "index": match_number,
-                        "context": "...window_words before [keyword] window_words after..."
+                        "window": window containing the match (usable with read_window),
+                        "context": "...window_words before **match** window_words after..."
                     },
                     ...
                 ]
             }
-            If invalid input is provided (multi-word), returns an error message.
-        """
-
-        # -----------------------------
-        # Validate input: single word only
-        # -----------------------------
-        if not keyword or len(keyword.strip().split()) != 1:
-            return {"error": "Only single-word searches are allowed."}
-
-        if not self.reader.windows:
-            return {"error": "No PDF loaded. Use open_paper first."}
-
-        keyword_lower = keyword.lower()
-
-        # Reconstruct full paper text
-        full_text = " ".join(self.reader.windows)
-        words = full_text.split()
-
-        matches = []
-
-        # -----------------------------
-        # Word-level search
-        # -----------------------------
-        for i, w in enumerate(words):
-            # clean punctuation
-            w_clean = re.sub(r"[^\w-]", "", w).lower()
-            if w_clean == keyword_lower:
-                start = max(0, i - window_words)
-                end = min(len(words), i + window_words + 1)
-                snippet_words = words[start:end]
-                snippet = " ".join(snippet_words)
-
-                # highlight the keyword
-                highlighted = re.sub(
-                    rf"(?i)\b({re.escape(keyword_lower)})\b",
-                    r"**\1**",
-                    snippet
-                )
-
-                matches.append({
-                    "index": len(matches),
-                    "context": highlighted
-                })
-
-        if not matches:
-            return {
-                "keyword": keyword,
-                "matches": [],
-                "message": "No matches found."
-            }
+        """
+        if not keyword or not keyword.strip():
+            return {"error": "Empty search query."}
 
-        return {
-            "keyword": keyword,
-            "total_matches": len(matches),
-            "matches": matches
-        }
+        reader, error = await self._reader(doc_id)
+        if error:
+            return error
 
+        return await reader.keyword_search(keyword, window_words)
+
+    @trace_span_info
+    async def find_passages(self, query: str, k: int = 5, doc_id: str = None):
+        """
+        Find the passages of the currently opened paper most relevant to a question or topic
+        (e.g. "limitations of the method", "training data size"). One call replaces reading
+        through many windows with next_window.
 
+        Parameters
+        ----------
+        query : str
+            What you are looking for, in natural language.
+        k : int, optional
+            Number of passages to return.
+        doc_id : str, optional
+            Paper to search (from open_paper / list_open_papers); defaults to the current paper.
+
+        Returns
+        -------
+        dict
+            {
+                "query": query,
+                "reranked": whether embedding re-ranking was applied,
+                "passages": [
+                    {"rank": 0, "window": window index (usable with read_window), "bm25": score, "text": passage},
+                    ...
+                ]
+            }
+        """
+        if not query or not query.strip():
+            return {"error": "Empty search query."}
+
+        reader, error = await self._reader(doc_id)
+        if error:
+            return error
+
+        return await reader.find_passages(query, k, reranker=self.reranker)
 
     # ------------------- WINDOW CONTROLS -------------------
     @trace_span_info
-    async def next_window(self):
+    async def next_window(self, doc_id: str = None):
         """
         Move forward one window in the opened paper.
         Try to use 'keyword_search' instead, unless you are not getting the required results.
 
+        Parameters
+        ----------
+        doc_id : str, optional
+            Paper to read (from open_paper / list_open_papers); defaults to the current paper.
+
         Returns
         -------
         str or dict
             Window text or error dictionary.
         """
-        return await self.reader.next_window()
+        reader, error = await self._reader(doc_id)
+        return error or await reader.next_window()
+
     @trace_span_info
-    async def prev_window(self):
+    async def prev_window(self, doc_id: str = None):
         """
         Move backward one window in the opened paper.
 
+        Parameters
+        ----------
+        doc_id : str, optional
+            Paper to read (from open_paper / list_open_papers); defaults to the current paper.
+
         Returns
         -------
         str or dict
             Window text or error dictionary.
         """
-        return await self.reader.prev_window()
+        reader, error = await self._reader(doc_id)
+        return error or await reader.prev_window()
+
     @trace_span_info
-    async def get_window(self, index: int):
+    async def get_window(self, index: int, doc_id: str = None):
         """
         Jump to a specific window.
 
@@ -503,13 +1167,16 @@ class ArxivSearchTool:
         ----------
         index : int
             Window index.
+        doc_id : str, optional
+            Paper to read (from open_paper / list_open_papers); defaults to the current paper.
 
         Returns
         -------
         str or dict
             Window text or error dictionary.
         """
-        return await self.reader.get_window(index)
+        reader, error = await self._reader(doc_id)
+        return error or await reader.get_window(index)
 
     # ------------------- SEARCH PAGE NAVIGATION -------------------
     @trace_span_info
@@ -519,29 +1186,32 @@ class ArxivSearchTool:
 
         Returns
         -------
-        dict
-            New search results.
+        str
+            New search results, rendered like search_arxiv.
         """
         if not self.current_query:
             return {"error": "No active query"}
 
         self.current_page += 1
-        self.current_results = await self.api.search(self.current_query, self.current_page)
+        self.current_results = self.dedup.collapse_results(
+            await self.api.search(self.current_query, self.current_page), url_field="pdf_url"
+        )
 
-        return {
-            "query": self.current_query,
-            "page": self.current_page,
-            "results": self.current_results
-        }
+        return self._render_results("next_arxiv_page", f"query: {self.current_query} | page {self.current_page}")
     
     def get_tools(self):
         return [
             self.search_tool,
+            self.batch_search_tool,
             self.select_tool,
-            # self.abstract_tool,
+            self.abstract_tool,
             self.keyword_tool,
+            self.passages_tool,
             self.next_win_tool,
             self.prev_win_tool,
             self.go_win_tool,
+            self.list_papers_tool,
+            self.lookup_tool,
+            self.related_tool,
             self.next_page_tool
         ]
\ No newline at end of file
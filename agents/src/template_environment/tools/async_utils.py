@@ -0,0 +1,29 @@
+import asyncio
+
+
+async def gather_bounded(factories, limit: int = 4):
+    """
+    Run coroutine factories concurrently with at most `limit` in flight.
+
+    Results are returned in the order of `factories`; an exception raised by
+    one factory is returned in its slot instead of cancelling the others.
+
+    Parameters
+    ----------
+    factories : Iterable[Callable[[], Awaitable]]
+        Zero-argument callables that create the coroutines to run.
+    limit : int, optional
+        Maximum number of coroutines running at the same time.
+
+    Returns
+    -------
+    list
+        One result (or exception) per factory.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(factory):
+        async with semaphore:
+            return await factory()
+
+    return await asyncio.gather(*(run(f) for f in factories), return_exceptions=True)
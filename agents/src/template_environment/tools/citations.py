@@ -0,0 +1,216 @@
+import re
+from collections import Counter
+
+from tools.arxiv_feed import normalize_arxiv_id
+from tools.text_index import tokenize
+
+BIBLIOGRAPHY_HEADING = re.compile(
+    r"^[ \t]*(?:#{1,6}[ \t]*)?(?:\d{1,2}\.?[ \t]+)?(?:References|REFERENCES|Bibliography|BIBLIOGRAPHY|Literature Cited)[ \t]*$",
+    re.M,
+)
+# where the bibliography stops: appendices after it, either an explicit heading or a
+# lettered one on a line of its own ("A Proofs" + blank line; wrapped entry lines such
+# as "A Neural Probabilistic Language Model" continue without a blank line)
+AFTER_BIBLIOGRAPHY = re.compile(
+    r"^(?:#{1,6}[ \t]+\S|(?:Appendix|APPENDIX|Supplementary Material)\b"
+    r"|[A-H]\.?[ \t]+[A-Z][A-Za-z \-]{2,60}[ \t]*\n[ \t]*$)",
+    re.M,
+)
+# start of a bibliography entry: "[12] ", "12. ", "* " (markdown list item)
+NUMBERED_ENTRY = re.compile(r"^[ \t]*(?:[*\-][ \t]+)?\[(\d{1,3})\][ \t]*", re.M)
+DOTTED_ENTRY = re.compile(r"^[ \t]*(\d{1,3})\.[ \t]+(?=[A-Z])", re.M)
+BULLET_ENTRY = re.compile(r"^[ \t]*[*\-][ \t]+", re.M)
+# author-year entries: a line starting "Surname, X." / "Firstname Surname," after a line ending with "."
+AUTHOR_LINE = re.compile(r"(?<=\.)\n(?=[A-Z][\w'\-]+(?: [A-Z][\w'\-]+)?,)")
+
+ARXIV_REFERENCE = re.compile(
+    r"(?:arXiv[:\s]\s*|arxiv\.org/(?:abs|pdf)/)(\d{4}\.\d{4,5}(?:v\d+)?|[a-z\-]+(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)",
+    re.I,
+)
+DOI_REFERENCE = re.compile(r"\b10\.\d{4,9}/[^\s\"<>\]]+")
+# DOIs arXiv registers for its own papers
+ARXIV_DOI = re.compile(r"^10\.48550/arxiv\.(.+)$", re.I)
+QUOTED_TITLE = re.compile(r"[\"“]([^\"”]{10,300}?)[,.]?[\"”]")
+# sentence boundaries in an entry, but not after initials ("A. Vaswani")
+ENTRY_SEGMENT = re.compile(r"(?<!\b[A-Z])\.\s+")
+NUMERIC_CITATION = re.compile(r"\[(\d{1,3}(?:\s*[,–\-]\s*\d{1,3})*)\]")
+NOT_A_TITLE = re.compile(r"^(?:In |Proc|Advances|arXiv|CoRR|Journal|Transactions|Conference|URL|https?:|\(?\d{4}\)?$)", re.I)
+MIN_TITLE_WORDS = 3
+
+
+def find_bibliography(text: str):
+    """
+    Locate the bibliography of a document.
+
+    Returns
+    -------
+    tuple[int, int] or None
+        [start, end) character offsets of the reference list (after its
+        heading), or None when the document has no References section.
+    """
+    headings = list(BIBLIOGRAPHY_HEADING.finditer(text))
+    if not headings:
+        return None
+    # the reference list is near the end; earlier matches are usually the table of contents
+    start = headings[-1].end()
+    end = AFTER_BIBLIOGRAPHY.search(text, start)
+    return start, end.start() if end else len(text)
+
+
+def split_entries(bibliography: str) -> list:
+    """
+    Split a reference list into entries, whichever of the common layouts
+    it uses: "[n]" labels, "n." labels, list bullets or author-year.
+
+    Returns
+    -------
+    list[tuple[str or None, str]]
+        (label, entry text with whitespace collapsed); the label is the
+        reference number for numbered styles.
+    """
+    # "[n]" labels are unambiguous even for a single entry; "n." and bullets
+    # also start ordinary lines, so they need at least two entries
+    for pattern, min_entries in ((NUMBERED_ENTRY, 1), (DOTTED_ENTRY, 2), (BULLET_ENTRY, 2)):
+        starts = list(pattern.finditer(bibliography))
+        if len(starts) >= min_entries:
+            break
+    else:
+        starts = []
+
+    if starts:
+        entries = []
+        for match, following in zip(starts, starts[1:] + [None]):
+            body = bibliography[match.end(): following.start() if following else len(bibliography)]
+            label = match.group(1) if match.groups() else None
+            entries.append((label, " ".join(body.split())))
+    else:
+        entries = [(None, " ".join(part.split())) for part in AUTHOR_LINE.split(bibliography)]
+    return [(label, body) for label, body in entries if len(body) > 20]
+
+
+def guess_title(entry: str):
+    """
+    Guess the title of a bibliography entry: a quoted title if there is
+    one, otherwise the first sentence after the author list that looks
+    like a title (not a venue, year or URL).
+    """
+    quoted = QUOTED_TITLE.search(entry)
+    if quoted and len(quoted.group(1).split()) >= MIN_TITLE_WORDS:
+        return quoted.group(1).strip()
+
+    segments = [s.strip() for s in ENTRY_SEGMENT.split(entry)]
+    for segment in segments[1:]:
+        segment = re.sub(r"^\(?\d{4}[a-z]?\)?[.,]?\s*", "", segment)
+        if len(segment.split()) >= MIN_TITLE_WORDS and not NOT_A_TITLE.match(segment):
+            return segment.rstrip(".,")
+    return None
+
+
+def _without_version(arxiv_id: str) -> str:
+    return re.sub(r"v\d+$", "", arxiv_id)
+
+
+def _doi(match):
+    return match.group(0).rstrip(".,;)") if match else None
+
+
+def _arxiv_id_from_doi(doi: str):
+    match = ARXIV_DOI.match(doi or "")
+    return normalize_arxiv_id(match.group(1)) if match else None
+
+
+def _first_author(entry: str):
+    match = re.match(r"(?:[A-Z]\.\s*)*([A-Z][\w'\-]+)", entry)
+    return match.group(1) if match else None
+
+
+def title_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the normalized terms of two titles."""
+    terms_a, terms_b = set(tokenize(a)), set(tokenize(b))
+    if not terms_a or not terms_b:
+        return 0.0
+    return len(terms_a & terms_b) / len(terms_a | terms_b)
+
+
+def _count_numeric_citations(body: str) -> Counter:
+    counts = Counter()
+    for match in NUMERIC_CITATION.finditer(body):
+        for part in re.split(r"\s*,\s*", match.group(1)):
+            bounds = re.split(r"\s*[–\-]\s*", part)
+            if len(bounds) == 2 and bounds[0].isdigit() and bounds[1].isdigit():
+                low, high = int(bounds[0]), int(bounds[1])
+                labels = range(low, high + 1) if 0 <= high - low <= 50 else (low, high)
+            else:
+                labels = [int(bound) for bound in bounds if bound.isdigit()]
+            counts.update(str(label) for label in labels)
+    return counts
+
+
+# ------------------------------------------------------------
+# Reference Extraction
+# ------------------------------------------------------------
+def extract_references(text: str) -> list:
+    """
+    Extract the references of a document: its bibliography entries plus
+    arXiv ids and DOIs mentioned anywhere in the text.
+
+    Each reference records how often the body cites it (by "[n]" label,
+    first-author surname, or arXiv id), used to rank related papers.
+
+    Parameters
+    ----------
+    text : str
+        Full document text.
+
+    Returns
+    -------
+    list[dict]
+        In bibliography order, then ids found only in the body. Each entry
+        has "reference" (entry text, truncated), "arxiv_id", "doi", "title"
+        (guessed, may be None) and "mentions".
+    """
+    bounds = find_bibliography(text)
+    body = text[: bounds[0]] if bounds else text
+    entries = split_entries(text[bounds[0]: bounds[1]]) if bounds else []
+    numeric = _count_numeric_citations(body) if any(label for label, _ in entries) else Counter()
+
+    references = []
+    seen_ids = set()
+    for label, entry in entries:
+        arxiv_match = ARXIV_REFERENCE.search(entry)
+        doi = _doi(DOI_REFERENCE.search(entry))
+        arxiv_id = normalize_arxiv_id(arxiv_match.group(1)) if arxiv_match else _arxiv_id_from_doi(doi)
+
+        if label is not None:
+            mentions = numeric[label]
+        else:
+            author = _first_author(entry)
+            mentions = len(re.findall(rf"\b{re.escape(author)}\b", body)) if author else 0
+
+        references.append({
+            "reference": entry[:300],
+            "arxiv_id": arxiv_id,
+            "doi": doi,
+            "title": guess_title(entry),
+            "mentions": mentions,
+        })
+        if arxiv_id:
+            seen_ids.add(_without_version(arxiv_id))
+
+    # ids cited inline (footnotes, "see arXiv:...") without a bibliography entry
+    inline = Counter(normalize_arxiv_id(m.group(1)) for m in ARXIV_REFERENCE.finditer(body))
+    for arxiv_id, count in inline.items():
+        if arxiv_id and _without_version(arxiv_id) not in seen_ids:
+            references.append({"reference": None, "arxiv_id": arxiv_id, "doi": None, "title": None, "mentions": count})
+            seen_ids.add(_without_version(arxiv_id))
+
+    seen_dois = {reference["doi"] for reference in references if reference["doi"]}
+    for doi, count in Counter(_doi(m) for m in DOI_REFERENCE.finditer(body)).items():
+        if doi in seen_dois:
+            continue
+        arxiv_id = _arxiv_id_from_doi(doi)
+        if arxiv_id and _without_version(arxiv_id) in seen_ids:
+            continue
+        references.append({"reference": None, "arxiv_id": arxiv_id, "doi": doi, "title": None, "mentions": count})
+
+    return references
@@ -1,12 +1,13 @@
 import asyncio
-from typing import List, Tuple, Union
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
 import json
-from autogen_core import AgentId
-from autogen_core.models import UserMessage
+from autogen_core import AgentId, CancellationToken
+from autogen_core.models import FunctionExecutionResult, UserMessage
 from autogen_core.tools import FunctionTool
 import inspect
 from opentelemetry import trace
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from tools.tool_tracing_utils import trace_span_info
 
 from utils.logger import get_logger
@@ -14,36 +15,146 @@ from utils.logger import get_logger
 logger = get_logger()
 
 
+# Deadline of a delegated task when neither the task nor the caller sets one.
+DEFAULT_DELEGATION_TIMEOUT = 300.0
+
+
 class DelegationTask(BaseModel):
     agent: str = Field(..., description="The agent to delegate the task to.")
     task: str = Field(..., description="The details of the task to be delegated.")
     name: str = Field(..., description="The name of the agent delegating the task.")
+    timeout_seconds: Optional[float] = Field(
+        None, gt=0, description="Optional deadline in seconds for the agent to answer."
+    )
+
+
+# Validates a list of tasks from parsed JSON or from a JSON string.
+DELEGATION_TASKS = TypeAdapter(List[DelegationTask])
+
+
+def parse_delegation_tasks(delegation_tasks: Union[List[DelegationTask], List[dict], str]) -> List[DelegationTask]:
+    """
+    Validate delegation tasks given as models, dicts or a JSON string.
+
+    Args:
+        delegation_tasks (Union[List[DelegationTask], List[dict], str]): The tasks, or
+        their JSON representation (as some models send nested arguments).
+
+    Returns:
+        List[DelegationTask]: The validated tasks.
+
+    Raises:
+        pydantic.ValidationError: If the input is not valid JSON or a task is malformed.
+    """
+    if isinstance(delegation_tasks, (str, bytes)):
+        return DELEGATION_TASKS.validate_json(delegation_tasks)
+    return DELEGATION_TASKS.validate_python(
+        [task.model_dump() if isinstance(task, BaseModel) else task for task in delegation_tasks]
+    )
+
+
+def group_delegation_tasks(
+    delegation_tasks: List[DelegationTask],
+) -> List[Tuple[str, List[UserMessage], Optional[float]]]:
+    """
+    Group tasks by agent into a single combined message per agent.
+
+    Returns:
+        List[Tuple[str, List[UserMessage], Optional[float]]]: The agent, its combined
+        task message and the tightest deadline among its tasks, in first-seen order.
+    """
+    grouped = {}
+    for task in delegation_tasks:
+        group = grouped.setdefault(task.agent, {"tasks": [], "name": task.name, "timeout": None})
+        group["tasks"].append(task.task)
+        if task.timeout_seconds is not None:
+            group["timeout"] = min(filter(None, [group["timeout"], task.timeout_seconds]))
+
+    return [
+        (agent, [UserMessage(content="\n\n".join(group["tasks"]), source=group["name"])], group["timeout"])
+        for agent, group in grouped.items()
+    ]
 
 
 @trace_span_info
 async def delegate_tasks(
     delegation_tasks: Union[List[DelegationTask], str],
-) -> List[Tuple[str, List[UserMessage]]]:
+) -> List[Tuple[str, List[UserMessage], Optional[float]]]:
     """
     Groups delegation tasks by agent and prepares a single combined message per agent.
 
+    Agents intercept this tool and run the groups concurrently with
+    `dispatch_delegation_tasks`; calling it directly only validates and groups.
+
     Args:
-        delegation_tasks (Union[List[DelegationTask], str]): A list of tasks or a string
-        representation of it.
+        delegation_tasks (Union[List[DelegationTask], str]): A list of tasks or its
+        JSON representation.
 
     Returns:
-        List[Tuple[str, List[UserMessage]]]: A list of tuples with the agent and their
-        combined tasks.
+        List[Tuple[str, List[UserMessage], Optional[float]]]: The agent, its combined
+        task message and its deadline.
     """
-    if isinstance(delegation_tasks, str):
-        delegation_tasks = [DelegationTask(**t) for t in eval(delegation_tasks)]
+    return group_delegation_tasks(parse_delegation_tasks(delegation_tasks))
 
-    parsed_delegation_tasks = [
-        (task.agent, [UserMessage(content=task.task, source=task.name)])
-        for task in delegation_tasks
-    ]
 
-    return parsed_delegation_tasks
+async def dispatch_delegation_tasks(
+    delegation_tasks: Union[List[DelegationTask], str],
+    send: Callable[[str, List[UserMessage], CancellationToken], Awaitable[str]],
+    call_id: str,
+    default_timeout: float = DEFAULT_DELEGATION_TIMEOUT,
+    name: str = "delegate_tasks",
+) -> FunctionExecutionResult:
+    """
+    Send each agent its combined tasks concurrently and aggregate the answers.
+
+    Every agent runs under its own deadline (the task's timeout_seconds or
+    `default_timeout`); on expiry its work is cancelled and reported as timed
+    out, so the whole delegation takes as long as the slowest agent, bounded
+    by the deadlines, and one failure does not discard the other answers.
+
+    Args:
+        delegation_tasks (Union[List[DelegationTask], str]): The tool arguments.
+        send (Callable): Coroutine function (agent, messages, cancellation_token) that
+            delivers the task and returns the agent's answer.
+        call_id (str): Id of the function call being answered.
+        default_timeout (float): Deadline in seconds for tasks without their own.
+        name (str): Tool name reported in the result.
+
+    Returns:
+        FunctionExecutionResult: One section per agent; an error only if the input is
+        invalid or every agent failed.
+    """
+    try:
+        groups = group_delegation_tasks(parse_delegation_tasks(delegation_tasks))
+    except ValueError as e:
+        return FunctionExecutionResult(
+            name=name, content=f"Invalid delegation tasks: {e}", call_id=call_id, is_error=True
+        )
+    if not groups:
+        return FunctionExecutionResult(name=name, content="No tasks to delegate.", call_id=call_id, is_error=True)
+
+    async def run(agent: str, messages: List[UserMessage], timeout: Optional[float]):
+        timeout = timeout or default_timeout
+        cancellation_token = CancellationToken()
+        start = time.perf_counter()
+        try:
+            answer = await asyncio.wait_for(send(agent, messages, cancellation_token), timeout)
+            return f"## {agent} ({time.perf_counter() - start:.1f}s)\n{answer}", True
+        except asyncio.TimeoutError:
+            cancellation_token.cancel()
+            logger.warning("Delegation to %s timed out after %gs", agent, timeout)
+            return f"## {agent} (no answer: timed out after {timeout:g}s)", False
+        except Exception as e:
+            logger.warning("Delegation to %s failed: %s", agent, e)
+            return f"## {agent} (failed: {e})", False
+
+    outcomes = await asyncio.gather(*[run(agent, messages, timeout) for agent, messages, timeout in groups])
+    return FunctionExecutionResult(
+        name=name,
+        content="\n\n".join(text for text, _ in outcomes),
+        call_id=call_id,
+        is_error=not any(ok for _, ok in outcomes),
+    )
 
 
 async def set_communication_tools(agent_topics, communication_tools, runtime):
@@ -0,0 +1,241 @@
+import re
+from hashlib import blake2b
+
+from tools.url_utils import canonicalize_url
+
+ARXIV_ID_PATTERN = re.compile(
+    r"arxiv\.org/(?:abs|pdf|html|format)/"
+    r"(?P<id>\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?P<version>v\d+)?",
+    re.I,
+)
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+# Maximum Hamming distance between two fingerprints considered near-duplicates.
+# With 4 bands of 16 bits, any pair within 3 bits shares at least one band.
+NEAR_DUPLICATE_DISTANCE = 3
+MIN_FINGERPRINT_WORDS = 50
+
+
+def extract_arxiv_id(url: str):
+    """
+    Extract the version-less arXiv identifier from an abs/pdf/html URL.
+
+    Parameters
+    ----------
+    url : str
+        Any URL.
+
+    Returns
+    -------
+    str or None
+        e.g. "2506.18096" or "cs/0101001", or None for non-arXiv URLs.
+    """
+    match = ARXIV_ID_PATTERN.search(url or "")
+    if match is None:
+        return None
+    return match.group("id").removesuffix(".pdf")
+
+
+def extract_arxiv_version(url: str):
+    """Return the explicit version number of an arXiv URL ("...v2" -> 2), or None."""
+    match = ARXIV_ID_PATTERN.search(url or "")
+    if match is None or match.group("version") is None:
+        return None
+    return int(match.group("version")[1:])
+
+
+def document_key(url: str) -> str:
+    """
+    Key under which a document is deduplicated: its arXiv id, or its canonical
+    URL without the scheme (http and https copies are the same document).
+    """
+    arxiv_id = extract_arxiv_id(url)
+    return f"arxiv:{arxiv_id}" if arxiv_id else canonicalize_url(url).split("://", 1)[-1]
+
+
+def simhash(text: str, ngram: int = 3):
+    """
+    Compute a 64-bit SimHash fingerprint over word n-gram shingles.
+
+    Parameters
+    ----------
+    text : str
+        Extracted document text.
+    ngram : int, optional
+        Number of words per shingle.
+
+    Returns
+    -------
+    int or None
+        The fingerprint, or None when the text is too short to be reliable.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < MIN_FINGERPRINT_WORDS:
+        return None
+
+    shingles = {" ".join(words[i:i + ngram]) for i in range(len(words) - ngram + 1)}
+    bitstrings = [
+        format(int.from_bytes(blake2b(s.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for s in shingles
+    ]
+
+    # count set bits per position column-wise; a fingerprint bit is set when most shingles set it
+    majority = "".join(
+        "1" if column.count("1") * 2 > len(bitstrings) else "0" for column in zip(*bitstrings)
+    )
+    return int(majority, 2)
+
+
+def _bands(fingerprint: int):
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(band, (fingerprint >> (band * width)) & mask) for band in range(SIMHASH_BANDS)]
+
+
+# ------------------------------------------------------------
+# Session-Level Duplicate Index
+# ------------------------------------------------------------
+class DedupIndex:
+    """
+    Session-level index of every document the agent has opened, used to
+    collapse duplicate search results and to short-circuit re-opening a
+    document that was already read under another URL.
+
+    Documents are matched in two ways:
+    - Identity: same canonical URL, or same arXiv id (abs/pdf/html links).
+    - Content: SimHash fingerprints within NEAR_DUPLICATE_DISTANCE bits
+      (mirrors, syndicated copies), looked up through banded buckets.
+    """
+
+    def __init__(self):
+        self.opened = {}
+        self._buckets = {}
+
+    # ------------------- SEARCH RESULTS -------------------
+
+    def collapse_results(self, results: list, url_field: str = "url") -> list:
+        """
+        Drop duplicates within a result list and flag results already opened.
+
+        Parameters
+        ----------
+        results : list[dict]
+            Search results; each must carry a URL under `url_field`.
+        url_field : str, optional
+            Name of the URL field ("url" for web, "pdf_url" for ArXiv).
+
+        Returns
+        -------
+        list[dict]
+            Unique results, re-numbered with consecutive "id"s. Results whose
+            document was already opened carry "already_opened": <url>.
+        """
+        unique = {}
+        for result in results:
+            key = document_key(result.get(url_field) or "")
+            if key in unique:
+                continue
+            if key in self.opened:
+                result = {**result, "already_opened": self.opened[key]["url"]}
+            unique[key] = result
+
+        return [{**r, "id": i} for i, r in enumerate(unique.values())]
+
+    # ------------------- OPENED DOCUMENTS -------------------
+
+    def find_alias(self, url: str):
+        """
+        Return the record of an opened document with the same identity as
+        `url` (same arXiv id or canonical URL) but opened under a different
+        URL. Re-opening the exact same URL is not treated as a duplicate.
+        """
+        record = self.opened.get(document_key(url))
+        if record is None or canonicalize_url(record["url"]) == canonicalize_url(url):
+            return None
+        return record
+
+    def find_near_duplicate(self, content: str, fingerprint: int = None):
+        """
+        Return the record of an opened document whose content is a
+        near-duplicate of `content`, if any.
+        """
+        fingerprint = simhash(content) if fingerprint is None else fingerprint
+        if fingerprint is None:
+            return None
+
+        for band in _bands(fingerprint):
+            for record in self._buckets.get(band, []):
+                if bin(record["fingerprint"] ^ fingerprint).count("1") <= NEAR_DUPLICATE_DISTANCE:
+                    return record
+        return None
+
+    def register(
+        self, url: str, content: str, title: str = None, source: str = None, fingerprint: int = None
+    ) -> dict:
+        """
+        Record a document the agent has opened.
+
+        Parameters
+        ----------
+        url : str
+            URL the document was opened from.
+        content : str
+            Extracted text (used for the fingerprint).
+        title : str, optional
+            Document title, if known.
+        source : str, optional
+            Tool that opened it (e.g. "open_webpage", "open_paper").
+        fingerprint : int, optional
+            Precomputed SimHash of `content`.
+
+        Returns
+        -------
+        dict
+            The stored record.
+        """
+        key = document_key(url)
+        if key in self.opened:
+            return self.opened[key]
+
+        record = {
+            "url": url,
+            "key": key,
+            "title": title,
+            "source": source,
+            "fingerprint": simhash(content) if fingerprint is None else fingerprint,
+        }
+        self.opened[record["key"]] = record
+
+        self._add_to_buckets(record)
+        return record
+
+    def set_fingerprint(self, url: str, fingerprint: int):
+        """
+        Attach a fingerprint to a document registered before its full text
+        was available (e.g. a paper still being extracted in the background).
+        """
+        record = self.opened.get(document_key(url))
+        if record is None or record["fingerprint"] is not None or fingerprint is None:
+            return
+        record["fingerprint"] = fingerprint
+        self._add_to_buckets(record)
+
+    def _add_to_buckets(self, record: dict):
+        if record["fingerprint"] is not None:
+            for band in _bands(record["fingerprint"]):
+                self._buckets.setdefault(band, []).append(record)
+
+    @staticmethod
+    def pointer(record: dict, url: str) -> dict:
+        """Tool response pointing the agent at an already-read document."""
+        return {
+            "url": url,
+            "duplicate_of": record["url"],
+            "title": record.get("title"),
+            "message": (
+                f"This document was already read as {record['url']} "
+                f"(via {record.get('source') or 'an earlier tool call'}). "
+                "Refer to your notes, or re-open that exact URL if you need to read it again."
+            ),
+        }
@@ -0,0 +1,563 @@
+import asyncio
+import bisect
+import re
+import sys
+from array import array
+from collections.abc import Sequence
+
+from tools.passage_index import PassageIndex
+from tools.text_index import PositionalIndex
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+# Headings as they appear in extracted paper text: Markdown headings (HTML
+# sources), numbered ("3.1 Method", "A. Proofs", "IV. Results") or well-known
+# unnumbered ones.
+SECTION_HEADING = re.compile(
+    r"^(?:#{1,6}\s+[^\n]+"
+    r"|(?:\d{1,2}(?:\.\d{1,2})*\.?|[A-Z]\.|[IVX]{1,4}\.)\s+[A-Z][^\n]{1,80}"
+    r"|Abstract|References|Bibliography|Acknowledge?ments?|Appendix(?:\s[^\n]{0,60})?)$",
+    re.M,
+)
+MAX_HEADING_WORDS = 10
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n+")
+# windows are never cut before this fraction of the window size
+MIN_WINDOW_FRACTION = 0.5
+
+
+def _is_heading(title: str) -> bool:
+    if title.startswith("#"):
+        return True
+    # numbered sentences ("2 The model is trained on ...") are not headings
+    return len(title.split()) <= MAX_HEADING_WORDS and title[-1] not in ".,;:"
+
+
+def detect_sections(text: str) -> list:
+    """
+    Find section headings in extracted document text.
+
+    Parameters
+    ----------
+    text : str
+        Cleaned document text (one heading per line).
+
+    Returns
+    -------
+    list[dict]
+        {"title", "start"} per heading, `start` being its character offset.
+    """
+    sections = []
+    for match in SECTION_HEADING.finditer(text):
+        title = match.group(0).strip()
+        if _is_heading(title):
+            sections.append({"title": title.lstrip("#").strip(), "start": match.start()})
+    return sections
+
+
+def window_end(segment: str, window_size: int) -> int:
+    """
+    Choose where a window starting at the beginning of `segment` ends.
+
+    The window is cut at the last section heading, else the last paragraph
+    break, else the last line break or space, found in the second half of
+    `window_size`; only text without any of those is cut mid-word.
+
+    Parameters
+    ----------
+    segment : str
+        Document text from the window start; at least `window_size + 1`
+        characters unless it is the end of the document.
+    window_size : int
+        Maximum window length.
+
+    Returns
+    -------
+    int
+        Length of the window.
+    """
+    if len(segment) <= window_size:
+        return len(segment)
+
+    lower = int(window_size * MIN_WINDOW_FRACTION)
+    headings = [
+        m.start() for m in SECTION_HEADING.finditer(segment, lower, window_size + 1)
+        if _is_heading(m.group(0).strip())
+    ]
+    if headings:
+        return headings[-1]
+
+    breaks = [m.end() for m in PARAGRAPH_BREAK.finditer(segment, lower, window_size)]
+    if breaks:
+        return breaks[-1]
+
+    for separator in ("\n", " "):
+        cut = segment.rfind(separator, lower, window_size)
+        if cut != -1:
+            return cut + 1
+    return window_size
+
+
+def count_windows(text: str, window_size: int) -> int:
+    """Return how many windows a reader would split `text` into."""
+    count, start = 0, 0
+    while start < len(text):
+        start += window_end(text[start:start + window_size + 1], window_size)
+        count += 1
+    return count
+
+
+class _WindowView(Sequence):
+    """Read-only list-like view of a reader's windows, sliced from its text on access."""
+
+    def __init__(self, reader: "DocumentReader"):
+        self._reader = reader
+
+    def __len__(self):
+        return len(self._reader._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("window index out of range")
+        return self._reader._slice(*self._reader._window_bounds(index))
+
+
+# ------------------------------------------------------------
+# Generic Document Reader — Provides Scrolling Windows
+# ------------------------------------------------------------
+class DocumentReader:
+    """
+    Holds the text of one opened document and provides scrollable "windows"
+    of content plus keyword search over a positional index built at load time.
+
+    This allows an LLM agent to read a document chunk-by-chunk, simulating
+    a scrolling browser window, without the full text entering its context.
+
+    The text is stored once; windows are kept as start offsets (ending on
+    section or paragraph breaks where possible) and sliced on access.
+
+    Attributes
+    ----------
+    window_size : int
+        Maximum number of characters per window.
+    windows : Sequence[str]
+        The windows of text, sliced lazily from `text`.
+    position : int
+        Current window index.
+    text : str
+        Full text of the loaded document (complete once loading finishes).
+    index : PositionalIndex
+        Positional inverted index of the document's tokens.
+    sections : list[dict]
+        Detected section headings ({"title", "start"}) once loading is complete.
+    complete : bool
+        False while a document loaded with `load_stream` is still being
+        extracted in the background.
+    """
+
+    def __init__(self, window_size_chars=3000):
+        """
+        Initialize the reader.
+
+        Parameters
+        ----------
+        window_size_chars : int, optional
+            Maximum size of each scrolling window, by default 3000.
+        """
+        self.window_size = window_size_chars
+        self.windows = _WindowView(self)
+        self._progress = asyncio.Condition()
+        self._loader = None
+        self._reset()
+
+    def _reset(self):
+        if self._loader is not None and not self._loader.done():
+            self._loader.cancel()
+        self._loader = None
+        self.position = 0
+        self.text = ""
+        self.index = PositionalIndex()
+        self.sections = []
+        self.complete = True
+        self.load_error = None
+        self._passages = None
+
+        # window i spans [_starts[i], _starts[i + 1]) and the last one ends at _end
+        self._starts = array("I")
+        self._end = 0
+        # text received so far while streaming, joined into `text` at the end
+        self._pieces = []
+        self._piece_starts = []
+        self._length = 0
+
+    def _window_bounds(self, index: int) -> tuple:
+        start = self._starts[index]
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else self._end
+        return start, end
+
+    def _slice(self, start: int, end: int) -> str:
+        if not self._pieces:
+            return self.text[start:end]
+        i = max(0, bisect.bisect_right(self._piece_starts, start) - 1)
+        parts = []
+        while i < len(self._pieces) and self._piece_starts[i] < end:
+            piece_start = self._piece_starts[i]
+            parts.append(self._pieces[i][max(0, start - piece_start):end - piece_start])
+            i += 1
+        return "".join(parts)
+
+    def _close_windows(self, final: bool) -> int:
+        """Fix window boundaries over the text received so far; return how many were added."""
+        added = 0
+        while self._end < self._length:
+            remaining = self._length - self._end
+            if remaining <= self.window_size and not final:
+                # wait for more text: the boundary may move into it
+                break
+            segment = self._slice(self._end, self._end + self.window_size + 1)
+            self._starts.append(self._end)
+            self._end += window_end(segment, self.window_size)
+            added += 1
+        return added
+
+    def _window_at(self, offset: int) -> int:
+        return max(0, bisect.bisect_right(self._starts, offset) - 1)
+
+    async def load_text(self, full_text: str) -> int:
+        """
+        Split already extracted text into windows, index it and reset the
+        position.
+
+        Parameters
+        ----------
+        full_text : str
+            Cleaned document text.
+
+        Returns
+        -------
+        int
+            Number of windows created.
+        """
+        self._reset()
+        self.text = full_text
+        self._length = len(full_text)
+        self._close_windows(final=True)
+        self.index.add(full_text)
+        self.sections = detect_sections(full_text)
+
+        return len(self.windows)
+
+    # ------------------- INCREMENTAL LOADING -------------------
+
+    async def load_stream(self, chunks) -> int:
+        """
+        Load a document whose text arrives in chunks (e.g. PDF pages) and
+        return as soon as the first window is ready. The remaining chunks are
+        consumed in the background; window accessors wait only for windows
+        that have not been extracted yet.
+
+        Parameters
+        ----------
+        chunks : AsyncIterator[str]
+            Cleaned text chunks in document order, joined by blank lines.
+
+        Returns
+        -------
+        int
+            Number of windows ready when the call returns.
+
+        Raises
+        ------
+        Exception
+            Whatever the chunk source raised, if it failed before producing
+            any text.
+        """
+        self._reset()
+        self.complete = False
+        self._loader = asyncio.create_task(self._consume(chunks))
+
+        await self._wait_for(lambda: self.windows or self.complete)
+        if self.load_error is not None and not self.windows:
+            raise self.load_error
+        return len(self.windows)
+
+    def _append(self, piece: str):
+        self._pieces.append(piece)
+        self._piece_starts.append(self._length)
+        self._length += len(piece)
+
+    async def _consume(self, chunks):
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if self._length:
+                    self._append("\n\n")
+                self.index.add(chunk, self._length)
+                self._append(chunk)
+
+                if self._close_windows(final=False):
+                    await self._notify()
+        except asyncio.CancelledError:
+            # superseded by another document; its state is no longer ours to touch
+            raise
+        except Exception as e:
+            logger.warning("Background document loading stopped early: %s", e)
+            self.load_error = e
+
+        self._close_windows(final=True)
+        self.text = "".join(self._pieces)
+        self._pieces, self._piece_starts = [], []
+        self.sections = detect_sections(self.text)
+        self.complete = True
+        await self._notify()
+
+        try:
+            await self.on_loaded()
+        except Exception as e:
+            logger.warning("Post-load hook failed: %s", e)
+
+    async def on_loaded(self):
+        """Called once a document loaded with `load_stream` is fully extracted."""
+
+    async def _notify(self):
+        async with self._progress:
+            self._progress.notify_all()
+
+    async def _wait_for(self, predicate):
+        async with self._progress:
+            await self._progress.wait_for(predicate)
+
+    async def wait_until_loaded(self):
+        """Wait until a document loaded with `load_stream` is fully extracted."""
+        await self._wait_for(lambda: self.complete)
+
+    async def wait_until_done(self):
+        """Wait until background loading, including the `on_loaded` hook, has finished."""
+        if self._loader is not None:
+            await asyncio.wait([self._loader])
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size of the loaded document (text, windows and index)."""
+        size = sys.getsizeof(self.text) + sum(sys.getsizeof(piece) for piece in self._pieces)
+        return size + sys.getsizeof(self._starts) + self.index.memory_bytes()
+
+    # ------------------- SNAPSHOTS -------------------
+
+    def window_offsets(self) -> list:
+        """Return the [start, end) character offsets of every window in `text`."""
+        return [list(self._window_bounds(i)) for i in range(len(self._starts))]
+
+    def section_windows(self) -> list:
+        """Return the detected sections with the index of the window each starts in."""
+        return [{"title": s["title"], "window": self._window_at(s["start"])} for s in self.sections]
+
+    def snapshot(self) -> dict:
+        """
+        Return everything needed to restore the loaded document without
+        re-extracting it: text, window offsets, sections and the search index.
+        """
+        return {
+            "text": self.text,
+            "window_size": self.window_size,
+            "windows": self.window_offsets(),
+            "sections": self.sections,
+            "index": self.index.to_dict(),
+        }
+
+    def restore(self, snapshot: dict) -> int:
+        """
+        Load a document from a `snapshot()`.
+
+        Parameters
+        ----------
+        snapshot : dict
+            Previously saved reader state.
+
+        Returns
+        -------
+        int
+            Number of windows.
+        """
+        self._reset()
+        text = snapshot["text"]
+        self.text = text
+        self._length = len(text)
+        if snapshot.get("window_size") == self.window_size and snapshot["windows"]:
+            self._starts = array("I", (start for start, _ in snapshot["windows"]))
+            self._end = snapshot["windows"][-1][1]
+        else:
+            self._close_windows(final=True)
+        if "index" in snapshot:
+            self.index = PositionalIndex.from_dict(snapshot["index"])
+        else:
+            self.index.add(text)
+        self.sections = snapshot.get("sections") or []
+        return len(self.windows)
+
+    # ------------------- WINDOWS -------------------
+
+    async def get_window(self, index: int) -> str:
+        """
+        Return a specific window of text.
+
+        Parameters
+        ----------
+        index : int
+            Window index.
+
+        Returns
+        -------
+        str or dict
+            Text of the window, or error dict if out of range.
+        """
+        if index >= len(self.windows) and not self.complete:
+            await self._wait_for(lambda: index < len(self.windows) or self.complete)
+
+        if index < 0 or index >= len(self.windows):
+            return {"error": "Window index out of range"}
+        self.position = index
+        return self.windows[index]
+
+    async def next_window(self) -> str:
+        """
+        Move to the next window.
+
+        Returns
+        -------
+        str or dict
+            Next window text or error dict.
+        """
+        if not self.complete:
+            await self._wait_for(lambda: self.position + 1 < len(self.windows) or self.complete)
+        if self.position + 1 >= len(self.windows):
+            return {"error": "Already at last window"}
+        return await self.get_window(self.position + 1)
+
+    async def prev_window(self) -> str:
+        """
+        Move to the previous window.
+
+        Returns
+        -------
+        str or dict
+            Previous window text or error dict.
+        """
+        if self.position - 1 < 0:
+            return {"error": "Already at first window"}
+        return await self.get_window(self.position - 1)
+
+    async def keyword_search(self, keyword: str, window_words: int = 256) -> dict:
+        """
+        Look up a keyword, phrase or multi-term query in the positional index
+        and return context snippets around each match.
+
+        Parameters
+        ----------
+        keyword : str
+            Query (case-insensitive, matched on word stems). Multiple words are
+            matched as a phrase, or failing that as terms close to each other;
+            quoted parts always match as phrases.
+        window_words : int, optional
+            Number of words before and after the match in each snippet.
+
+        Returns
+        -------
+        dict
+            Keyword, match type, total number of matches and the highlighted
+            snippets with the window each match is in.
+        """
+        # matches can be anywhere in the document
+        await self.wait_until_loaded()
+
+        match_type, spans = self.index.search(keyword)
+        if not spans:
+            return {
+                "keyword": keyword,
+                "matches": [],
+                "message": "No matches found."
+            }
+
+        matches = []
+        for span in spans:
+            matches.append({
+                "index": len(matches),
+                "window": self._window_at(self.index.starts[span[0]]),
+                "context": self.index.snippet(self.text, span, window_words)
+            })
+
+        return {
+            "keyword": keyword,
+            "match_type": match_type,
+            "total_matches": len(matches),
+            "matches": matches
+        }
+
+    async def find_passages(self, query: str, k: int = 5, reranker=None, candidates: int = 20) -> dict:
+        """
+        Rank the paragraph-level passages of the document against a query
+        with BM25, optionally re-ranking the best candidates by embedding
+        similarity.
+
+        Parameters
+        ----------
+        query : str
+            Free-text description of what to find.
+        k : int, optional
+            Number of passages to return.
+        reranker : EmbeddingReranker, optional
+            When given, the top `candidates` BM25 passages are re-ordered by
+            embedding similarity (falls back to BM25 order on failure).
+        candidates : int, optional
+            Number of BM25 candidates passed to the re-ranker.
+
+        Returns
+        -------
+        dict
+            Query and the top passages, each with its window index and score.
+        """
+        await self.wait_until_loaded()
+
+        if self._passages is None:
+            self._passages = await asyncio.to_thread(PassageIndex, self.text)
+
+        ranked = self._passages.search(query, max(k, candidates) if reranker else k)
+        if not ranked:
+            return {"query": query, "passages": [], "message": "No matching passages found."}
+
+        texts = [self.text[slice(*self._passages.passages[pid])].strip() for pid, _ in ranked]
+        similarities = None
+        if reranker is not None:
+            try:
+                similarities = await reranker.rerank(query, texts)
+            except Exception as e:
+                logger.warning("Passage re-ranking failed, keeping BM25 order: %s", e)
+
+        results = [
+            {"pid": pid, "bm25": round(score, 3), "text": text}
+            for (pid, score), text in zip(ranked, texts)
+        ]
+        if similarities is not None:
+            for result, similarity in zip(results, similarities):
+                result["similarity"] = round(similarity, 4)
+            results.sort(key=lambda r: r["similarity"], reverse=True)
+
+        passages = []
+        for result in results[:k]:
+            offset = self._passages.passages[result.pop("pid")][0]
+            passages.append({
+                "rank": len(passages),
+                "window": self._window_at(offset),
+                **result,
+            })
+
+        return {
+            "query": query,
+            "reranked": similarities is not None,
+            "passages": passages
+        }
@@ -0,0 +1,310 @@
+import argparse
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from markdownify import MarkdownConverter
+
+# Tags that never carry article text (figures are reduced to their captions).
+DROP_TAGS = [
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "form", "button", "input", "select", "textarea", "nav", "aside",
+    "video", "audio", "picture", "img",
+]
+
+# Page-level chrome; kept when nested in an article (e.g. the article title).
+PAGE_CHROME_TAGS = ["header", "footer"]
+
+# ARIA landmarks used for site chrome rather than content.
+DROP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "dialog", "alert"}
+
+UNLIKELY_CANDIDATES = re.compile(
+    r"cookie|consent|gdpr|banner|breadcrumb|nav|menu|footer|sidebar|share|social|"
+    r"related|comment|advert|sponsor|promo|newsletter|subscribe|popup|modal|"
+    r"signup|login|toolbar|masthead",
+    re.I,
+)
+MAYBE_CANDIDATES = re.compile(r"article|body|content|main|post|entry|story|text", re.I)
+
+BLOCK_TAGS = ["p", "pre", "td", "li", "blockquote", "h2", "h3"]
+
+MIN_MAIN_TEXT_CHARS = 250
+
+_converter = MarkdownConverter(heading_style="ATX")
+
+
+def _make_soup(html: str) -> BeautifulSoup:
+    try:
+        return BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser")
+
+
+def _text_length(node) -> int:
+    return len(node.get_text(" ", strip=True))
+
+
+def _link_density(node) -> float:
+    text_length = _text_length(node)
+    if not text_length:
+        return 1.0
+    link_length = sum(_text_length(a) for a in node.find_all("a"))
+    return link_length / text_length
+
+
+def _figures_to_captions(soup: BeautifulSoup, root):
+    """Replace the <figure> elements under `root` by their caption text; figures holding a table are kept."""
+    for figure in root.find_all("figure"):
+        if figure.decomposed or figure.find("table") is not None:
+            continue
+        caption = figure.find("figcaption")
+        if caption is None:
+            figure.decompose()
+        else:
+            figure.replace_with(soup.new_string("\n\n" + caption.get_text(" ", strip=True) + "\n\n"))
+
+
+# ------------------------------------------------------------
+# DOM Pruning
+# ------------------------------------------------------------
+def prune_boilerplate(soup: BeautifulSoup) -> BeautifulSoup:
+    """
+    Remove scripts, styles, navigation, footers, cookie banners and other
+    site chrome from a parsed page in place.
+
+    Parameters
+    ----------
+    soup : BeautifulSoup
+        Parsed HTML document.
+
+    Returns
+    -------
+    BeautifulSoup
+        The same document with boilerplate elements removed.
+    """
+    for tag in soup.find_all(DROP_TAGS):
+        tag.decompose()
+    # captions often carry results; the images themselves do not
+    _figures_to_captions(soup, soup)
+
+    for tag in soup.find_all(PAGE_CHROME_TAGS):
+        if not tag.decomposed and tag.find_parent(["article", "main"]) is None:
+            tag.decompose()
+
+    for tag in soup.find_all(True):
+        if tag.decomposed or tag.name in ("html", "body", "main", "article"):
+            continue
+
+        attrs = tag.attrs or {}
+        if (
+            attrs.get("role") in DROP_ROLES
+            or attrs.get("aria-hidden") == "true"
+            or "hidden" in attrs
+        ):
+            tag.decompose()
+            continue
+
+        match_string = " ".join(attrs.get("class", [])) + " " + attrs.get("id", "")
+        if UNLIKELY_CANDIDATES.search(match_string) and not MAYBE_CANDIDATES.search(match_string):
+            tag.decompose()
+
+    return soup
+
+
+# ------------------------------------------------------------
+# Main Content Selection (readability-style scoring)
+# ------------------------------------------------------------
+def select_main_content(soup: BeautifulSoup):
+    """
+    Pick the element most likely to hold the page's main content.
+
+    Semantic <main>/<article> elements are preferred when they contain enough
+    text. Otherwise every text block (p, pre, td, li, ...) adds a score to its
+    parent and half of it to its grandparent, based on its length and comma
+    count; candidates are then penalised by their link density.
+
+    Parameters
+    ----------
+    soup : BeautifulSoup
+        Pruned HTML document.
+
+    Returns
+    -------
+    Tag
+        The selected element (the <body> when nothing scores).
+    """
+    body = soup.body or soup
+
+    semantic = [tag for tag in body.find_all(["main", "article"]) if _text_length(tag) >= MIN_MAIN_TEXT_CHARS]
+    if semantic:
+        return max(semantic, key=_text_length)
+
+    scores = {}
+    nodes = {}
+    for block in body.find_all(BLOCK_TAGS):
+        text = block.get_text(" ", strip=True)
+        if len(text) < 25:
+            continue
+
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = block.parent
+        grandparent = parent.parent if parent is not None else None
+        for ancestor, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None or ancestor.name is None:
+                continue
+            nodes[id(ancestor)] = ancestor
+            scores[id(ancestor)] = scores.get(id(ancestor), 0.0) + score * weight
+
+    if not scores:
+        return body
+
+    best = max(scores, key=lambda key: scores[key] * (1 - _link_density(nodes[key])))
+    candidate = nodes[best]
+    if _text_length(candidate) < MIN_MAIN_TEXT_CHARS:
+        return body
+    return candidate
+
+
+def html_to_markdown(html: str) -> str:
+    """
+    Convert a full HTML page into Markdown containing only its main content.
+
+    Pruning happens on the parsed tree and the selected element is converted
+    directly, so markdownify never walks navigation, scripts or footers.
+
+    Parameters
+    ----------
+    html : str
+        Raw page HTML.
+
+    Returns
+    -------
+    str
+        Markdown of the main content (uncleaned).
+    """
+    soup = prune_boilerplate(_make_soup(html))
+    return _converter.convert_soup(select_main_content(soup))
+
+
+# ------------------------------------------------------------
+# arXiv HTML (LaTeXML) Papers
+# ------------------------------------------------------------
+# Elements of a LaTeXML article that carry no readable text.
+LATEXML_DROP_TAGS = ["script", "style", "noscript", "button", "nav", "img", "svg", "canvas", "video", "audio"]
+LATEXML_DROP_CLASSES = re.compile(r"ltx_page_(?:header|footer|navbar|logo)|ltx_dates|ltx_ERROR|ltx_role_affiliationtext")
+
+# no Markdown escaping, so LaTeX (x_i, a*b) reaches the reader verbatim
+_paper_converter = MarkdownConverter(
+    heading_style="ATX", escape_underscores=False, escape_asterisks=False, escape_misc=False
+)
+
+
+def arxiv_html_to_markdown(html: str):
+    """
+    Convert the HTML rendering of an arXiv paper (LaTeXML output) into
+    Markdown with ATX headings for its sections.
+
+    Math is kept as its LaTeX source ($...$) instead of the MathML glyph
+    soup, figures are reduced to their captions, and tables are kept.
+
+    Parameters
+    ----------
+    html : str
+        Raw page HTML from arxiv.org/html/<id>.
+
+    Returns
+    -------
+    str or None
+        Markdown of the paper (uncleaned), or None when the page is not a
+        LaTeXML-rendered paper.
+    """
+    soup = _make_soup(html)
+    article = soup.find("article", class_="ltx_document")
+    if article is None:
+        return None
+
+    for math in article.find_all("math"):
+        latex = (math.get("alttext") or math.get_text(" ", strip=True)).strip()
+        display = "block" in (math.get("display") or "")
+        math.replace_with(f"$${latex}$$" if display else f"${latex}$")
+
+    for tag in article.find_all(LATEXML_DROP_TAGS):
+        tag.decompose()
+    for tag in article.find_all(class_=LATEXML_DROP_CLASSES):
+        if not tag.decomposed:
+            tag.decompose()
+
+    _figures_to_captions(soup, article)
+
+    return _paper_converter.convert_soup(article)
+
+
+# ------------------------------------------------------------
+# Benchmark on Saved Pages
+# ------------------------------------------------------------
+def benchmark(paths: list) -> dict:
+    """
+    Compare converting whole pages with markdownify (the previous behaviour)
+    against main-content extraction, on saved HTML pages.
+
+    Parameters
+    ----------
+    paths : list[Path]
+        Saved pages (.html).
+
+    Returns
+    -------
+    dict
+        Per page and in total: conversion time (ms) and Markdown size
+        (characters) of both conversions.
+    """
+    pages = []
+    for path in paths:
+        html = Path(path).read_text(encoding="utf-8", errors="replace")
+        start = time.perf_counter()
+        full = _converter.convert_soup(_make_soup(html))
+        full_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        main_content = html_to_markdown(html)
+        main_ms = (time.perf_counter() - start) * 1000
+        pages.append({
+            "page": Path(path).name,
+            "full_ms": round(full_ms, 1),
+            "main_ms": round(main_ms, 1),
+            "full_chars": len(" ".join(full.split())),
+            "main_chars": len(" ".join(main_content.split())),
+        })
+
+    total = {key: round(sum(page[key] for page in pages), 1) for key in ("full_ms", "main_ms", "full_chars", "main_chars")}
+    return {"pages": pages, "total": total}
+
+
+def main():
+    """
+    Benchmark the extraction on a directory of saved pages, run from the
+    template_environment directory:
+
+        python -m tools.html_extraction saved_pages/ [--show page.html]
+    """
+    parser = argparse.ArgumentParser(description="Benchmark main-content extraction on saved HTML pages.")
+    parser.add_argument("directory", help="Directory of saved pages (*.html, *.htm).")
+    parser.add_argument("--show", help="Print the extracted Markdown of one page, to check what was kept.")
+    args = parser.parse_args()
+
+    if args.show:
+        print(html_to_markdown((Path(args.directory) / args.show).read_text(encoding="utf-8", errors="replace")))
+        return
+
+    paths = sorted(p for p in Path(args.directory).iterdir() if p.suffix.lower() in (".html", ".htm"))
+    results = benchmark(paths)
+    print(f"{'page':40} {'full ms':>9} {'main ms':>9} {'full chars':>11} {'main chars':>11}")
+    for page in results["pages"] + [{"page": "TOTAL", **results["total"]}]:
+        print(
+            f"{page['page'][:40]:40} {page['full_ms']:9.1f} {page['main_ms']:9.1f}"
+            f" {page['full_chars']:11.0f} {page['main_chars']:11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import asyncio
+import bisect
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# Politeness defaults per host. arXiv asks API clients to wait 3 seconds
+# between requests and to use a single connection.
+DEFAULT_HOST_POLICIES = {
+    "export.arxiv.org": {"max_concurrency": 1, "min_interval": 3.0},
+    "arxiv.org": {"max_concurrency": 2, "min_interval": 1.0},
+}
+
+
+class RobotsDisallowedError(Exception):
+    """Raised when robots.txt forbids fetching a URL."""
+
+
+# ------------------------------------------------------------
+# Shared Outbound HTTP Client
+# ------------------------------------------------------------
+class HttpClient:
+    """
+    Single outbound I/O layer for every tool that talks to the network.
+
+    Features:
+    - One pooled httpx.AsyncClient (keep-alive, HTTP/2 when `h2` is installed)
+    - Per-host concurrency limits and minimum spacing between requests
+    - robots.txt checks (including Crawl-delay) cached per host, for page
+      fetches (`robots=True`); API calls are not subject to them
+    - Per-host latency histograms
+
+    Requests made outside httpx (e.g. Playwright page loads) can share the
+    same politeness rules through `slot(url)`.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = "knowledge-research-agent/0.1",
+        timeout: float = 15.0,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 16,
+        default_max_concurrency: int = 4,
+        default_min_interval: float = 0.0,
+        host_policies: dict = None,
+        respect_robots: bool = True,
+    ):
+        """
+        Parameters
+        ----------
+        user_agent : str, optional
+            User-Agent header sent with requests and matched against robots.txt.
+        timeout : float, optional
+            Default request timeout in seconds.
+        max_connections : int, optional
+            Size of the shared connection pool.
+        max_keepalive_connections : int, optional
+            Idle connections kept open for reuse.
+        default_max_concurrency : int, optional
+            Concurrent requests allowed per host without a specific policy.
+        default_min_interval : float, optional
+            Minimum seconds between requests to a host without a policy.
+        host_policies : dict[str, dict], optional
+            Overrides per host: {"max_concurrency": int, "min_interval": float}.
+        respect_robots : bool, optional
+            Whether to consult robots.txt before fetching.
+        """
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.default_policy = {
+            "max_concurrency": default_max_concurrency,
+            "min_interval": default_min_interval,
+        }
+        self.host_policies = {**DEFAULT_HOST_POLICIES, **(host_policies or {})}
+        self.respect_robots = respect_robots
+
+        self._client = None
+        self._semaphores = {}
+        self._spacing_locks = {}
+        self._next_slot = {}
+        self._robots = {}
+        self._robots_locks = {}
+        self._latency = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # created lazily so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": self.user_agent},
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ------------------- POLICIES -------------------
+
+    def policy_for(self, host: str, robots: bool = False) -> dict:
+        policy = dict(self.default_policy)
+        policy.update(self.host_policies.get(host, {}))
+        crawl_delay = self._robots.get(host, (None, None))[1] if robots else None
+        if crawl_delay:
+            policy["min_interval"] = max(policy["min_interval"], crawl_delay)
+        return policy
+
+    async def _wait_turn(self, host: str, interval: float):
+        if interval <= 0:
+            return
+        lock = self._spacing_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next_slot.get(host, 0.0) - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_slot[host] = max(now, self._next_slot.get(host, 0.0)) + interval
+
+    # ------------------- ROBOTS -------------------
+
+    async def _robots_for(self, scheme: str, host: str):
+        lock = self._robots_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            if host not in self._robots:
+                await self._load_robots(scheme, host)
+        return self._robots[host][0]
+
+    async def _load_robots(self, scheme: str, host: str):
+        parser = RobotFileParser()
+        try:
+            response = await self.client.get(f"{scheme}://{host}/robots.txt", timeout=5)
+            if response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except Exception:
+            # unreachable robots.txt is treated as "no restrictions"
+            parser.allow_all = True
+        self._robots[host] = (parser, parser.crawl_delay(self.user_agent))
+
+    async def allowed(self, url: str) -> bool:
+        """Return whether robots.txt allows fetching `url` (always True if disabled)."""
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        if parts.path == "/robots.txt":
+            return True
+        parser = await self._robots_for(parts.scheme or "http", parts.netloc)
+        return parser.can_fetch(self.user_agent, url)
+
+    # ------------------- REQUESTS -------------------
+
+    @asynccontextmanager
+    async def slot(self, url: str, robots: bool = False):
+        """
+        Acquire a politeness slot for `url`: robots check, per-host concurrency
+        limit and request spacing. Latency of the enclosed block is recorded.
+
+        Parameters
+        ----------
+        url : str
+            URL about to be fetched.
+        robots : bool, optional
+            Whether this is a page fetch that robots.txt (and its Crawl-delay)
+            applies to, rather than an API call.
+
+        Raises
+        ------
+        RobotsDisallowedError
+            If robots.txt forbids the URL.
+        """
+        host = urlsplit(url).netloc
+        if robots and not await self.allowed(url):
+            raise RobotsDisallowedError(f"Fetching {url} is disallowed by robots.txt")
+
+        policy = self.policy_for(host, robots)
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(policy["max_concurrency"]))
+
+        async with semaphore:
+            await self._wait_turn(host, policy["min_interval"])
+            start = time.perf_counter()
+            error = False
+            try:
+                yield
+            except Exception:
+                error = True
+                raise
+            finally:
+                self._record(host, (time.perf_counter() - start) * 1000, error)
+
+    async def request(self, method: str, url: str, robots: bool = False, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool, honouring host policies (and robots.txt for page fetches)."""
+        async with self.slot(url, robots):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, robots: bool = False, **kwargs):
+        """Stream a response body; the host slot is held until the body is consumed."""
+        async with self.slot(url, robots):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    # ------------------- METRICS -------------------
+
+    def _record(self, host: str, elapsed_ms: float, error: bool):
+        stats = self._latency.setdefault(
+            host,
+            {"count": 0, "errors": 0, "total_ms": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)},
+        )
+        stats["count"] += 1
+        stats["errors"] += int(error)
+        stats["total_ms"] += elapsed_ms
+        stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def stats(self) -> dict:
+        """
+        Return per-host request counts, error counts, mean latency and the
+        latency histogram (bucket upper bounds in ms -> count).
+        """
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            host: {
+                "count": s["count"],
+                "errors": s["errors"],
+                "mean_ms": s["total_ms"] / s["count"] if s["count"] else 0.0,
+                "histogram": dict(zip(labels, s["buckets"])),
+            }
+            for host, s in self._latency.items()
+        }
+
+
+_shared_client = None
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HttpClient, creating it with defaults if needed."""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = HttpClient()
+    return _shared_client
+
+
+def set_http_client(client: HttpClient):
+    """Install a configured HttpClient as the process-wide instance."""
+    global _shared_client
+    _shared_client = client
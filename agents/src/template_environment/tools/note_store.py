@@ -0,0 +1,583 @@
+import argparse
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from array import array
+from pathlib import Path
+
+from tools.arxiv_index import BOOLEAN_OPERATORS, to_match_query
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# words of context around each match in search snippets
+SNIPPET_TOKENS = 16
+# reciprocal rank fusion constant: larger values flatten the rank weights
+RRF_K = 60
+
+
+def fuse_rankings(*rankings, k: int = RRF_K) -> list:
+    """
+    Merge rankings of entry ids with reciprocal rank fusion, so lexical and
+    semantic rankings combine without calibrating their scores.
+
+    Returns
+    -------
+    list
+        Ids by fused score, best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, entry_id in enumerate(ranking):
+            scores[entry_id] = scores.get(entry_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _normalized(vector) -> array:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return array("f", (x / norm for x in vector) if norm else vector)
+
+
+def new_session_id() -> str:
+    """A new, sortable session id, e.g. "20261018-140233-3fa9c1"."""
+    return time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+
+def render_part(section: str, subsection: str, entries) -> str:
+    """Markdown of a section's own text ("# ...") or of a subsection ("## ...")."""
+    heading = f"## {subsection}" if subsection else f"# {section}"
+    return heading + "\n" + "".join(text + "\n" for text in entries)
+
+
+# ------------------------------------------------------------
+# Persistent Note Store (SQLite FTS5)
+# ------------------------------------------------------------
+class NoteStore:
+    """
+    On-disk store of research notes, namespaced by session, so notes outlive
+    the process and earlier sessions can be resumed, searched or exported.
+
+    Notes are kept as individual entries (one per write) under a section or
+    subsection, with a full-text index over their text. The markdown of each
+    section / subsection is rendered once and cached; a write only re-renders
+    the part it touched, so reading notes costs time proportional to what
+    changed rather than to the size of the notebook.
+
+    Attributes
+    ----------
+    metrics : dict[str, int]
+        Counters for writes, renders served from cache and parts re-rendered.
+    """
+
+    def __init__(self, path: str = "cache/notes.sqlite"):
+        """
+        Initialize the store and open (or create) the on-disk database.
+
+        Parameters
+        ----------
+        path : str, optional
+            Location of the SQLite file. Use ":memory:" to disable persistence.
+        """
+        self.metrics = {"writes": 0, "cached_reads": 0, "rendered_parts": 0}
+
+        # rendered markdown per (session, section, subsection) and per session,
+        # plus the ordered (section, subsection) layout of each session
+        self._parts = {}
+        self._documents = {}
+        self._layouts = {}
+        # unit-length entry embeddings per session: {session: {entry_id: array}}
+        self._vectors = {}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # tools may run in worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS note_sections (
+                rowid INTEGER PRIMARY KEY,
+                session TEXT NOT NULL,
+                section TEXT NOT NULL,
+                subsection TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE (session, section, subsection)
+            );
+            CREATE TABLE IF NOT EXISTS note_entries (
+                rowid INTEGER PRIMARY KEY,
+                session TEXT NOT NULL,
+                section TEXT NOT NULL,
+                subsection TEXT NOT NULL,
+                text TEXT NOT NULL,
+                written_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS note_entries_part ON note_entries (session, section, subsection);
+            CREATE VIRTUAL TABLE IF NOT EXISTS note_entries_fts USING fts5(
+                text, content='note_entries', content_rowid='rowid', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS note_entries_ai AFTER INSERT ON note_entries BEGIN
+                INSERT INTO note_entries_fts (rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS note_entries_ad AFTER DELETE ON note_entries BEGIN
+                INSERT INTO note_entries_fts (note_entries_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+            END;
+            CREATE TABLE IF NOT EXISTS note_embeddings (
+                entry_id INTEGER PRIMARY KEY,
+                session TEXT NOT NULL,
+                vector BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS note_embeddings_session ON note_embeddings (session);
+            CREATE TRIGGER IF NOT EXISTS note_entries_embedding_ad AFTER DELETE ON note_entries BEGIN
+                DELETE FROM note_embeddings WHERE entry_id = old.rowid;
+            END;
+            """
+        )
+        self._db.commit()
+
+    # ------------------- STRUCTURE -------------------
+
+    def layout(self, session: str) -> list:
+        """Ordered (section, subsection) pairs of a session; subsection "" is the section itself."""
+        with self._lock:
+            return list(self._layout(session))
+
+    def _layout(self, session: str) -> list:
+        if session not in self._layouts:
+            self._layouts[session] = [
+                tuple(row)
+                for row in self._db.execute(
+                    "SELECT section, subsection FROM note_sections WHERE session = ?"
+                    " ORDER BY CASE WHEN subsection = '' THEN 0 ELSE 1 END, rowid",
+                    (session,),
+                )
+            ]
+            # subsections follow their section, sections keep creation order
+            order = {section: i for i, (section, subsection) in enumerate(self._layouts[session]) if not subsection}
+            self._layouts[session].sort(key=lambda part: order.get(part[0], len(order)))
+        return self._layouts[session]
+
+    def exists(self, session: str, section: str, subsection: str = "") -> bool:
+        """Return whether a section (or a subsection of it) exists."""
+        with self._lock:
+            return (section, subsection) in self._layout(session)
+
+    def create(self, session: str, section: str, subsection: str = "") -> bool:
+        """
+        Create an empty section, or a subsection of an existing section.
+
+        Returns
+        -------
+        bool
+            False if it already exists.
+        """
+        with self._lock:
+            layout = self._layout(session)
+            if (section, subsection) in layout:
+                return False
+            self._db.execute(
+                "INSERT INTO note_sections (session, section, subsection, created_at) VALUES (?, ?, ?, ?)",
+                (session, section, subsection, time.time()),
+            )
+            self._db.commit()
+
+            if subsection:
+                # after the section's last subsection
+                position = max(i for i, part in enumerate(layout) if part[0] == section) + 1
+                layout.insert(position, (section, subsection))
+            else:
+                layout.append((section, subsection))
+            self._parts[(session, section, subsection)] = render_part(section, subsection, [])
+            self._documents.pop(session, None)
+            return True
+
+    def delete(self, session: str, section: str, subsection: str = ""):
+        """Delete a subsection, or a whole section with its subsections and notes."""
+        with self._lock:
+            layout = self._layout(session)
+            # parts that do not exist are skipped
+            if subsection:
+                parts = [part for part in layout if part == (section, subsection)]
+            else:
+                parts = [part for part in layout if part[0] == section]
+            for part in parts:
+                self._db.execute(
+                    "DELETE FROM note_sections WHERE session = ? AND section = ? AND subsection = ?", (session, *part)
+                )
+                self._delete_entries(session, *part)
+                layout.remove(part)
+                self._parts.pop((session, *part), None)
+            self._db.commit()
+            self._documents.pop(session, None)
+
+    def _delete_entries(self, session: str, section: str, subsection: str):
+        key = (session, section, subsection)
+        if session in self._vectors:
+            for (entry_id,) in self._db.execute(
+                "SELECT rowid FROM note_entries WHERE session = ? AND section = ? AND subsection = ?", key
+            ):
+                self._vectors[session].pop(entry_id, None)
+        self._db.execute("DELETE FROM note_entries WHERE session = ? AND section = ? AND subsection = ?", key)
+
+    # ------------------- WRITE -------------------
+
+    def append(self, session: str, section: str, subsection: str, text: str) -> int:
+        """
+        Add a note entry to an existing section or subsection.
+
+        Returns
+        -------
+        int
+            Id of the new entry.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO note_entries (session, section, subsection, text, written_at) VALUES (?, ?, ?, ?, ?)",
+                (session, section, subsection, text, time.time()),
+            )
+            self._db.commit()
+            self.metrics["writes"] += 1
+
+            key = (session, section, subsection)
+            if key in self._parts:
+                # extend the cached render instead of re-rendering the part
+                self._parts[key] += text + "\n"
+            self._documents.pop(session, None)
+            return cursor.lastrowid
+
+    def replace(self, session: str, section: str, subsection: str, text: str) -> int:
+        """
+        Replace all entries of a section or subsection with a single one.
+
+        Returns
+        -------
+        int
+            Id of the new entry.
+        """
+        with self._lock:
+            self._delete_entries(session, section, subsection)
+            cursor = self._db.execute(
+                "INSERT INTO note_entries (session, section, subsection, text, written_at) VALUES (?, ?, ?, ?, ?)",
+                (session, section, subsection, text, time.time()),
+            )
+            self._db.commit()
+            self.metrics["writes"] += 1
+
+            self._parts[(session, section, subsection)] = render_part(section, subsection, [text])
+            self._documents.pop(session, None)
+            return cursor.lastrowid
+
+    def set_embeddings(self, session: str, vectors: dict):
+        """
+        Store embeddings of note entries (normalized to unit length).
+
+        Parameters
+        ----------
+        session : str
+            Session the entries belong to.
+        vectors : dict[int, list[float]]
+            Embedding per entry id.
+        """
+        normalized = {entry_id: _normalized(vector) for entry_id, vector in vectors.items()}
+        if not normalized:
+            return
+        with self._lock:
+            # entries deleted while their embedding was being computed are skipped
+            live = {
+                row[0]
+                for row in self._db.execute(
+                    f"SELECT rowid FROM note_entries WHERE rowid IN ({','.join('?' * len(normalized))})",
+                    list(normalized),
+                )
+            }
+            self._db.executemany(
+                "INSERT OR REPLACE INTO note_embeddings (entry_id, session, vector) VALUES (?, ?, ?)",
+                [(entry_id, session, vector.tobytes()) for entry_id, vector in normalized.items() if entry_id in live],
+            )
+            self._db.commit()
+            if session in self._vectors:
+                self._vectors[session].update((i, v) for i, v in normalized.items() if i in live)
+
+    # ------------------- READ -------------------
+
+    def get_entries(self, entry_ids: list) -> dict:
+        """Note entries by id: {id: {"id", "section", "subsection", "text", "written_at"}}."""
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT rowid, section, subsection, text, written_at FROM note_entries"
+                f" WHERE rowid IN ({','.join('?' * len(entry_ids))})",
+                entry_ids,
+            ).fetchall()
+        return {
+            rowid: {"id": rowid, "section": sec, "subsection": sub, "text": text, "written_at": written_at}
+            for rowid, sec, sub, text, written_at in rows
+        }
+
+    def unembedded(self, session: str) -> list:
+        """(id, text) of the session's entries that have no embedding yet."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT e.rowid, e.text FROM note_entries e"
+                " LEFT JOIN note_embeddings v ON v.entry_id = e.rowid"
+                " WHERE e.session = ? AND v.entry_id IS NULL ORDER BY e.rowid",
+                (session,),
+            ).fetchall()
+
+    def embeddings(self, session: str) -> dict:
+        """Unit-length embeddings of the session's entries, {entry_id: array('f')}."""
+        with self._lock:
+            if session not in self._vectors:
+                vectors = {}
+                for entry_id, blob in self._db.execute(
+                    "SELECT entry_id, vector FROM note_embeddings WHERE session = ?", (session,)
+                ):
+                    vectors[entry_id] = array("f")
+                    vectors[entry_id].frombytes(blob)
+                self._vectors[session] = vectors
+            return self._vectors[session]
+
+    def rank_lexical(self, session: str, query: str, limit: int = 50) -> list:
+        """
+        Ids of the entries matching any query term, best BM25 score first.
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            If the query is not a valid boolean expression.
+        """
+        match = to_match_query(query, any_term=True, partial=True)
+        if match is None:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT e.rowid FROM note_entries_fts JOIN note_entries e ON e.rowid = note_entries_fts.rowid"
+                " WHERE note_entries_fts MATCH ? AND e.session = ?"
+                " ORDER BY bm25(note_entries_fts) LIMIT ?",
+                (match, session, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def rank_semantic(self, session: str, query_vector: list, limit: int = 50) -> list:
+        """Ids of the session's embedded entries, most similar to the query vector first."""
+        query_vector = _normalized(query_vector)
+        scored = [
+            (sum(x * y for x, y in zip(query_vector, vector)), entry_id)
+            for entry_id, vector in list(self.embeddings(session).items())
+        ]
+        scored.sort(reverse=True)
+        return [entry_id for score, entry_id in scored[:limit] if score > 0]
+
+    def entries(self, session: str, section: str = None, subsection: str = None) -> list:
+        """
+        Note entries of a session, optionally of one section or subsection,
+        in layout order.
+
+        Returns
+        -------
+        list[dict]
+            id, section, subsection, text and written_at per entry.
+        """
+        query = "SELECT rowid, section, subsection, text, written_at FROM note_entries WHERE session = ?"
+        params = [session]
+        if section is not None:
+            query += " AND section = ?"
+            params.append(section)
+        if subsection is not None:
+            query += " AND subsection = ?"
+            params.append(subsection)
+
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY rowid", params).fetchall()
+            order = {part: i for i, part in enumerate(self._layout(session))}
+        rows.sort(key=lambda row: order.get((row[1], row[2]), len(order)))
+        return [
+            {"id": rowid, "section": sec, "subsection": sub, "text": text, "written_at": written_at}
+            for rowid, sec, sub, text, written_at in rows
+        ]
+
+    def _part(self, session: str, section: str, subsection: str) -> str:
+        key = (session, section, subsection)
+        if key not in self._parts:
+            entries = self._db.execute(
+                "SELECT text FROM note_entries WHERE session = ? AND section = ? AND subsection = ? ORDER BY rowid",
+                key,
+            )
+            self._parts[key] = render_part(section, subsection, (text for (text,) in entries))
+            self.metrics["rendered_parts"] += 1
+        return self._parts[key]
+
+    def render(self, session: str, section: str = None, subsection: str = "") -> str:
+        """
+        Markdown of a whole session, of one section (with its subsections) or
+        of one subsection, served from the render cache.
+
+        Returns
+        -------
+        str or None
+            None if the section or subsection does not exist.
+        """
+        with self._lock:
+            layout = self._layout(session)
+            if section is None:
+                if session in self._documents:
+                    self.metrics["cached_reads"] += 1
+                else:
+                    self._documents[session] = "".join(self._part(session, *part) for part in layout).strip()
+                return self._documents[session]
+
+            if (section, subsection) not in layout:
+                return None
+            if subsection:
+                return self._part(session, section, subsection)
+            return "".join(self._part(session, *part) for part in layout if part[0] == section)
+
+    def search(self, session: str, query: str, limit: int = 10) -> list:
+        """
+        Full-text search over the note entries of a session.
+
+        All terms are required first; a plain query (no AND / OR) without
+        matches is retried with any term matching.
+
+        Returns
+        -------
+        list[dict]
+            id, section, subsection, snippet (matches in **bold**) and text
+            of the best matching entries.
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            If the query is not a valid boolean expression.
+        """
+        match = to_match_query(query, partial=True)
+        if match is None:
+            return []
+
+        rows = self._search(session, match, limit)
+        explicit = any(op in query.split() for op in BOOLEAN_OPERATORS)
+        if not rows and not explicit:
+            rows = self._search(session, to_match_query(query, any_term=True, partial=True), limit)
+        return [
+            {"id": rowid, "section": section, "subsection": subsection, "snippet": snippet, "text": text}
+            for rowid, section, subsection, snippet, text in rows
+        ]
+
+    def _search(self, session: str, match: str, limit: int) -> list:
+        with self._lock:
+            return self._db.execute(
+                "SELECT e.rowid, e.section, e.subsection,"
+                " snippet(note_entries_fts, 0, '**', '**', '…', ?), e.text"
+                " FROM note_entries_fts JOIN note_entries e ON e.rowid = note_entries_fts.rowid"
+                " WHERE note_entries_fts MATCH ? AND e.session = ?"
+                " ORDER BY bm25(note_entries_fts) LIMIT ?",
+                (SNIPPET_TOKENS, match, session, limit),
+            ).fetchall()
+
+    # ------------------- EXPORT -------------------
+
+    def export(self, session: str) -> dict:
+        """
+        Export a session's notes for the final report.
+
+        Returns
+        -------
+        dict
+            session, exported_at, markdown (the full notebook) and sections:
+            [{"name", "content", "subsections": [{"name", "content"}]}].
+        """
+        sections = {}
+        for entry in self.entries(session):
+            sections.setdefault(entry["section"], {}).setdefault(entry["subsection"], []).append(entry["text"])
+
+        structure = []
+        for section, subsection in self.layout(session):
+            texts = sections.get(section, {}).get(subsection, [])
+            content = "".join(text + "\n" for text in texts)
+            if not subsection:
+                structure.append({"name": section, "content": content, "subsections": []})
+            else:
+                structure[-1]["subsections"].append({"name": subsection, "content": content})
+
+        return {
+            "session": session,
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "markdown": self.render(session),
+            "sections": structure,
+        }
+
+    def sessions(self) -> list:
+        """Sessions with notes, most recently written first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.session, COUNT(DISTINCT s.section),"
+                " (SELECT COUNT(*) FROM note_entries e WHERE e.session = s.session),"
+                " (SELECT MAX(written_at) FROM note_entries e WHERE e.session = s.session)"
+                " FROM note_sections s GROUP BY s.session"
+            ).fetchall()
+        rows.sort(key=lambda row: row[3] or 0, reverse=True)
+        return [
+            {
+                "session": session,
+                "sections": sections,
+                "entries": entries,
+                "last_write": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last)) if last else None,
+            }
+            for session, sections, entries, last in rows
+        ]
+
+    # ------------------- METRICS -------------------
+
+    def stats(self) -> dict:
+        """Return store counters together with the number of stored sessions and entries."""
+        with self._lock:
+            sessions = self._db.execute("SELECT COUNT(DISTINCT session) FROM note_sections").fetchone()[0]
+            entries = self._db.execute("SELECT COUNT(*) FROM note_entries").fetchone()[0]
+        return {**self.metrics, "sessions": sessions, "entries": entries}
+
+
+def main():
+    """
+    Command line entry point, run from the template_environment directory:
+
+        python -m tools.note_store sessions
+        python -m tools.note_store export <session> --format json --out notes.json
+        python -m tools.note_store search <session> "diffusion AND sampling"
+    """
+    from configs.tools_config import note_store_cfg
+
+    parser = argparse.ArgumentParser(description="Inspect and export stored research notes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("sessions", help="List sessions with notes.")
+    export_cmd = commands.add_parser("export", help="Export the notes of a session.")
+    export_cmd.add_argument("session")
+    export_cmd.add_argument("--format", choices=["markdown", "json"], default="markdown")
+    export_cmd.add_argument("--out", help="Output file (default: stdout).")
+    search_cmd = commands.add_parser("search", help="Search the notes of a session.")
+    search_cmd.add_argument("session")
+    search_cmd.add_argument("query")
+
+    args = parser.parse_args()
+    store = NoteStore(**note_store_cfg)
+
+    if args.command == "sessions":
+        print(json.dumps(store.sessions(), indent=2))
+    elif args.command == "export":
+        exported = store.export(args.session)
+        text = exported["markdown"] if args.format == "markdown" else json.dumps(exported, indent=2)
+        if args.out:
+            Path(args.out).write_text(text, encoding="utf-8")
+        else:
+            print(text)
+    elif args.command == "search":
+        for hit in store.search(args.session, args.query):
+            print(f"[{' > '.join(filter(None, [hit['section'], hit['subsection']]))}] {hit['snippet']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,27 @@
+import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+
 from autogen_core.tools import FunctionTool
 
+from tools.note_store import NoteStore, fuse_rankings, new_session_id
+from tools.result_rendering import CHARS_PER_TOKEN, count_tokens, truncate
+from tools.source_registry import CITATION_PATTERN, SourceRegistry
 from tools.tool_tracing_utils import trace_span_info
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# candidates taken from each ranking before fusion
+RETRIEVAL_CANDIDATES = 50
+# a note cut to fit the budget keeps at least this many tokens, or is left out
+MIN_TRUNCATED_TOKENS = 40
+# notes per embedding request when catching up on unembedded notes
+EMBED_BATCH_SIZE = 64
+# after the embedder failed, retrieval is lexical only for this long
+EMBED_RETRY_SECONDS = 300
 
 class NoteTool:
     """
@@ -11,13 +32,40 @@ class NoteTool:
     - Write, edit, delete, and read notes
     - List all sections and subsections
     - Read the entire note as a Markdown string
+    - Full-text search over the notes
+    - Relevance-ranked retrieval of notes within a token budget
+    - Bibliography of the sources cited in the notes ([S12] citation ids)
+    - Export the notes for the final report
+
+    Notes are kept in a NoteStore under this tool's session, so they persist
+    across restarts and a session can be resumed by passing its id. With an
+    embedder, each written note is embedded in the background so retrieval
+    combines lexical (BM25) and semantic ranking.
 
     All functions are async and can be used with an agent.
     """
 
-    def __init__(self):
-        # Structure: {section_name: {"content": str, "subsections": {sub_name: content}}}
-        self.sections = {}
+    def __init__(
+        self, store: NoteStore = None, session: str = None, embedder=None, source_registry: SourceRegistry = None
+    ):
+        """
+        Parameters
+        ----------
+        store : NoteStore, optional
+            Where notes are kept; an in-memory store when omitted.
+        session : str, optional
+            Namespace of this tool's notes; a new session id when omitted.
+        embedder : EmbeddingReranker, optional
+            Embeds notes for semantic retrieval; lexical only when omitted.
+        source_registry : SourceRegistry, optional
+            Sources surfaced by the search tools, which notes cite by id.
+        """
+        self.store = store or NoteStore(":memory:")
+        self.session = session or new_session_id()
+        self.embedder = embedder
+        self._embedding_tasks = set()
+        self._embedder_down_until = 0.0
+        self.sources = source_registry or SourceRegistry(session=self.session)
         self._tools = [
             FunctionTool(self.create_note_section, name="create_note_section", description=self.create_note_section.__doc__),
             FunctionTool(self.create_note_subsection, name="create_note_subsection", description=self.create_note_subsection.__doc__),
@@ -27,6 +75,9 @@ class NoteTool:
             FunctionTool(self.edit_note_section, name="edit_note_section", description=self.edit_note_section.__doc__),
             FunctionTool(self.list_note_sections, name="list_note_sections", description=self.list_note_sections.__doc__),
             FunctionTool(self.delete_note_section, name="delete_note_section", description=self.delete_note_section.__doc__),
+            FunctionTool(self.search_notes, name="search_notes", description=self.search_notes.__doc__),
+            FunctionTool(self.retrieve_notes, name="retrieve_notes", description=self.retrieve_notes.__doc__),
+            FunctionTool(self.get_bibliography, name="get_bibliography", description=self.get_bibliography.__doc__),
         ]
 
     # -----------------------------
@@ -47,9 +98,8 @@ class NoteTool:
         dict
             Success or error message.
         """
-        if section_name in self.sections:
+        if not self.store.create(self.session, section_name):
             return {"error": f"Section '{section_name}' already exists."}
-        self.sections[section_name] = {"content": "", "subsections": {}}
         return {"success": f"Section '{section_name}' created."}
 
     @trace_span_info
@@ -69,11 +119,10 @@ class NoteTool:
         dict
             Success or error message.
         """
-        if parent_section not in self.sections:
+        if not self.store.exists(self.session, parent_section):
             return {"error": f"Parent section '{parent_section}' does not exist."}
-        if subsection_name in self.sections[parent_section]["subsections"]:
+        if not self.store.create(self.session, parent_section, subsection_name):
             return {"error": f"Subsection '{subsection_name}' already exists under '{parent_section}'."}
-        self.sections[parent_section]["subsections"][subsection_name] = ""
         return {"success": f"Subsection '{subsection_name}' created under '{parent_section}'."}
 
     # -----------------------------
@@ -83,7 +132,8 @@ class NoteTool:
     async def write_notes(self, section_name: str, text: str, subsection_name: str = ""):
         """
         Write notes based on current research progress so that it can be easily referenced later.
-        Notes should include key findings from the research, and MUST include their sources (e.g. cited from https://mwi.westpoint.edu/planes/).
+        Notes should include key findings from the research, and MUST cite their sources by the citation id
+        the search and open tools give them (e.g. "... 40% fewer steps [S12]"), not by full URL or title.
 
         Notes:
         - At least one section must exist before writing.
@@ -104,18 +154,18 @@ class NoteTool:
         dict
             Success or error message.
         """
-        if not self.sections:
+        if not self.store.layout(self.session):
             return {"error": "No sections exist. Create a section first."}
 
         if subsection_name:
-            if section_name not in self.sections or subsection_name not in self.sections[section_name]["subsections"]:
+            if not self.store.exists(self.session, section_name, subsection_name):
                 return {"error": f"Subsection '{subsection_name}' under '{section_name}' does not exist."}
-            self.sections[section_name]["subsections"][subsection_name] += text + "\n"
+            self._embed_later(self.store.append(self.session, section_name, subsection_name, text), text)
             return {"success": f"Text added to subsection '{subsection_name}'."}
         else:
-            if section_name not in self.sections:
+            if not self.store.exists(self.session, section_name):
                 return {"error": f"Section '{section_name}' does not exist."}
-            self.sections[section_name]["content"] += text + "\n"
+            self._embed_later(self.store.append(self.session, section_name, "", text), text)
             return {"success": f"Text added to section '{section_name}'."}
 
     # -----------------------------
@@ -141,14 +191,14 @@ class NoteTool:
             Success or error message.
         """
         if subsection_name:
-            if section_name not in self.sections or subsection_name not in self.sections[section_name]["subsections"]:
+            if not self.store.exists(self.session, section_name, subsection_name):
                 return {"error": f"Subsection '{subsection_name}' under '{section_name}' does not exist."}
-            self.sections[section_name]["subsections"][subsection_name] = new_text + "\n"
+            self._embed_later(self.store.replace(self.session, section_name, subsection_name, new_text), new_text)
             return {"success": f"Subsection '{subsection_name}' updated."}
         else:
-            if section_name not in self.sections:
+            if not self.store.exists(self.session, section_name):
                 return {"error": f"Section '{section_name}' does not exist."}
-            self.sections[section_name]["content"] = new_text + "\n"
+            self._embed_later(self.store.replace(self.session, section_name, "", new_text), new_text)
             return {"success": f"Section '{section_name}' updated."}
 
     # -----------------------------
@@ -172,14 +222,14 @@ class NoteTool:
             Success or error message.
         """
         if subsection_name:
-            if section_name not in self.sections or subsection_name not in self.sections[section_name]["subsections"]:
+            if not self.store.exists(self.session, section_name, subsection_name):
                 return {"error": f"Subsection '{subsection_name}' under '{section_name}' does not exist."}
-            del self.sections[section_name]["subsections"][subsection_name]
+            self.store.delete(self.session, section_name, subsection_name)
             return {"success": f"Subsection '{subsection_name}' deleted."}
         else:
-            if section_name not in self.sections:
+            if not self.store.exists(self.session, section_name):
                 return {"error": f"Section '{section_name}' does not exist."}
-            del self.sections[section_name]
+            self.store.delete(self.session, section_name)
             return {"success": f"Section '{section_name}' deleted."}
 
     # -----------------------------
@@ -195,7 +245,12 @@ class NoteTool:
         dict
             {section_name: [list_of_subsection_names]}
         """
-        return {sec: list(data["subsections"].keys()) for sec, data in self.sections.items()}
+        sections = {}
+        for section, subsection in self.store.layout(self.session):
+            subsections = sections.setdefault(section, [])
+            if subsection:
+                subsections.append(subsection)
+        return sections
 
     # -----------------------------
     # READ
@@ -221,18 +276,12 @@ class NoteTool:
         str or dict
             Content of the section/subsection with heading, or an error message.
         """
-        if subsection_name:
-            if section_name not in self.sections or subsection_name not in self.sections[section_name]["subsections"]:
+        content = self.store.render(self.session, section_name, subsection_name)
+        if content is None:
+            if subsection_name:
                 return {"error": f"Subsection '{subsection_name}' under '{section_name}' does not exist."}
-            content = f"## {subsection_name}\n{self.sections[section_name]['subsections'][subsection_name]}"
-            return content
-        else:
-            if section_name not in self.sections:
-                return {"error": f"Section '{section_name}' does not exist."}
-            content = f"# {section_name}\n{self.sections[section_name]['content']}"
-            for sub, sub_content in self.sections[section_name]["subsections"].items():
-                content += f"## {sub}\n{sub_content}"
-            return content
+            return {"error": f"Section '{section_name}' does not exist."}
+        return content
 
     @trace_span_info
     async def read_all_notes(self):
@@ -244,13 +293,203 @@ class NoteTool:
         str
             Full note content as Markdown.
         """
-        markdown = ""
-        for sec, data in self.sections.items():
-            markdown += f"# {sec}\n{data['content']}"
-            for sub, sub_content in data["subsections"].items():
-                markdown += f"## {sub}\n{sub_content}"
-        return markdown.strip()
-    
+        return self.store.render(self.session)
+
+    # -----------------------------
+    # SEARCH
+    # -----------------------------
+    @trace_span_info
+    async def search_notes(self, query: str, max_results: int = 10):
+        """
+        Search the text of your notes and return the matching notes with the
+        section they are in, instead of reading all notes.
+
+        All words are required; if nothing matches, notes with any of the
+        words are returned. Use AND / OR / NOT and "quoted phrases" for more
+        control.
+
+        Parameters
+        ----------
+        query : str
+            Words to look for (e.g. "scaling laws compute").
+        max_results : int, optional
+            Maximum number of notes to return (default 10).
+
+        Returns
+        -------
+        str or dict
+            One line per matching note, "[Section > Subsection] ...snippet...",
+            or an error message.
+        """
+        try:
+            hits = self.store.search(self.session, query, max_results)
+        except sqlite3.OperationalError as e:
+            return {"error": f"Invalid search query '{query}': {e}"}
+        if not hits:
+            return f"No notes match '{query}'."
+        return "\n".join(
+            f"[{' > '.join(filter(None, [hit['section'], hit['subsection']]))}] {hit['snippet']}" for hit in hits
+        )
+
+    # -----------------------------
+    # RETRIEVE
+    # -----------------------------
+    @trace_span_info
+    async def retrieve_notes(self, query: str, k: int = 8, token_budget: int = 1500):
+        """
+        Retrieve the notes most relevant to a question, best first, within a
+        token budget. Use this instead of read_all_notes to recall findings
+        for one part of the user query, including before writing the answer.
+
+        Parameters
+        ----------
+        query : str
+            What you need to recall (e.g. "evaluation benchmarks used for diffusion LMs").
+        k : int, optional
+            Maximum number of notes to return (default 8).
+        token_budget : int, optional
+            Maximum size of the returned text in tokens (default 1500).
+
+        Returns
+        -------
+        str or dict
+            One block per note, "[Section > Subsection] note text", or an
+            error message.
+        """
+        try:
+            rankings = [self.store.rank_lexical(self.session, query, RETRIEVAL_CANDIDATES)]
+        except sqlite3.OperationalError as e:
+            return {"error": f"Invalid query '{query}': {e}"}
+        if self.embedder is not None:
+            rankings.append(await self._rank_semantic(query))
+
+        ranked = fuse_rankings(*rankings)
+        if not ranked:
+            return f"No notes match '{query}'."
+
+        entries = self.store.get_entries(ranked[:k])
+        lines, used = [], 0
+        for entry_id in ranked[:k]:
+            entry = entries.get(entry_id)
+            if entry is None:
+                continue
+            label = " > ".join(filter(None, [entry["section"], entry["subsection"]]))
+            block = f"[{label}] {entry['text']}"
+            cost = count_tokens(block)
+            if used + cost > token_budget:
+                remaining = token_budget - used
+                if remaining >= MIN_TRUNCATED_TOKENS:
+                    lines.append(truncate(block, remaining * CHARS_PER_TOKEN))
+                    used = token_budget
+                break
+            lines.append(block)
+            used += cost
+
+        left_out = min(k, len(ranked)) - len(lines)
+        if left_out > 0:
+            lines.append(f"({left_out} more relevant notes over the token budget; narrow the query or raise token_budget)")
+        return "\n\n".join(lines)
+
+    def _embedder_available(self) -> bool:
+        return self.embedder is not None and time.monotonic() >= self._embedder_down_until
+
+    def _embedder_failed(self, e: Exception, what: str):
+        # back off instead of waiting for the embedder's timeout on every retrieval
+        self._embedder_down_until = time.monotonic() + EMBED_RETRY_SECONDS
+        logger.warning("Embedding %s failed, retrying in %ds: %s", what, EMBED_RETRY_SECONDS, e)
+
+    def _embed_later(self, entry_id: int, text: str):
+        if not self._embedder_available():
+            return
+        task = asyncio.create_task(self._embed([(entry_id, text)]))
+        self._embedding_tasks.add(task)
+        task.add_done_callback(self._embedding_tasks.discard)
+
+    async def _embed(self, entries: list) -> bool:
+        try:
+            vectors = await self.embedder.embed([text for _, text in entries])
+        except Exception as e:
+            # notes stay retrievable lexically; they are embedded once the embedder is back
+            self._embedder_failed(e, f"{len(entries)} notes")
+            return False
+        self.store.set_embeddings(self.session, {entry_id: vector for (entry_id, _), vector in zip(entries, vectors)})
+        return True
+
+    async def _rank_semantic(self, query: str) -> list:
+        if self._embedding_tasks:
+            await asyncio.gather(*self._embedding_tasks)
+        if not self._embedder_available():
+            return []
+        missing = self.store.unembedded(self.session)
+        for start in range(0, len(missing), EMBED_BATCH_SIZE):
+            if not await self._embed(missing[start: start + EMBED_BATCH_SIZE]):
+                return []
+        try:
+            query_vector = (await self.embedder.embed([query]))[0]
+        except Exception as e:
+            self._embedder_failed(e, "the note query")
+            return []
+        return await asyncio.to_thread(self.store.rank_semantic, self.session, query_vector, RETRIEVAL_CANDIDATES)
+
+    # -----------------------------
+    # SOURCES
+    # -----------------------------
+    @trace_span_info
+    async def get_bibliography(self, text: str = ""):
+        """
+        Return the bibliography of the sources cited with [S12]-style ids, one line per source
+        with its title, URL and when it was retrieved. Append it to your final answer.
+
+        Parameters
+        ----------
+        text : str, optional
+            Draft answer whose citations to list; the sources cited in your notes when empty.
+
+        Returns
+        -------
+        str
+            The bibliography, in order of first citation.
+        """
+        bibliography = self.sources.bibliography(text or self.store.render(self.session))
+        return bibliography or "No [S..] citations found."
+
+    # -----------------------------
+    # EXPORT
+    # -----------------------------
+    def export_notes(self, path: str = None, format: str = "markdown"):
+        """
+        Export this session's notes for the final report.
+
+        Parameters
+        ----------
+        path : str, optional
+            File to write the export to.
+        format : str, optional
+            "markdown" for the notebook as one document, "json" for the
+            structured export (sections, subsections and their content).
+
+        Returns
+        -------
+        str or dict
+            The markdown document followed by the bibliography of the sources
+            it cites, or the structured export (with a "sources" list).
+        """
+        exported = self.store.export(self.session)
+        bibliography = self.sources.bibliography(exported["markdown"])
+        if format == "markdown":
+            result = exported["markdown"] + (f"\n\n# Sources\n{bibliography}" if bibliography else "")
+        else:
+            cited = set(CITATION_PATTERN.findall(exported["markdown"]))
+            result = {
+                **exported,
+                "sources": [source for source in self.sources.sources() if str(source["number"]) in cited],
+            }
+        if path:
+            text = result if format == "markdown" else json.dumps(result, indent=2)
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(text, encoding="utf-8")
+        return result
+
     def get_tools(self):
         """Return the list of FunctionTool instances for integration with an agent."""
         return self._tools
@@ -0,0 +1,197 @@
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from tools.url_utils import canonicalize_url
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+# ------------------------------------------------------------
+# Page Content Cache — Compressed, Size-Bounded LRU on SQLite
+# ------------------------------------------------------------
+class PageCache:
+    """
+    On-disk cache of extracted page content keyed by canonical URL.
+
+    Each entry stores the already-converted text (zlib-compressed) together
+    with the ETag / Last-Modified validators returned by the origin, so a
+    later visit can either be served directly (while fresh) or revalidated
+    with a conditional GET instead of re-rendering the page.
+
+    Entries are evicted least-recently-used once the total compressed size
+    exceeds `max_bytes`. Methods compress and touch the database, so async
+    callers run them in a worker thread (`asyncio.to_thread`).
+
+    Attributes
+    ----------
+    max_bytes : int
+        Upper bound on the total size of compressed content.
+    fresh_seconds : float
+        Age below which an entry is served without revalidation.
+    metrics : dict[str, int]
+        Counters for hits, revalidations, misses and evictions.
+    """
+
+    def __init__(
+        self,
+        path: str = "cache/page_cache.sqlite",
+        max_bytes: int = 256 * 1024 * 1024,
+        fresh_seconds: float = 24 * 3600,
+        compression_level: int = 6,
+    ):
+        """
+        Initialize the cache and open (or create) the on-disk store.
+
+        Parameters
+        ----------
+        path : str, optional
+            Location of the SQLite file. Use ":memory:" to disable persistence.
+        max_bytes : int, optional
+            Maximum total size of compressed content kept on disk.
+        fresh_seconds : float, optional
+            How long an entry is trusted before it must be revalidated.
+        compression_level : int, optional
+            zlib compression level (1 = fastest, 9 = smallest).
+        """
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.compression_level = compression_level
+        self.metrics = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # used from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS page_cache ("
+            " url TEXT PRIMARY KEY,"
+            " content BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS page_cache_lru ON page_cache (accessed_at)")
+        self._db.commit()
+
+        self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()[0]
+
+    # ------------------- READ -------------------
+
+    def get(self, url: str):
+        """
+        Look up a page and mark it as recently used.
+
+        Parameters
+        ----------
+        url : str
+            Page URL (canonicalized internally).
+
+        Returns
+        -------
+        dict or None
+            {"url", "content", "etag", "last_modified", "fetched_at", "fresh"}
+            or None when the page is not cached.
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content, etag, last_modified, fetched_at FROM page_cache WHERE url = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.metrics["misses"] += 1
+                return None
+
+            now = time.time()
+            self._db.execute("UPDATE page_cache SET accessed_at = ? WHERE url = ?", (now, key))
+            self._db.commit()
+
+        fresh = now - row[3] <= self.fresh_seconds
+        if fresh:
+            self.metrics["hits"] += 1
+
+        return {
+            "url": key,
+            "content": zlib.decompress(row[0]).decode("utf-8"),
+            "etag": row[1],
+            "last_modified": row[2],
+            "fetched_at": row[3],
+            "fresh": fresh,
+        }
+
+    # ------------------- WRITE -------------------
+
+    def put(self, url: str, content: str, etag: str = None, last_modified: str = None):
+        """
+        Store extracted content for a URL and evict old entries if needed.
+
+        Parameters
+        ----------
+        url : str
+            Page URL (canonicalized internally).
+        content : str
+            Extracted text/markdown of the page.
+        etag : str, optional
+            ETag header returned by the origin.
+        last_modified : str, optional
+            Last-Modified header returned by the origin.
+        """
+        key = canonicalize_url(url)
+        blob = zlib.compress(content.encode("utf-8"), self.compression_level)
+        if len(blob) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM page_cache WHERE url = ?", (key,)).fetchone()
+            if previous:
+                self.total_bytes -= previous[0]
+
+            now = time.time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO page_cache"
+                " (url, content, size, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), etag, last_modified, now, now),
+            )
+            self.total_bytes += len(blob)
+            self._evict()
+            self._db.commit()
+
+    def mark_revalidated(self, url: str):
+        """Reset the freshness clock of an entry after a 304 Not Modified."""
+        self.metrics["revalidated"] += 1
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE page_cache SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, canonicalize_url(url)),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT url, size FROM page_cache ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.total_bytes = 0
+                return
+            self._db.execute("DELETE FROM page_cache WHERE url = ?", (row[0],))
+            self.total_bytes -= row[1]
+            self.metrics["evictions"] += 1
+            logger.debug("Evicted %s from page cache", row[0])
+
+    # ------------------- METRICS -------------------
+
+    def stats(self) -> dict:
+        """Return cache counters together with the current on-disk size."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+        return {**self.metrics, "entries": entries, "total_bytes": self.total_bytes}
@@ -0,0 +1,355 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Version stored for papers fetched without an explicit "vN" in their URL.
+UNVERSIONED = 0
+
+
+# ------------------------------------------------------------
+# Persistent Paper Store — Extracted Papers Keyed by arXiv Id
+# ------------------------------------------------------------
+class PaperStore:
+    """
+    On-disk store of already extracted arXiv papers, keyed by arXiv id and
+    version, so re-opening a paper (in this or any later session) is a local
+    lookup instead of a PDF download and re-parse.
+
+    Each entry keeps the cleaned text and the reader's derived state (window
+    offsets, section boundaries and search index), all zlib-compressed.
+    Entries are evicted least-recently-used once the total compressed size
+    exceeds `max_bytes`.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Upper bound on the total size of stored papers.
+    metrics : dict[str, int]
+        Counters for hits, misses, stores and evictions.
+    """
+
+    def __init__(
+        self,
+        path: str = "cache/paper_store.sqlite",
+        max_bytes: int = 1024 * 1024 * 1024,
+        compression_level: int = 6,
+    ):
+        """
+        Initialize the store and open (or create) the on-disk database.
+
+        Parameters
+        ----------
+        path : str, optional
+            Location of the SQLite file. Use ":memory:" to disable persistence.
+        max_bytes : int, optional
+            Maximum total size of compressed papers kept on disk.
+        compression_level : int, optional
+            zlib compression level (1 = fastest, 9 = smallest).
+        """
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.metrics = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # papers are read and written from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " arxiv_id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " title TEXT,"
+            " text BLOB NOT NULL,"
+            " state BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (arxiv_id, version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS papers_lru ON papers (accessed_at)")
+        # which source (html / pdf) worked for a paper, kept even after eviction
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS paper_formats ("
+            " arxiv_id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " format TEXT NOT NULL,"
+            " PRIMARY KEY (arxiv_id, version))"
+        )
+        self._db.commit()
+
+        self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM papers").fetchone()[0]
+
+    # ------------------- READ -------------------
+
+    def _find(self, arxiv_id: str, version: int = None):
+        if version is None:
+            # no version requested: the newest one we have
+            return self._db.execute(
+                "SELECT arxiv_id, version, title, text, state FROM papers"
+                " WHERE arxiv_id = ? ORDER BY version DESC LIMIT 1",
+                (arxiv_id,),
+            ).fetchone()
+        return self._db.execute(
+            "SELECT arxiv_id, version, title, text, state FROM papers WHERE arxiv_id = ? AND version = ?",
+            (arxiv_id, version),
+        ).fetchone()
+
+    def get(self, arxiv_id: str, version: int = None):
+        """
+        Look up a stored paper and mark it as recently used.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            Version-less arXiv id (e.g. "2506.18096").
+        version : int, optional
+            Exact version; the newest stored version is used when omitted.
+
+        Returns
+        -------
+        dict or None
+            A DocumentReader snapshot plus "arxiv_id", "version" and "title",
+            or None when the paper is not stored.
+        """
+        with self._lock:
+            row = self._find(arxiv_id, version)
+            if row is None:
+                self.metrics["misses"] += 1
+                return None
+
+            self._db.execute(
+                "UPDATE papers SET accessed_at = ? WHERE arxiv_id = ? AND version = ?",
+                (time.time(), row[0], row[1]),
+            )
+            self._db.commit()
+            self.metrics["hits"] += 1
+
+        state = json.loads(zlib.decompress(row[4]))
+        return {
+            **state,
+            "text": zlib.decompress(row[3]).decode("utf-8"),
+            "arxiv_id": row[0],
+            "version": row[1],
+            "title": row[2],
+        }
+
+    def contains(self, arxiv_id: str, version: int = None) -> bool:
+        """Return whether a paper is stored, without touching its recency."""
+        with self._lock:
+            return self._find(arxiv_id, version) is not None
+
+    # ------------------- WRITE -------------------
+
+    def put(self, arxiv_id: str, version: int, snapshot: dict, title: str = None):
+        """
+        Store an extracted paper and evict old entries if needed.
+
+        Parameters
+        ----------
+        arxiv_id : str
+            Version-less arXiv id.
+        version : int or None
+            Paper version; None when the URL did not name one.
+        snapshot : dict
+            DocumentReader.snapshot() of the fully loaded paper.
+        title : str, optional
+            Paper title, kept for listings.
+        """
+        if not snapshot.get("text"):
+            return
+
+        version = UNVERSIONED if version is None else version
+        text_blob = zlib.compress(snapshot["text"].encode("utf-8"), self.compression_level)
+        state = {k: v for k, v in snapshot.items() if k != "text"}
+        state_blob = zlib.compress(json.dumps(state).encode("utf-8"), self.compression_level)
+        size = len(text_blob) + len(state_blob)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT size FROM papers WHERE arxiv_id = ? AND version = ?", (arxiv_id, version)
+            ).fetchone()
+            if previous:
+                self.total_bytes -= previous[0]
+
+            now = time.time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO papers"
+                " (arxiv_id, version, title, text, state, size, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (arxiv_id, version, title, text_blob, state_blob, size, now, now),
+            )
+            self.total_bytes += size
+            self.metrics["stored"] += 1
+            self._evict()
+            self._db.commit()
+
+    def get_format(self, arxiv_id: str, version: int = None):
+        """Return the source format ("html" or "pdf") recorded for a paper, if any."""
+        version = UNVERSIONED if version is None else version
+        with self._lock:
+            row = self._db.execute(
+                "SELECT format FROM paper_formats WHERE arxiv_id = ? AND version = ?", (arxiv_id, version)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_format(self, arxiv_id: str, version: int, source_format: str):
+        """Record which source format a paper was loaded from."""
+        version = UNVERSIONED if version is None else version
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO paper_formats (arxiv_id, version, format) VALUES (?, ?, ?)",
+                (arxiv_id, version, source_format),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT arxiv_id, version, size FROM papers ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.total_bytes = 0
+                return
+            self._db.execute("DELETE FROM papers WHERE arxiv_id = ? AND version = ?", (row[0], row[1]))
+            self.total_bytes -= row[2]
+            self.metrics["evictions"] += 1
+            logger.debug("Evicted %sv%s from paper store", row[0], row[1])
+
+    # ------------------- METRICS -------------------
+
+    def stats(self) -> dict:
+        """Return store counters together with the current on-disk size."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        return {**self.metrics, "entries": entries, "total_bytes": self.total_bytes}
+
+
+# ------------------------------------------------------------
+# Bulk Import (pre-warming)
+# ------------------------------------------------------------
+async def import_papers(
+    store: PaperStore, paper_ids: list = (), pdf_dir: str = None, window_size_chars: int = 3000, api=None
+):
+    """
+    Extract papers into the store ahead of time.
+
+    Titles are resolved with one batched arXiv metadata lookup, and downloaded
+    papers record which source (HTML or PDF) worked, as when opened by the agent.
+
+    Parameters
+    ----------
+    store : PaperStore
+        Destination store.
+    paper_ids : list[str], optional
+        arXiv ids, optionally versioned ("2506.18096", "2506.18096v2"),
+        downloaded from arxiv.org.
+    pdf_dir : str, optional
+        Directory of local PDFs named after their arXiv id ("2506.18096v2.pdf").
+    window_size_chars : int, optional
+        Window size the papers are split with.
+    api : ArxivAPI, optional
+        Metadata client used to look up titles.
+
+    Returns
+    -------
+    dict
+        Number of papers imported, skipped (already stored) and failed.
+    """
+    # imported here: arxiv_tools itself depends on this module
+    from tools.arxiv_feed import normalize_arxiv_id
+    from tools.arxiv_tools import ArxivAPI, ArxivPaperReader
+    from tools.dedup_index import extract_arxiv_id, extract_arxiv_version
+
+    sources = [(f"https://arxiv.org/pdf/{paper_id}", None) for paper_id in paper_ids]
+    if pdf_dir:
+        sources += [(f"https://arxiv.org/pdf/{path.stem}", path) for path in sorted(Path(pdf_dir).glob("*.pdf"))]
+
+    summary = {"imported": 0, "skipped": 0, "failed": 0}
+    pending = []
+    for url, path in sources:
+        arxiv_id, version = extract_arxiv_id(url), extract_arxiv_version(url)
+        if arxiv_id is None:
+            logger.warning("Not an arXiv id: %s", url)
+            summary["failed"] += 1
+        elif await asyncio.to_thread(store.contains, arxiv_id, version):
+            summary["skipped"] += 1
+        else:
+            pending.append((url, path, arxiv_id, version))
+    if not pending:
+        return summary
+
+    api = api or ArxivAPI()
+    # failed batches are logged by lookup; those papers are stored without a title
+    papers = await api.lookup([url for url, *_ in pending])
+
+    reader = ArxivPaperReader(window_size_chars, store=store)
+    for url, path, arxiv_id, version in pending:
+        title = papers.get(normalize_arxiv_id(url), {}).get("title")
+        try:
+            if path is not None:
+                reader.title = title
+                await reader.load_pdf_bytes(await asyncio.to_thread(path.read_bytes), store_key=(arxiv_id, version))
+            else:
+                # HTML rendering first, PDF fallback; the format that worked is recorded
+                await reader.load_paper(url, title=title)
+            # the reader saves the paper to the store once it is fully extracted
+            await reader.wait_until_done()
+        except Exception as e:
+            logger.warning("Failed to import %s: %s", url, e)
+            summary["failed"] += 1
+            continue
+
+        if reader.load_error is not None:
+            logger.warning("Failed to import %s: %s", url, reader.load_error)
+            summary["failed"] += 1
+            continue
+        summary["imported"] += 1
+        logger.info("Imported %s (%d windows)", url, len(reader.windows))
+
+    return summary
+
+
+def main():
+    """
+    Command line entry point, run from the template_environment directory:
+
+        python -m tools.paper_store import 2506.18096 2401.01234v2 --file ids.txt --pdf-dir pdfs/
+        python -m tools.paper_store stats
+    """
+    from configs.tools_config import paper_store_cfg
+
+    parser = argparse.ArgumentParser(description="Manage the local arXiv paper store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = commands.add_parser("import", help="Pre-warm the store with papers.")
+    import_cmd.add_argument("ids", nargs="*", help="arXiv ids, optionally with a version suffix.")
+    import_cmd.add_argument("--file", help="Text file with one arXiv id per line.")
+    import_cmd.add_argument("--pdf-dir", help="Directory of local PDFs named <arxiv id>.pdf.")
+    commands.add_parser("stats", help="Show store size and entry count.")
+
+    args = parser.parse_args()
+    store = PaperStore(**paper_store_cfg)
+
+    if args.command == "import":
+        paper_ids = list(args.ids)
+        if args.file:
+            paper_ids += [line.strip() for line in Path(args.file).read_text().splitlines() if line.strip()]
+        print(json.dumps(asyncio.run(import_papers(store, paper_ids, args.pdf_dir)), indent=2))
+
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
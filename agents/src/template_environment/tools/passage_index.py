@@ -0,0 +1,204 @@
+import math
+import re
+import time
+from collections import Counter
+
+from tools.http_client import HttpClient, get_http_client
+from tools.text_index import tokenize
+from utils.logger import get_logger
+
+logger = get_logger()
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_passages(text: str, max_chars: int = 1200, min_chars: int = 200) -> list:
+    """
+    Split a document into paragraph-level passages.
+
+    Paragraphs shorter than `min_chars` are merged with the following ones
+    and paragraphs longer than `max_chars` are split on sentence boundaries.
+
+    Parameters
+    ----------
+    text : str
+        Full document text.
+    max_chars : int, optional
+        Soft upper bound on passage length.
+    min_chars : int, optional
+        Passages shorter than this are merged with their neighbour.
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        [start, end) character offsets of each passage.
+    """
+    paragraphs = []
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        paragraphs.append((start, match.start()))
+        start = match.end()
+    paragraphs.append((start, len(text)))
+
+    pieces = []
+    for start, end in paragraphs:
+        if end - start <= max_chars:
+            pieces.append((start, end))
+            continue
+        # long paragraph: cut at the last sentence end before max_chars
+        piece_start = start
+        for match in SENTENCE_END.finditer(text, start, end):
+            if match.start() - piece_start > max_chars:
+                pieces.append((piece_start, match.start()))
+                piece_start = match.end()
+        pieces.append((piece_start, end))
+
+    passages = []
+    for start, end in pieces:
+        if not text[start:end].strip():
+            continue
+        if passages and passages[-1][1] - passages[-1][0] < min_chars:
+            passages[-1] = (passages[-1][0], end)
+        else:
+            passages.append((start, end))
+    return passages
+
+
+# ------------------------------------------------------------
+# BM25 over Passages
+# ------------------------------------------------------------
+class PassageIndex:
+    """
+    In-memory BM25 index over the paragraph-level passages of one document.
+
+    Attributes
+    ----------
+    passages : list[tuple[int, int]]
+        Character offsets of each passage.
+    """
+
+    def __init__(self, text: str, k1: float = 1.5, b: float = 0.75, **split_kwargs):
+        """
+        Parameters
+        ----------
+        text : str
+            Full document text.
+        k1, b : float, optional
+            BM25 term-frequency saturation and length normalization.
+        **split_kwargs
+            Passed to `split_passages`.
+        """
+        self.k1 = k1
+        self.b = b
+        self.passages = split_passages(text, **split_kwargs)
+
+        self._postings = {}
+        self._lengths = []
+        for pid, (start, end) in enumerate(self.passages):
+            terms = tokenize(text[start:end])
+            self._lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings.setdefault(term, []).append((pid, tf))
+
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def search(self, query: str, k: int = 5) -> list:
+        """
+        Rank passages against a query.
+
+        Parameters
+        ----------
+        query : str
+            Free-text query.
+        k : int, optional
+            Number of passages to return.
+
+        Returns
+        -------
+        list[tuple[int, float]]
+            (passage id, BM25 score), best first.
+        """
+        n = len(self.passages)
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for pid, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[pid] / self._avg_length)
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+# ------------------------------------------------------------
+# Optional Embedding Re-Ranking
+# ------------------------------------------------------------
+class EmbeddingReranker:
+    """
+    Re-ranks BM25 candidates by cosine similarity of embeddings obtained from
+    an OpenAI-compatible /embeddings endpoint. After a failed request the
+    endpoint is left alone for `retry_seconds`, so an unreachable embedder
+    does not cost a timeout on every search.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        model: str,
+        http_client: HttpClient = None,
+        timeout: float = 30.0,
+        retry_seconds: float = 300.0,
+    ):
+        """
+        Parameters
+        ----------
+        endpoint : str
+            URL of the embeddings endpoint.
+        model : str
+            Embedding model name sent with each request.
+        http_client : HttpClient, optional
+            Outbound HTTP layer; the process-wide client is used by default.
+        timeout : float, optional
+            Request timeout in seconds.
+        retry_seconds : float, optional
+            How long re-ranking is skipped after the endpoint failed.
+        """
+        self.endpoint = endpoint
+        self.model = model
+        self.http = http_client or get_http_client()
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._down_until = 0.0
+
+    async def embed(self, texts: list) -> list:
+        response = await self.http.request(
+            "POST", self.endpoint, json={"model": self.model, "input": texts}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    async def rerank(self, query: str, texts: list):
+        """
+        Return the cosine similarity of each text to the query, in input order,
+        or None when the endpoint failed (now or within `retry_seconds`).
+        """
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            vectors = await self.embed([query] + texts)
+        except Exception as e:
+            self._down_until = time.monotonic() + self.retry_seconds
+            logger.warning("Passage re-ranking failed, retrying in %ds: %s", self.retry_seconds, e)
+            return None
+        query_vector = vectors[0]
+        return [_cosine(query_vector, vector) for vector in vectors[1:]]
+
+
+def _cosine(a: list, b: list) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
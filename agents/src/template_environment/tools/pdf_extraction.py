@@ -0,0 +1,213 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pypdf import PdfReader
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+PAGES_PER_TASK = 4
+PAGE_TIMEOUT_SECONDS = 10.0
+# parsed documents each worker keeps, so its next page range skips the parse
+WORKER_CACHED_DOCUMENTS = 2
+
+_pool = None
+_worker_documents = OrderedDict()
+
+
+class PageTimeoutError(Exception):
+    """Raised inside a worker when a single page takes too long to extract."""
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeoutError()
+
+
+# ------------------------------------------------------------
+# Worker Side (runs in the process pool)
+# ------------------------------------------------------------
+def _open_document(path: str, cached: bool) -> PdfReader:
+    """
+    Parse a PDF from a file. In pool workers the parsed document is kept, so
+    the other page ranges of the same PDF a worker handles reuse it.
+    """
+    if not cached:
+        return PdfReader(path)
+    if path not in _worker_documents:
+        _worker_documents[path] = PdfReader(path)
+        while len(_worker_documents) > WORKER_CACHED_DOCUMENTS:
+            _worker_documents.popitem(last=False)
+    _worker_documents.move_to_end(path)
+    return _worker_documents[path]
+
+
+def _extract_page_range(path: str, start: int, end: int, page_timeout: float, cached: bool = True) -> list:
+    """
+    Extract the text of pages [start, end) of a PDF file.
+
+    Each page is bounded by `page_timeout` seconds (via SIGALRM where the
+    platform supports it); pathological pages yield an empty string instead
+    of stalling the whole document. Tasks only carry the file path, never
+    the PDF bytes; `cached` must be False when called from threads, which
+    would otherwise share one parsed document.
+    """
+    reader = _open_document(path, cached)
+    use_alarm = hasattr(signal, "setitimer") and page_timeout > 0
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_page_timeout)
+
+    texts = []
+    try:
+        for index in range(start, min(end, len(reader.pages))):
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+                texts.append(reader.pages[index].extract_text() or "")
+            except PageTimeoutError:
+                texts.append("")
+            except Exception:
+                texts.append("")
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+    return texts
+
+
+def _count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _write_temp_pdf(data: bytes) -> str:
+    with tempfile.NamedTemporaryFile(prefix="pdf-extraction-", suffix=".pdf", delete=False) as f:
+        f.write(data)
+    return f.name
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+# ------------------------------------------------------------
+# Event-Loop Side
+# ------------------------------------------------------------
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by every PDF extraction in this process."""
+    global _pool
+    if _pool is None:
+        # forking a process that runs an event loop and worker threads can
+        # copy held locks into the child; start workers from a clean process
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+async def iter_pdf_pages(
+    data: bytes,
+    pages_per_task: int = PAGES_PER_TASK,
+    page_timeout: float = PAGE_TIMEOUT_SECONDS,
+):
+    """
+    Extract the pages of a PDF in the shared process pool and yield them in
+    order as soon as each one (and all pages before it) is ready.
+
+    The PDF is written once to a temporary file that the workers read, so
+    tasks do not pickle the whole document and each worker parses it once.
+
+    Parameters
+    ----------
+    data : bytes
+        Raw PDF file content.
+    pages_per_task : int, optional
+        Number of consecutive pages handled by one worker task.
+    page_timeout : float, optional
+        Seconds allowed per page before it is skipped.
+
+    Yields
+    ------
+    tuple[int, str]
+        Page index and its raw extracted text.
+    """
+    loop = asyncio.get_running_loop()
+    path = await asyncio.to_thread(_write_temp_pdf, data)
+    try:
+        num_pages = await asyncio.to_thread(_count_pages, path)
+    except Exception:
+        _remove(path)
+        raise
+
+    try:
+        pool = get_pdf_pool()
+        futures = [
+            loop.run_in_executor(pool, _extract_page_range, path, start, start + pages_per_task, page_timeout)
+            for start in range(0, num_pages, pages_per_task)
+        ]
+    except (BrokenProcessPool, RuntimeError) as e:
+        logger.warning("PDF process pool unavailable (%s); extracting in a thread", e)
+        _reset_pool()
+        futures = [
+            asyncio.ensure_future(
+                asyncio.to_thread(_extract_page_range, path, start, start + pages_per_task, 0, False)
+            )
+            for start in range(0, num_pages, pages_per_task)
+        ]
+
+    try:
+        for task_index, future in enumerate(futures):
+            try:
+                texts = await future
+            except BrokenProcessPool:
+                _reset_pool()
+                start = task_index * pages_per_task
+                texts = await asyncio.to_thread(_extract_page_range, path, start, start + pages_per_task, 0, False)
+
+            for offset, text in enumerate(texts):
+                yield task_index * pages_per_task + offset, text
+    finally:
+        # consumer stopped early: drop the work that has not started yet
+        for future in futures:
+            future.cancel()
+        # the file is removed once no task can still read it
+        done = asyncio.gather(*futures, return_exceptions=True)
+        done.add_done_callback(lambda _: _remove(path))
+
+
+async def extract_pdf_pages(data: bytes, **kwargs) -> list:
+    """Extract all pages of a PDF in parallel and return their texts in order."""
+    return [text async for _, text in iter_pdf_pages(data, **kwargs)]
+
+
+async def extract_pdf_text_async(data: bytes, **kwargs) -> str:
+    """
+    Extract the text of a PDF without blocking the event loop.
+
+    Parameters
+    ----------
+    data : bytes
+        Raw PDF file content.
+
+    Returns
+    -------
+    str
+        Raw text of the whole document, pages separated by blank lines.
+    """
+    return "\n\n".join(await extract_pdf_pages(data, **kwargs))
@@ -0,0 +1,240 @@
+import argparse
+import json
+import sqlite3
+
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Rough size of a token in English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 800
+# truncated columns are never shrunk below this
+MIN_COLUMN_CHARS = 40
+ELLIPSIS = "…"
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a piece of text: exactly with tiktoken (cl100k_base)
+    when it is installed and its encoding can be loaded, otherwise estimated
+    from the character count.
+    """
+    global _encoding, TIKTOKEN_AVAILABLE
+    if TIKTOKEN_AVAILABLE and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # the encoding is downloaded on first use and may be unreachable
+            TIKTOKEN_AVAILABLE = False
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate(text, max_chars: int = None) -> str:
+    """Collapse whitespace and cut text at a word boundary, marking the cut with '…'."""
+    text = " ".join(str(text if text is not None else "").split())
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[: cut if cut > max_chars // 2 else max_chars].rstrip(" ,;:.") + ELLIPSIS
+
+
+def short_authors(authors: list, max_names: int = 2) -> str:
+    """Surnames of the first authors, e.g. "Ho, Jain +1"."""
+    names = [name.split()[-1] for name in authors[:max_names] if name.split()]
+    extra = len(authors) - max_names
+    return ", ".join(names) + (f" +{extra}" if extra > 0 else "")
+
+
+# ------------------------------------------------------------
+# Compact Table Rendering
+# ------------------------------------------------------------
+def render_table(rows: list, columns: list, budget_tokens: int = DEFAULT_TOKEN_BUDGET, header: str = "", hint: str = "") -> str:
+    """
+    Render rows as a compact pipe-separated table that fits a token budget.
+
+    The longest truncatable column is halved until the table fits (down to
+    MIN_COLUMN_CHARS); past that, trailing rows are left out and counted
+    in a footer.
+
+    Parameters
+    ----------
+    rows : list[dict]
+        One dict per row, keyed by column name.
+    columns : list[tuple[str, int or None]]
+        (name, max_chars) per column, in display order; None never truncates.
+    budget_tokens : int, optional
+        Maximum size of the rendered text.
+    header : str, optional
+        First line (e.g. query and page).
+    hint : str, optional
+        Last line (e.g. how to get full details).
+
+    Returns
+    -------
+    str
+        The rendered table.
+    """
+    widths = dict(columns)
+    shown = len(rows)
+
+    while True:
+        lines = [header] if header else []
+        lines.append(" | ".join(name for name, _ in columns))
+        for row in rows[:shown]:
+            lines.append(" | ".join(
+                truncate(row.get(name), widths[name]).replace("|", "/") for name, _ in columns
+            ))
+        if shown < len(rows):
+            lines.append(f"({len(rows) - shown} more results not shown, ids {shown}-{len(rows) - 1})")
+        if hint:
+            lines.append(hint)
+        text = "\n".join(lines)
+
+        if count_tokens(text) <= budget_tokens:
+            return text
+        shrinkable = [name for name, width in widths.items() if width is not None and width > MIN_COLUMN_CHARS]
+        if shrinkable:
+            widest = max(shrinkable, key=widths.get)
+            widths[widest] = max(MIN_COLUMN_CHARS, widths[widest] // 2)
+        elif shown > 1:
+            shown -= 1
+        else:
+            return text
+
+
+def _notes(result: dict) -> str:
+    notes = []
+    if result.get("already_opened"):
+        notes.append("opened")
+    if result.get("stored"):
+        notes.append("stored")
+    if result.get("mentions"):
+        notes.append(f"cited {result['mentions']}x")
+    if result.get("queries"):
+        notes.append("q" + ",".join(map(str, result["queries"])))
+    return " ".join(notes)
+
+
+def render_arxiv_results(results: list, budget_tokens: int = DEFAULT_TOKEN_BUDGET, header: str = "") -> str:
+    """
+    Render arXiv search results (id, title, first authors, month, abstract
+    start) within a token budget; full abstracts stay behind get_abstract.
+    """
+    if not results:
+        return "\n".join(filter(None, [header, "No results."]))
+
+    rows = [
+        {
+            "id": r["id"],
+            "cite": r.get("citation"),
+            "title": r["title"],
+            "authors": short_authors(r.get("authors") or []),
+            "date": (r.get("published") or "")[:7],
+            "abstract": r.get("summary", ""),
+            "notes": _notes(r),
+        }
+        for r in results
+    ]
+    columns = [("id", None), ("title", 120), ("authors", None), ("date", None), ("abstract", 240)]
+    if any(row["cite"] for row in rows):
+        columns.insert(1, ("cite", None))
+    if any(row["notes"] for row in rows):
+        columns.append(("notes", None))
+    return render_table(
+        rows, columns, budget_tokens, header,
+        hint="Abstracts are truncated: get_abstract(id) for the full abstract, open_paper(id) for the text.",
+    )
+
+
+def render_web_results(results: list, budget_tokens: int = DEFAULT_TOKEN_BUDGET, header: str = "") -> str:
+    """Render web search results (id, title, URL, snippet) within a token budget."""
+    if not results:
+        return "\n".join(filter(None, [header, "No results."]))
+
+    rows = [
+        {
+            "id": r["id"],
+            "cite": r.get("citation"),
+            "title": r.get("title"),
+            "url": r.get("url"),
+            "snippet": r.get("snippet"),
+            "notes": _notes(r),
+        }
+        for r in results
+    ]
+    columns = [("id", None), ("title", 100), ("url", None), ("snippet", 200)]
+    if any(row["cite"] for row in rows):
+        columns.insert(1, ("cite", None))
+    if any(row["notes"] for row in rows):
+        columns.append(("notes", None))
+    return render_table(rows, columns, budget_tokens, header)
+
+
+# ------------------------------------------------------------
+# Token Benchmark on Recorded Results
+# ------------------------------------------------------------
+def benchmark(cache_path: str, budget_tokens: int = DEFAULT_TOKEN_BUDGET) -> dict:
+    """
+    Compare the prompt size of recorded search results (the shared search
+    cache) as previously returned (the dict's string form) and as rendered.
+
+    Returns
+    -------
+    dict
+        Per backend: number of result pages and mean tokens before / after.
+    """
+    db = sqlite3.connect(cache_path)
+    rows = db.execute("SELECT key, backend, results FROM search_cache").fetchall()
+    db.close()
+
+    report = {}
+    for key, backend, results_json in rows:
+        results = json.loads(results_json)
+        _, query, page, _ = json.loads(key)
+        before = count_tokens(str({"query": query, "page": page, "results": results}))
+
+        header = f"query: {query} | page {page}"
+        render = render_arxiv_results if backend == "arxiv" else render_web_results
+        after = count_tokens(render(results, budget_tokens, header))
+
+        stats = report.setdefault(backend, {"pages": 0, "tokens_before": 0, "tokens_after": 0})
+        stats["pages"] += 1
+        stats["tokens_before"] += before
+        stats["tokens_after"] += after
+
+    for stats in report.values():
+        stats["tokens_before"] = round(stats["tokens_before"] / stats["pages"])
+        stats["tokens_after"] = round(stats["tokens_after"] / stats["pages"])
+        stats["ratio"] = round(stats["tokens_after"] / stats["tokens_before"], 3) if stats["tokens_before"] else None
+    return report
+
+
+def main():
+    """
+    Token-count benchmark over the recorded results of the search cache, run
+    from the template_environment directory:
+
+        python -m tools.result_rendering --budget 800
+    """
+    from configs.tools_config import search_cache_cfg
+
+    parser = argparse.ArgumentParser(description="Measure the prompt size of rendered search results.")
+    parser.add_argument("--cache", default=search_cache_cfg["path"], help="Search cache SQLite file.")
+    parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Token budget per result page.")
+    args = parser.parse_args()
+
+    report = benchmark(args.cache, args.budget)
+    print(f"token counter: {'tiktoken cl100k_base' if TIKTOKEN_AVAILABLE else f'{CHARS_PER_TOKEN} chars per token'}")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
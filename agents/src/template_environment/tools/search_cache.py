@@ -0,0 +1,287 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from opentelemetry.trace import get_current_span
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Boolean operators are case-sensitive in the arXiv query syntax, so they are
+# kept as-is while every other token is case-folded.
+_QUERY_OPERATORS = {"AND", "OR", "NOT", "ANDNOT"}
+
+
+# ------------------------------------------------------------
+# Query Normalization Helper
+# ------------------------------------------------------------
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so that trivially different spellings of the
+    same query share one cache entry.
+
+    Operations performed:
+    - Unicode NFKC normalization.
+    - Strip punctuation that search backends ignore (e.g. '?', ',', '!').
+    - Case-fold every token except boolean operators (AND, OR, ANDNOT).
+    - Collapse runs of whitespace into a single space.
+
+    Parameters
+    ----------
+    query : str
+        Raw query as issued by the agent.
+
+    Returns
+    -------
+    str
+        Normalized query used as part of the cache key.
+    """
+    query = unicodedata.normalize("NFKC", query or "")
+    query = re.sub(r"[^\w\s:\"'()+\-.*]", " ", query)
+    tokens = [
+        token if token in _QUERY_OPERATORS else token.casefold()
+        for token in query.split()
+    ]
+    return " ".join(tokens).strip(" .")
+
+
+# ------------------------------------------------------------
+# Search Result Cache — Memory + SQLite
+# ------------------------------------------------------------
+class SearchCache:
+    """
+    Shared cache for search results placed in front of the search backends
+    (DuckDuckGo, ArXiv).
+
+    Entries are keyed on (backend, normalized query, page, max_results) and
+    held in a two-level store: an in-process LRU for microsecond lookups and
+    a SQLite file (read and written in worker threads) so that results
+    survive restarts. Empty result lists are never cached, so a transient
+    empty answer is not served for a whole TTL.
+
+    Freshness
+    ---------
+    - age <= ttl                : served directly ("hit").
+    - ttl < age <= ttl + stale  : served immediately while a background
+                                  refresh is scheduled ("stale").
+    - age > ttl + stale         : fetched from the backend ("miss").
+
+    Attributes
+    ----------
+    ttl_seconds : dict[str, float]
+        Per-backend time-to-live; the "default" key applies to others.
+    stale_seconds : float
+        Stale-while-revalidate window after the TTL expires.
+    metrics : dict[str, int]
+        Counters for hits, stale hits, misses, refreshes and errors.
+    """
+
+    def __init__(
+        self,
+        path: str = "cache/search_cache.sqlite",
+        ttl_seconds: dict = None,
+        stale_seconds: float = 24 * 3600,
+        max_memory_entries: int = 2048,
+    ):
+        """
+        Initialize the cache and open (or create) the on-disk store.
+
+        Parameters
+        ----------
+        path : str, optional
+            Location of the SQLite file. Use ":memory:" to disable persistence.
+        ttl_seconds : dict[str, float], optional
+            Per-backend TTLs, e.g. {"duckduckgo": 21600, "arxiv": 86400}.
+        stale_seconds : float, optional
+            How long an expired entry may still be served while refreshing.
+        max_memory_entries : int, optional
+            Upper bound on entries kept in the in-process layer.
+        """
+        self.ttl_seconds = {"default": 6 * 3600}
+        self.ttl_seconds.update(ttl_seconds or {})
+        self.stale_seconds = stale_seconds
+        self.max_memory_entries = max_memory_entries
+
+        self.metrics = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+        self._memory = OrderedDict()
+        self._refreshing = {}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # the database is used from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY,"
+            " backend TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " results TEXT NOT NULL)"
+        )
+        self._db.commit()
+        self.purge_expired()
+
+    # ------------------- KEYS / FRESHNESS -------------------
+
+    @staticmethod
+    def make_key(backend: str, query: str, page: int, max_results: int) -> str:
+        return json.dumps([backend, normalize_query(query), int(page), int(max_results)])
+
+    def ttl_for(self, backend: str) -> float:
+        return self.ttl_seconds.get(backend, self.ttl_seconds["default"])
+
+    # ------------------- STORAGE -------------------
+
+    async def _load(self, key: str):
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        entry = await asyncio.to_thread(self._read, key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _read(self, key: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT stored_at, results FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            # least recently used first
+            self._memory.popitem(last=False)
+
+    async def _store(self, key: str, backend: str, results: list) -> tuple:
+        entry = (time.time(), results)
+        if not results:
+            return entry
+        self._remember(key, entry)
+        await asyncio.to_thread(self._write, key, backend, entry)
+        return entry
+
+    def _write(self, key: str, backend: str, entry: tuple):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, backend, stored_at, results) VALUES (?, ?, ?, ?)",
+                (key, backend, entry[0], json.dumps(entry[1])),
+            )
+            self._db.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Delete on-disk entries that are past their TTL and stale window.
+
+        Returns
+        -------
+        int
+            Number of rows removed.
+        """
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for backend, in self._db.execute("SELECT DISTINCT backend FROM search_cache").fetchall():
+                cutoff = now - self.ttl_for(backend) - self.stale_seconds
+                removed += self._db.execute(
+                    "DELETE FROM search_cache WHERE backend = ? AND stored_at < ?", (backend, cutoff)
+                ).rowcount
+            self._db.commit()
+        return removed
+
+    # ------------------- LOOKUP -------------------
+
+    async def get_or_fetch(self, backend: str, query: str, page: int, max_results: int, fetch):
+        """
+        Return cached results for a search, calling the backend only when needed.
+
+        Parameters
+        ----------
+        backend : str
+            Name of the search backend (e.g. "duckduckgo", "arxiv").
+        query : str
+            Raw search query.
+        page : int
+            Result page.
+        max_results : int
+            Page size requested from the backend.
+        fetch : Callable[[], Awaitable[list[dict]]]
+            Coroutine factory that performs the real search.
+
+        Returns
+        -------
+        list[dict]
+            Search results (a fresh copy, safe for the caller to mutate).
+        """
+        key = self.make_key(backend, query, page, max_results)
+        entry = await self._load(key)
+        ttl = self.ttl_for(backend)
+
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age <= ttl:
+                status = "hit"
+                self.metrics["hits"] += 1
+            elif age <= ttl + self.stale_seconds:
+                status = "stale"
+                self.metrics["stale_hits"] += 1
+                self._schedule_refresh(key, backend, fetch)
+            else:
+                entry = None
+
+        if entry is None:
+            status = "miss"
+            self.metrics["misses"] += 1
+            results = await fetch()
+            entry = await self._store(key, backend, results)
+
+        get_current_span().set_attribute("search_cache.status", status)
+        return [dict(r) for r in entry[1]]
+
+    def _schedule_refresh(self, key: str, backend: str, fetch):
+        if key in self._refreshing:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh(key, backend, fetch))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, backend: str, fetch):
+        try:
+            results = await fetch()
+            await self._store(key, backend, results)
+            self.metrics["refreshes"] += 1
+        except Exception as e:
+            # keep serving the stale entry; the next lookup will retry
+            self.metrics["errors"] += 1
+            logger.warning("Background refresh failed for %s: %s", key, e)
+
+    # ------------------- METRICS -------------------
+
+    def stats(self) -> dict:
+        """
+        Return cache counters and the overall hit rate.
+
+        Returns
+        -------
+        dict
+            Metrics counters plus "hit_rate" and "memory_entries".
+        """
+        served = self.metrics["hits"] + self.metrics["stale_hits"]
+        total = served + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "hit_rate": served / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
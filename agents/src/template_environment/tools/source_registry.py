@@ -0,0 +1,267 @@
+import argparse
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from tools.dedup_index import document_key, extract_arxiv_id
+from tools.note_store import new_session_id
+from tools.url_utils import canonicalize_url
+
+CITATION_PATTERN = re.compile(r"\[S(\d+)\]")
+
+
+def canonical_source_url(url: str) -> str:
+    """Canonical URL of a source: the abs page for arXiv papers, the canonical URL otherwise."""
+    arxiv_id = extract_arxiv_id(url)
+    return f"https://arxiv.org/abs/{arxiv_id}" if arxiv_id else canonicalize_url(url)
+
+
+def content_hash(text: str) -> str:
+    """Short SHA-256 digest of extracted text, to tell whether a source changed between reads."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _time(timestamp: float):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) if timestamp else None
+
+
+# ------------------------------------------------------------
+# Session Source Registry
+# ------------------------------------------------------------
+class SourceRegistry:
+    """
+    Record of every source the search and open tools surfaced in a session,
+    each with a short citation id ("S12") that notes and answers use instead
+    of repeating full URLs and titles.
+
+    A source is identified like in the DedupIndex (arXiv id or canonical
+    URL), so abs / pdf / html links of a paper share one citation id. Opened
+    sources also record when and through which tool they were read and a
+    hash of the extracted text. The bibliography of a report is generated
+    from the ids it cites.
+
+    Persisted per session (next to the notes) so that resumed notes keep
+    their citations.
+    """
+
+    def __init__(self, path: str = ":memory:", session: str = None):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Location of the SQLite file. Use ":memory:" to disable persistence.
+        session : str, optional
+            Session the citation ids belong to; a new session when omitted.
+        """
+        self.session = session or new_session_id()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # tools may run in worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                session TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT,
+                found_via TEXT,
+                first_seen REAL NOT NULL,
+                opened_via TEXT,
+                retrieved_at REAL,
+                content_hash TEXT,
+                PRIMARY KEY (session, number),
+                UNIQUE (session, key)
+            );
+            """
+        )
+        self._db.commit()
+
+        # {key: record}, loaded once; records are written through to the database
+        self._sources = {}
+        columns = "number, key, url, title, found_via, first_seen, opened_via, retrieved_at, content_hash"
+        for row in self._db.execute(f"SELECT {columns} FROM sources WHERE session = ? ORDER BY number", (self.session,)):
+            record = dict(zip(columns.split(", "), row))
+            self._sources[record["key"]] = record
+
+    # ------------------- WRITE -------------------
+
+    def register(self, url: str, title: str = None, tool: str = None, opened: bool = False, content: str = None) -> str:
+        """
+        Record a source (or update it) and return its citation id.
+
+        Parameters
+        ----------
+        url : str
+            Any URL of the source (arXiv abs/pdf/html links are one source).
+        title : str, optional
+            Title, kept from the first time it is known.
+        tool : str, optional
+            Tool that surfaced or opened the source (e.g. "search_web", "open_paper").
+        opened : bool, optional
+            Whether the source was opened (read), not only listed in results.
+        content : str, optional
+            Extracted text of an opened source, hashed.
+
+        Returns
+        -------
+        str
+            Citation id, e.g. "S12".
+        """
+        with self._lock:
+            record = self._register(url, title, tool, opened, content)
+            self._db.commit()
+        return f"S{record['number']}"
+
+    def register_results(self, results: list, url_field: str = "url", tool: str = None) -> list:
+        """
+        Record the sources of a search result list.
+
+        Returns
+        -------
+        list[dict]
+            The results, each with its "citation" id; results without a URL
+            are returned unchanged, since they name no source.
+        """
+        with self._lock:
+            records = [
+                self._register(r[url_field], r.get("title"), tool) if r.get(url_field) else None for r in results
+            ]
+            self._db.commit()
+        return [
+            {**r, "citation": f"S{record['number']}"} if record else r for r, record in zip(results, records)
+        ]
+
+    def set_content(self, url: str, content: str):
+        """Record the extracted text of a source once it is available (e.g. after background extraction)."""
+        if content:
+            self.register(url, opened=True, content=content)
+
+    def _register(self, url: str, title: str, tool: str, opened: bool = False, content: str = None) -> dict:
+        key = document_key(url)
+        record = self._sources.get(key)
+        now = time.time()
+        changed = record is None or opened or content or (title and not record["title"])
+        if not changed:
+            return record
+        if record is None:
+            record = {
+                "number": len(self._sources) + 1,
+                "key": key,
+                "url": canonical_source_url(url),
+                "title": title,
+                "found_via": tool,
+                "first_seen": now,
+                "opened_via": None,
+                "retrieved_at": None,
+                "content_hash": None,
+            }
+            self._sources[key] = record
+        elif title and not record["title"]:
+            record["title"] = title
+
+        if opened:
+            record["opened_via"] = tool or record["opened_via"]
+            record["retrieved_at"] = now
+        if content:
+            record["content_hash"] = content_hash(content)
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO sources"
+            " (session, number, key, url, title, found_via, first_seen, opened_via, retrieved_at, content_hash)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.session, record["number"], key, record["url"], record["title"], record["found_via"],
+             record["first_seen"], record["opened_via"], record["retrieved_at"], record["content_hash"]),
+        )
+        return record
+
+    # ------------------- READ -------------------
+
+    def get(self, citation: str):
+        """Record of a citation id ("S12", "[S12]" or 12), or None."""
+        match = re.fullmatch(r"\[?S?(\d+)\]?", str(citation).strip(), re.I)
+        if match is None:
+            return None
+        number = int(match.group(1))
+        with self._lock:
+            return next((dict(r) for r in self._sources.values() if r["number"] == number), None)
+
+    def lookup(self, url: str):
+        """Citation id of a URL's source, or None if it was never surfaced."""
+        with self._lock:
+            record = self._sources.get(document_key(url))
+        return f"S{record['number']}" if record else None
+
+    def sources(self, opened_only: bool = False) -> list:
+        """All recorded sources in citation order, optionally only those that were opened."""
+        with self._lock:
+            records = [dict(r) for r in self._sources.values()]
+        return [r for r in records if r["retrieved_at"] or not opened_only]
+
+    def bibliography(self, text: str = None, opened_only: bool = True) -> str:
+        """
+        Render a bibliography in markdown, one line per source:
+        "[S12] Title. URL (retrieved 2026-10-18 14:02 via open_paper)".
+
+        Parameters
+        ----------
+        text : str, optional
+            Report or notes; only the sources it cites are listed, in order
+            of first citation. Without text, all (opened) sources are listed.
+        opened_only : bool, optional
+            Without text, leave out sources that were only listed in search results.
+
+        Returns
+        -------
+        str
+            The bibliography; empty when there is nothing to list.
+        """
+        if text is not None:
+            cited = list(dict.fromkeys(int(number) for number in CITATION_PATTERN.findall(text)))
+            with self._lock:
+                by_number = {r["number"]: dict(r) for r in self._sources.values()}
+            records = [by_number[number] for number in cited if number in by_number]
+        else:
+            records = self.sources(opened_only)
+
+        lines = []
+        for record in records:
+            line = f"[S{record['number']}] " + (f"{record['title']}. " if record["title"] else "") + record["url"]
+            if record["retrieved_at"]:
+                line += f" (retrieved {_time(record['retrieved_at'])} via {record['opened_via'] or 'an open tool'})"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def stats(self) -> dict:
+        """Number of recorded and opened sources."""
+        with self._lock:
+            opened = sum(1 for r in self._sources.values() if r["retrieved_at"])
+            return {"session": self.session, "sources": len(self._sources), "opened": opened}
+
+
+def main():
+    """
+    Print the sources of a session, run from the template_environment directory:
+
+        python -m tools.source_registry <session> [--all]
+    """
+    from configs.tools_config import source_registry_cfg
+
+    parser = argparse.ArgumentParser(description="Show the source registry of a session.")
+    parser.add_argument("session")
+    parser.add_argument("--all", action="store_true", help="Include sources only seen in search results.")
+    args = parser.parse_args()
+
+    registry = SourceRegistry(source_registry_cfg["path"], args.session)
+    print(registry.bibliography(opened_only=not args.all))
+    print(registry.stats())
+
+
+if __name__ == "__main__":
+    main()
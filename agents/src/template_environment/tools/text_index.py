@@ -0,0 +1,281 @@
+import base64
+import bisect
+import re
+import sys
+from array import array
+from functools import lru_cache
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-']\w+)*")
+QUERY_PART_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+# Light suffix stripping applied to alphabetic tokens; rules are tried in
+# order and the first that leaves a long enough stem wins.
+SUFFIX_RULES = [
+    ("ational", "ate"),
+    ("ization", "ize"),
+    ("iveness", "ive"),
+    ("fulness", "ful"),
+    ("ousness", "ous"),
+    ("sses", "ss"),
+    ("ies", "y"),
+    ("ing", ""),
+    ("ed", ""),
+    ("ly", ""),
+    ("s", ""),
+]
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """
+    Case-fold a token and reduce it to a light stem, so that e.g. "Models",
+    "model" and "modeling" index to the same term.
+
+    Parameters
+    ----------
+    token : str
+        A single token as matched by TOKEN_PATTERN.
+
+    Returns
+    -------
+    str
+        Normalized term.
+    """
+    word = token.casefold()
+    if not word.isalpha() or len(word) <= MIN_STEM_LENGTH:
+        return word
+
+    for suffix, replacement in SUFFIX_RULES:
+        if not word.endswith(suffix):
+            continue
+        if suffix == "s" and word.endswith(("ss", "us", "is")):
+            break
+        candidate = word[: -len(suffix)] + replacement
+        if len(candidate) >= MIN_STEM_LENGTH:
+            word = candidate
+        break
+
+    # "running" -> "runn" -> "run"
+    if len(word) > MIN_STEM_LENGTH and word[-1] == word[-2] and word[-1] not in "lsz":
+        word = word[:-1]
+    # "encode" / "encoding" -> "encod"
+    if len(word) > MIN_STEM_LENGTH and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Return the normalized terms of a piece of text (used for queries)."""
+    return [stem(m.group(0)) for m in TOKEN_PATTERN.finditer(text)]
+
+
+def _pack(positions: array) -> str:
+    return base64.b64encode(positions.tobytes()).decode("ascii")
+
+
+def _unpack(packed: str) -> array:
+    positions = array("I")
+    positions.frombytes(base64.b64decode(packed))
+    return positions
+
+
+# ------------------------------------------------------------
+# Positional Inverted Index
+# ------------------------------------------------------------
+class PositionalIndex:
+    """
+    Positional inverted index over one document, built once at load time.
+
+    Every token's character span in the document is kept, so lookups cost
+    O(matches) and snippets are cut straight out of the original text by
+    token offsets instead of re-splitting the document per query.
+
+    Supports single terms, phrases (consecutive terms) and multi-term
+    queries (all terms within a window of tokens).
+
+    Attributes
+    ----------
+    postings : dict[str, array]
+        Term -> token positions, in increasing order.
+    starts, ends : array
+        Character span of each token in the document text.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.starts = array("I")
+        self.ends = array("I")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size of the index."""
+        size = sys.getsizeof(self.postings) + sys.getsizeof(self.starts) + sys.getsizeof(self.ends)
+        for term, positions in self.postings.items():
+            size += sys.getsizeof(term) + sys.getsizeof(positions)
+        return size
+
+    # ------------------- BUILD -------------------
+
+    def add(self, text: str, offset: int = 0):
+        """
+        Index a piece of text appended to the document.
+
+        Parameters
+        ----------
+        text : str
+            Text to index.
+        offset : int, optional
+            Character offset of `text` within the whole document.
+        """
+        postings = self.postings
+        position = len(self.starts)
+        for match in TOKEN_PATTERN.finditer(text):
+            term = stem(match.group(0))
+            if term not in postings:
+                postings[term] = array("I")
+            postings[term].append(position)
+            self.starts.append(offset + match.start())
+            self.ends.append(offset + match.end())
+            position += 1
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable form, used to persist the index alongside the text.
+        Position arrays are stored as base64 of their raw (machine-order) bytes.
+        """
+        return {
+            "postings": {term: _pack(positions) for term, positions in self.postings.items()},
+            "starts": _pack(self.starts),
+            "ends": _pack(self.ends),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PositionalIndex":
+        index = cls()
+        index.postings = {term: _unpack(positions) for term, positions in data["postings"].items()}
+        index.starts = _unpack(data["starts"])
+        index.ends = _unpack(data["ends"])
+        return index
+
+    # ------------------- QUERIES -------------------
+
+    def phrase(self, terms: list) -> list:
+        """Return the start positions where `terms` occur consecutively."""
+        if not terms:
+            return []
+        lists = [self.postings.get(term) for term in terms]
+        if any(not positions for positions in lists):
+            return []
+        if len(terms) == 1:
+            return list(lists[0])
+
+        # drive the scan from the rarest term and probe the other (sorted)
+        # position arrays by binary search; candidates only increase, so each
+        # search starts where the previous one stopped
+        rarest = min(range(len(terms)), key=lambda i: len(lists[i]))
+        others = sorted(
+            ((i - rarest, lists[i]) for i in range(len(terms)) if i != rarest),
+            key=lambda other: len(other[1]),
+        )
+        cursors = [0] * len(others)
+        matches = []
+        for p in lists[rarest]:
+            for k, (shift, positions) in enumerate(others):
+                target = p + shift
+                cursors[k] = bisect.bisect_left(positions, target, cursors[k])
+                if cursors[k] == len(positions):
+                    return matches
+                if positions[cursors[k]] != target:
+                    break
+            else:
+                matches.append(p - rarest)
+        return matches
+
+    def near(self, groups: list, window: int) -> list:
+        """
+        Return (start, end) token spans where every group (a phrase) occurs
+        within `window` tokens of an occurrence of the rarest group.
+        """
+        hits = [[(p, p + len(terms) - 1) for p in self.phrase(terms)] for terms in groups]
+        if any(not h for h in hits):
+            return []
+
+        anchor = min(range(len(hits)), key=lambda i: len(hits[i]))
+        hit_starts = [[h[0] for h in group_hits] for group_hits in hits]
+        spans = []
+        for start, end in hits[anchor]:
+            lo, hi = start, end
+            for i, group_hits in enumerate(hits):
+                if i == anchor:
+                    continue
+                left = bisect.bisect_left(hit_starts[i], start - window)
+                right = bisect.bisect_right(hit_starts[i], start + window)
+                if left == right:
+                    break
+                closest = min(group_hits[left:right], key=lambda h: abs(h[0] - start))
+                lo, hi = min(lo, closest[0]), max(hi, closest[1])
+            else:
+                spans.append((lo, hi))
+        return spans
+
+    def search(self, query: str, window: int = 50) -> tuple:
+        """
+        Find a query in the document.
+
+        Quoted parts are phrases; an unquoted multi-word query is first
+        tried as a phrase and otherwise matched as terms occurring within
+        `window` tokens of each other.
+
+        Parameters
+        ----------
+        query : str
+            e.g. 'diffusion', 'masked diffusion', '"noise schedule" ablation'.
+        window : int, optional
+            Maximum token distance between terms of a multi-term match.
+
+        Returns
+        -------
+        tuple[str, list[tuple[int, int]]]
+            Match mode ("phrase" or "near") and inclusive token spans.
+        """
+        groups = []
+        for quoted, bare in QUERY_PART_PATTERN.findall(query):
+            terms = tokenize(quoted or bare)
+            if not terms:
+                continue
+            if quoted:
+                groups.append(terms)
+            else:
+                groups.extend([term] for term in terms)
+
+        if not groups:
+            return "phrase", []
+
+        if '"' not in query or len(groups) == 1:
+            terms = [term for group in groups for term in group]
+            spans = [(p, p + len(terms) - 1) for p in self.phrase(terms)]
+            if spans or len(groups) == 1:
+                return "phrase", spans
+
+        return "near", self.near(groups, window)
+
+    def snippet(self, text: str, span: tuple, context_tokens: int) -> str:
+        """
+        Cut a snippet around a token span out of the document text, with the
+        matched text highlighted as **match** and whitespace collapsed.
+        """
+        first, last = span
+        lo = max(0, first - context_tokens)
+        hi = min(len(self.starts) - 1, last + context_tokens)
+
+        start, end = self.starts[lo], self.ends[hi]
+        match_start, match_end = self.starts[first], self.ends[last]
+        snippet = (
+            text[start:match_start]
+            + "**" + text[match_start:match_end] + "**"
+            + text[match_end:end]
+        )
+        return " ".join(snippet.split())
@@ -0,0 +1,56 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only carry tracking information and never change
+# the content served for a URL.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+    "ref_src", "igshid", "yclid", "_hsenc", "_hsmi",
+}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a URL to a canonical form so that equivalent links share one key.
+
+    Operations performed:
+    - Lower-case the scheme and host, drop "www." and default ports.
+    - Drop the fragment (#...).
+    - Drop tracking parameters (utm_*, fbclid, gclid, ...) and sort the rest.
+    - Collapse duplicate slashes and strip a trailing slash from the path.
+
+    Parameters
+    ----------
+    url : str
+        URL as provided by a search result or the agent.
+
+    Returns
+    -------
+    str
+        Canonical URL.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url if "://" in url else f"http://{url}")
+
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        # malformed port ("host:99999", "host:abc"): keep the netloc as given
+        port, host = None, parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    path = "/".join(segment for segment in parts.path.split("/") if segment)
+    path = f"/{path}" if path else ""
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
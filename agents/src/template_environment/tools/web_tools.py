@@ -1,12 +1,24 @@
 from autogen_core.tools import FunctionTool
 from ddgs import DDGS
-import requests
-from markdownify import markdownify as html_to_md
 from autogen_core import CancellationToken
 from playwright.async_api import async_playwright
 
+import asyncio
 import re
-
+from typing import List
+from urllib.parse import urlsplit
+
+from tools.async_utils import gather_bounded
+from tools.dedup_index import DedupIndex, document_key, simhash
+from tools.document_reader import DocumentReader, count_windows
+from tools.html_extraction import html_to_markdown
+from tools.http_client import HttpClient, get_http_client
+from tools.page_cache import PageCache
+from tools.passage_index import EmbeddingReranker
+from tools.pdf_extraction import extract_pdf_text_async
+from tools.result_rendering import DEFAULT_TOKEN_BUDGET, render_web_results
+from tools.search_cache import SearchCache
+from tools.source_registry import SourceRegistry
 from tools.tool_tracing_utils import trace_span_info
 
 def clean_text(text: str) -> str:
@@ -18,30 +30,89 @@ def clean_text(text: str) -> str:
     text = "\n".join(line.strip() for line in text.splitlines())
     return text.strip()
 
+# Browser resource types that never contribute text to the extracted page.
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet", "texttrack", "manifest"]
+
+# Analytics / ad hosts whose scripts only slow rendering down.
+TRACKER_HOSTS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "adservice.google.com", "facebook.net",
+    "connect.facebook.net", "hotjar.com", "segment.io", "segment.com",
+    "mixpanel.com", "amplitude.com", "newrelic.com", "nr-data.net",
+    "scorecardresearch.com", "quantserve.com", "taboola.com", "outbrain.com",
+    "criteo.com", "adnxs.com", "clarity.ms", "optimizely.com",
+]
+
+# Content types of a navigation response that is a file to extract as a PDF
+# (PDFs served without a .pdf URL); _fetch_pdf verifies the magic bytes.
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream", "binary/octet-stream")
+
+# Selectors whose presence signals that the main content has rendered.
+READY_SELECTORS = "article, main, [role=main]"
+
+READINESS_PROBE_JS = """(selectors) => [
+    document.body ? document.body.innerText.length : 0,
+    document.querySelector(selectors) !== null,
+]"""
+
 class DuckDuckGoAPI:
     """Backend wrapper around DuckDuckGo search + page fetching."""
 
-    def __init__(self):
+    MAX_PAGE_CHARS = 20000
+
+    def __init__(
+        self,
+        cache: SearchCache = None,
+        page_cache: PageCache = None,
+        max_pdf_bytes: int = 25 * 1024 * 1024,
+        http_client: HttpClient = None,
+        blocked_resource_types: List[str] = None,
+        max_ready_wait_ms: int = 8000,
+        ready_poll_ms: int = 250,
+        ready_stable_polls: int = 2,
+    ):
         self.ddg = DDGS()
+        self.cache = cache
+        self.page_cache = page_cache
+        self.max_pdf_bytes = max_pdf_bytes
+        self.http = http_client or get_http_client()
+        self.blocked_resource_types = set(
+            BLOCKED_RESOURCE_TYPES if blocked_resource_types is None else blocked_resource_types
+        )
+        self.max_ready_wait_ms = max_ready_wait_ms
+        self.ready_poll_ms = ready_poll_ms
+        self.ready_stable_polls = ready_stable_polls
 
     async def search(self, query: str, page: int = 1, max_results: int = 10):
         """
-        DuckDuckGo search
+        DuckDuckGo search (served from the shared search cache when configured)
         """
+        if self.cache is None:
+            return await self._search(query, page, max_results)
 
-        # DuckDuckGo Search API (text search)
-        results = list(
-            self.ddg.text(
-                query=query,
-                region="us-en",
-                safesearch="moderate",
-                timelimit="y",
-                max_results=max_results,
-                page=page,
-                backend="google",
-            )
+        return await self.cache.get_or_fetch(
+            "duckduckgo", query, page, max_results,
+            lambda: self._search(query, page, max_results),
         )
 
+    async def _search(self, query: str, page: int, max_results: int):
+        # DuckDuckGo Search API (text search). The client is blocking, so it runs
+        # in a worker thread with its own session (DDGS is not thread-safe).
+        def text_search():
+            return list(
+                DDGS().text(
+                    query=query,
+                    region="us-en",
+                    safesearch="moderate",
+                    timelimit="y",
+                    max_results=max_results,
+                    page=page,
+                    backend="google",
+                )
+            )
+
+        results = await asyncio.to_thread(text_search)
+
         # Normalize result structure
         normalized = []
         for i, r in enumerate(results):
@@ -55,18 +126,176 @@ class DuckDuckGoAPI:
         return normalized
 
     async def fetch(self, url: str):
+        """
+        Fetch a webpage and return its content as cleaned Markdown, truncated
+        to MAX_PAGE_CHARS. Use `fetch_document` for the full text.
+        """
+        content, _ = await self.fetch_document(url)
+        return content[:self.MAX_PAGE_CHARS]
+
+    async def fetch_document(self, url: str):
+        """
+        Fetch the full cleaned content of a webpage.
+
+        When a page cache is configured, fresh entries are returned without any
+        network access, and stale entries that carry ETag/Last-Modified are
+        revalidated with a conditional GET before falling back to a full render.
+
+        Returns
+        -------
+        tuple[str, bool]
+            The content (or an error message) and whether the fetch succeeded.
+        """
+        if self.page_cache is None:
+            content, validators = await self._fetch(url)
+            return content, validators is not None
+
+        entry = await asyncio.to_thread(self.page_cache.get, url)
+        if entry is not None and (entry["fresh"] or await self._revalidate(url, entry)):
+            return entry["content"], True
+
+        content, validators = await self._fetch(url)
+        if validators is not None:
+            status = validators.pop("status")
+            # error and bot-challenge pages are returned, but never cached
+            if 200 <= status < 300:
+                await asyncio.to_thread(self.page_cache.put, url, content, **validators)
+
+        return content, validators is not None
+
+    async def _revalidate(self, url: str, entry: dict) -> bool:
+        """
+        Ask the origin whether a cached page changed (conditional GET).
+
+        Returns
+        -------
+        bool
+            True if the origin answered 304 Not Modified.
+        """
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            return False
+
+        try:
+            # streamed so a 200 response does not download the body here
+            async with self.http.stream("GET", url, robots=True, headers=headers, timeout=10) as r:
+                status = r.status_code
+        except Exception:
+            return False
+
+        if status == 304:
+            await asyncio.to_thread(self.page_cache.mark_revalidated, url)
+            return True
+        return False
+
+    @staticmethod
+    def _is_pdf_url(url: str) -> bool:
+        return url.lower().split("?")[0].split("#")[0].endswith(".pdf")
+
+    async def _fetch_pdf(self, url: str):
+        """
+        Stream a PDF download (aborting once it exceeds `max_pdf_bytes`) and
+        extract its text with the same extractor used for ArXiv papers.
+        """
+        limit_mb = self.max_pdf_bytes / (1024 * 1024)
+
+        data, headers = None, {}
+        try:
+            async with self.http.stream("GET", url, robots=True, timeout=15) as r:
+                r.raise_for_status()
+                headers = r.headers
+                declared = int(r.headers.get("content-length") or 0)
+                if declared <= self.max_pdf_bytes:
+                    chunks, size = [], 0
+                    async for chunk in r.aiter_bytes(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_pdf_bytes:
+                            chunks = None
+                            break
+                        chunks.append(chunk)
+                    data = b"".join(chunks) if chunks is not None else None
+        except Exception as e:
+            return f"Error fetching PDF: {e}", None
+
+        if data is None:
+            return f"Error: PDF exceeds the {limit_mb:.0f} MB size limit; download aborted.", None
+        if not data.lstrip().startswith(b"%PDF-"):
+            return "Error: URL did not return a valid PDF file.", None
+
+        try:
+            text = clean_text(await extract_pdf_text_async(data))
+        except Exception as e:
+            return f"Error extracting PDF text: {e}", None
+
+        return text, {
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "status": r.status_code,
+        }
+
+    async def _route_request(self, route):
+        """Abort requests for resource types and tracker hosts that carry no text."""
+        request = route.request
+        host = urlsplit(request.url).hostname or ""
+        if request.resource_type in self.blocked_resource_types or any(
+            host == tracker or host.endswith("." + tracker) for tracker in TRACKER_HOSTS
+        ):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _wait_until_ready(self, page):
+        """
+        Wait until the rendered page text stops changing instead of sleeping
+        for a fixed time or waiting for networkidle.
+
+        The amount of body text is polled every `ready_poll_ms`. The page is
+        considered ready once it has some text and the length stayed the same
+        for `ready_stable_polls` consecutive polls (one poll suffices when a
+        main-content selector is already present), or after `max_ready_wait_ms`.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_ready_wait_ms / 1000
+        previous, stable = -1, 0
+
+        while loop.time() < deadline:
+            try:
+                length, has_main = await page.evaluate(READINESS_PROBE_JS, READY_SELECTORS)
+            except Exception:
+                # navigation in progress; the context was destroyed
+                length, has_main, stable = -1, False, 0
+
+            if length > 0 and length == previous:
+                stable += 1
+                if stable >= (1 if has_main else self.ready_stable_polls):
+                    return
+            else:
+                stable = 0
+            previous = length
+            await page.wait_for_timeout(self.ready_poll_ms)
+
+    async def _fetch(self, url: str):
         """
         Fetch a webpage using Playwright Async API.
         Handles HTML, PDFs, Cloudflare, and JS-heavy sites.
+
+        PDFs are recognised by their URL or, without probing the URL first,
+        from the navigation itself: a PDF Content-Type or a download instead
+        of a page.
+
+        Returns
+        -------
+        tuple[str, dict or None]
+            The cleaned content (or an error message) and the cache validators
+            ({"etag", "last_modified"}) with the HTTP "status", which are None
+            when the fetch failed.
         """
-        # ---------- PDF detection (URL hint) ----------
-        if url.lower().endswith(".pdf"):
-            try:
-                r = requests.get(url, timeout=10)
-                r.raise_for_status()
-                return "PDF content detected — binary file skipped."
-            except Exception as e:
-                return f"Error fetching PDF: {e}"
+        if self._is_pdf_url(url):
+            return await self._fetch_pdf(url)
 
         # ---------- HTML fetch via Playwright ----------
         try:
@@ -87,30 +316,38 @@ class DuckDuckGoAPI:
                     )
                 )
 
+                # Only the DOM text matters: drop images, fonts, media and trackers
+                await context.route("**/*", self._route_request)
+
                 page = await context.new_page()
 
                 try:
-                    # robust JS loading
-                    await page.goto(
-                        url,
-                        wait_until="domcontentloaded",
-                        timeout=15000
-                    )
-                except Exception:
-                    # retry once with looser settings
-                    try:
-                        await page.goto(url, timeout=15000)
-                    except Exception as e:
-                        await browser.close()
-                        return f"Error fetching page: {e}"
+                    # robust JS loading, within the host's politeness slot
+                    async with self.http.slot(url, robots=True):
+                        try:
+                            response = await page.goto(
+                                url,
+                                wait_until="domcontentloaded",
+                                timeout=15000
+                            )
+                        except Exception:
+                            # retry once with looser settings
+                            response = await page.goto(url, timeout=15000)
+                except Exception as e:
+                    await browser.close()
+                    if "Download is starting" in str(e):
+                        # served as a file rather than a page
+                        return await self._fetch_pdf(url)
+                    return f"Error fetching page: {e}", None
+
+                headers = response.headers if response else {}
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                if content_type in PDF_CONTENT_TYPES:
+                    await browser.close()
+                    return await self._fetch_pdf(url)
 
                 # allow JS to finish rendering
-                await page.wait_for_timeout(2000)
-
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=10000)
-                except Exception:
-                    pass  # Not all sites reach networkidle
+                await self._wait_until_ready(page)
 
                 # Retry extracting HTML a few times if the page is still navigating
                 html = None
@@ -123,29 +360,64 @@ class DuckDuckGoAPI:
 
                 if html is None:
                     await browser.close()
-                    return "Error: page kept navigating; unable to extract content."
+                    return "Error: page kept navigating; unable to extract content.", None
 
-            # Convert HTML → Markdown
-            markdown = html_to_md(html)
+            # Strip boilerplate, then convert the main content → Markdown
+            markdown = await asyncio.to_thread(html_to_markdown, html)
             cleaned = clean_text(markdown)
-            return cleaned[:20000]
+            return cleaned, {
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "status": response.status if response else 0,
+            }
 
         except Exception as e:
-            return f"Error fetching page: {e}"
+            return f"Error fetching page: {e}", None
 
 # ----------------------------------------------------------------------
 # Autogen-Compatible Search Tool Wrapper
 # ----------------------------------------------------------------------
 class WebSearchTool:
-    def __init__(self, search_api):
+    def __init__(
+        self,
+        search_api,
+        window_size_chars: int = 3000,
+        max_concurrency: int = 4,
+        preview_chars: int = 1000,
+        dedup_index: DedupIndex = None,
+        reranker: EmbeddingReranker = None,
+        token_budgets: dict = None,
+        source_registry: SourceRegistry = None,
+    ):
         self.api = search_api
+        # session-level index of opened documents, shared with other tools
+        self.dedup = dedup_index or DedupIndex()
+        # citation ids of every source surfaced this session, shared with other tools
+        self.sources = source_registry or SourceRegistry()
+        self.max_concurrency = max_concurrency
+        self.preview_chars = preview_chars
+        # optional embedding re-ranking for find_webpage_passages
+        self.reranker = reranker
+        # token budget of rendered search results, per tool name
+        self.token_budgets = token_budgets or {}
         self.current_query = None
         self.current_page = 1
         self.current_results = []
+        self.current_url = None
+
+        # Reader for opened webpages
+        self.reader = DocumentReader(window_size_chars)
 
         self.search_tool = FunctionTool(self.search, name="search_web", description=self.search.__doc__)
         self.select_tool = FunctionTool(self.select_webpage, name="open_webpage", description=self.select_webpage.__doc__)
         self.next_page_tool = FunctionTool(self.next_page, name="next_search_page", description=self.next_page.__doc__)
+        self.next_win_tool = FunctionTool(self.next_window, name="next_webpage_window", description=self.next_window.__doc__)
+        self.prev_win_tool = FunctionTool(self.prev_window, name="prev_webpage_window", description=self.prev_window.__doc__)
+        self.go_win_tool = FunctionTool(self.get_window, name="read_webpage_window", description=self.get_window.__doc__)
+        self.keyword_tool = FunctionTool(self.keyword_search, name="search_webpage_keyword", description=self.keyword_search.__doc__)
+        self.passages_tool = FunctionTool(self.find_passages, name="find_webpage_passages", description=self.find_passages.__doc__)
+        self.batch_search_tool = FunctionTool(self.search_batch, name="search_web_batch", description=self.search_batch.__doc__)
+        self.batch_open_tool = FunctionTool(self.open_webpages, name="open_webpages", description=self.open_webpages.__doc__)
 
     # ------------------- TOOLS -------------------
 
@@ -158,30 +430,240 @@ class WebSearchTool:
         and open the required webpages/results before moving onto the next query. 
 
         e.g. workflow: search -> select_webpage -> next_page -> select_webpage -> search
+
+        Returns a compact table of results (id, citation id, title, URL, snippet).
         """
         self.current_query = query
         self.current_page = page
-        self.current_results = await self.api.search(query, page)
+        self.current_results = self.dedup.collapse_results(await self.api.search(query, page))
 
-        return {
-            "query": query,
-            "page": page,
-            "results": self.current_results
-        }
+        return self._render_results("search_web", f"query: {query} | page {page}")
+
+    def _render_results(self, tool_name: str, header: str) -> str:
+        self.current_results = self.sources.register_results(self.current_results, tool=tool_name)
+        budget = self.token_budgets.get(tool_name, DEFAULT_TOKEN_BUDGET)
+        return render_web_results(self.current_results, budget, header)
+
+    @trace_span_info
+    async def search_batch(self, queries: List[str], page: int = 1):
+        """
+        Run several web searches concurrently and return one merged, deduplicated result list
+        (replaces the current search results).
+
+        Use this instead of calling search_web repeatedly when you already know the queries you need.
+
+        Parameters
+        ----------
+        queries : List[str]
+            Search queries to run (e.g. ["diffusion language models", "masked diffusion LLM benchmarks"]).
+        page : int, optional
+            Result page fetched for every query.
+
+        Returns
+        -------
+        str
+            Compact table of merged results; each result has a stable "id" and notes the queries
+            that found it ("q0,2").
+        """
+        queries = [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+        if not queries:
+            return {"error": "No queries provided"}
+
+        responses = await gather_bounded(
+            [lambda q=q: self.api.search(q, page) for q in queries],
+            self.max_concurrency,
+        )
+
+        merged = {}
+        errors = {}
+        for query_index, (query, results) in enumerate(zip(queries, responses)):
+            if isinstance(results, Exception):
+                errors[query] = str(results)
+                continue
+            for r in results:
+                key = document_key(r["url"] or "")
+                if key in merged:
+                    merged[key]["queries"].append(query_index)
+                    continue
+                merged[key] = {**r, "queries": [query_index]}
+
+        self.current_query = None
+        self.current_page = page
+        self.current_results = self.dedup.collapse_results(list(merged.values()))
+
+        header = "queries: " + "; ".join(f"q{i}={q}" for i, q in enumerate(queries)) + f" | page {page}"
+        if errors:
+            header += "\nfailed: " + "; ".join(f"{q} ({e})" for q, e in errors.items())
+        return self._render_results("search_web_batch", header)
+
+    @trace_span_info
+    async def open_webpages(self, urls: List[str]):
+        """
+        Fetch several webpages concurrently and return a short preview of each.
+
+        Pages are cached, so opening one of them afterwards with open_webpage is immediate.
+
+        Parameters
+        ----------
+        urls : List[str]
+            URLs to fetch.
+
+        Returns
+        -------
+        dict
+            One entry per unique URL with its citation id, total number of windows and a preview, or an error.
+        """
+        urls = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+        if not urls:
+            return {"error": "No URL provided"}
+
+        responses = await gather_bounded(
+            [lambda u=u: self.api.fetch_document(u) for u in urls],
+            self.max_concurrency,
+        )
+
+        pages = []
+        for i, (url, response) in enumerate(zip(urls, responses)):
+            if isinstance(response, Exception):
+                pages.append({"id": i, "url": url, "error": str(response)})
+                continue
+            content, ok = response
+            if not ok:
+                pages.append({"id": i, "url": url, "error": content})
+                continue
+            pages.append({
+                "id": i,
+                "url": url,
+                "citation": self.sources.register(url, tool="open_webpages", opened=True, content=content),
+                "total_windows": count_windows(content, self.reader.window_size),
+                "preview": content[:self.preview_chars],
+            })
+
+        return {"pages": pages}
 
     @trace_span_info
     async def select_webpage(self, url: str):
-        """Fetch selected webpage content by URL."""
+        """
+        Open a webpage by URL and return its first window of content.
+        Use 'search_webpage_keyword' or the webpage window tools to read the rest of the page.
+        Cite the page in your notes and answer by its "citation" id (e.g. [S12]).
+        """
         if not url:
             return {"error": "No URL provided"}
 
-        content = await self.api.fetch(url)
+        # same document under another URL (e.g. arXiv abs vs pdf): no fetch needed
+        record = self.dedup.find_alias(url)
+        if record is not None:
+            return self._pointer(record, url)
+
+        content, ok = await self.api.fetch_document(url)
+        if not ok:
+            return {"url": url, "error": content}
+
+        # mirrors / syndicated copies of a page that was already read
+        fingerprint = await asyncio.to_thread(simhash, content)
+        record = self.dedup.find_near_duplicate(content, fingerprint)
+        if record is not None and record["key"] != document_key(url):
+            return self._pointer(record, url)
+        self.dedup.register(url, content, source="open_webpage", fingerprint=fingerprint)
+        citation = self.sources.register(url, tool="open_webpage", opened=True, content=content)
+
+        self.current_url = url
+        num_windows = await self.reader.load_text(content)
 
         return {
             "url": url,
-            "content": content
+            "citation": citation,
+            "total_windows": num_windows,
+            "first_window": await self.reader.get_window(0) if num_windows else ""
         }
 
+    def _pointer(self, record: dict, url: str) -> dict:
+        pointer = self.dedup.pointer(record, url)
+        citation = self.sources.lookup(record["url"])
+        if citation:
+            pointer["citation"] = citation
+        return pointer
+
+    @trace_span_info
+    async def keyword_search(self, keyword: str, window_words: int = 128):
+        """
+        Search for a keyword or phrase in the currently opened webpage and return
+        context snippets around each match.
+
+        Matching is case-insensitive and ignores word endings. A multi-word query
+        matches as an exact phrase, or, if the phrase does not occur, wherever all the
+        words appear close together. Wrap parts in double quotes to require them as phrases.
+
+        Parameters
+        ----------
+        keyword : str
+            Keyword, phrase or several words to search for.
+        window_words : int, optional
+            Number of words before and after the match to include in each context snippet.
+
+        Returns
+        -------
+        dict
+            Keyword, match type, total number of matches and the context snippets,
+            each with the window it is in.
+        """
+        if not keyword or not keyword.strip():
+            return {"error": "Empty search query."}
+
+        if not self.reader.windows:
+            return {"error": "No webpage loaded. Use open_webpage first."}
+
+        return await self.reader.keyword_search(keyword, window_words)
+
+    @trace_span_info
+    async def find_passages(self, query: str, k: int = 5):
+        """
+        Find the passages of the currently opened webpage most relevant to a question or topic
+        (e.g. "evaluation setup", "pricing limits"), instead of reading window by window.
+
+        Parameters
+        ----------
+        query : str
+            What you are looking for, in natural language.
+        k : int, optional
+            Number of passages to return.
+
+        Returns
+        -------
+        dict
+            Top passages, best first, each with the window it is in (usable with read_webpage_window).
+        """
+        if not query or not query.strip():
+            return {"error": "Empty search query."}
+
+        if not self.reader.windows:
+            return {"error": "No webpage loaded. Use open_webpage first."}
+
+        return await self.reader.find_passages(query, k, reranker=self.reranker)
+
+    @trace_span_info
+    async def next_window(self):
+        """Move forward one window in the opened webpage."""
+        return await self.reader.next_window()
+
+    @trace_span_info
+    async def prev_window(self):
+        """Move backward one window in the opened webpage."""
+        return await self.reader.prev_window()
+
+    @trace_span_info
+    async def get_window(self, index: int):
+        """
+        Jump to a specific window of the opened webpage.
+
+        Parameters
+        ----------
+        index : int
+            Window index.
+        """
+        return await self.reader.get_window(index)
+
     @trace_span_info
     async def next_page(self):
         """Load the next page of DuckDuckGo search results."""
@@ -189,18 +671,22 @@ class WebSearchTool:
             return {"error": "No active query"}
 
         self.current_page += 1
-        self.current_results = await self.api.search(self.current_query, self.current_page)
+        self.current_results = self.dedup.collapse_results(
+            await self.api.search(self.current_query, self.current_page)
+        )
 
-        return {
-            "query": self.current_query,
-            "page": self.current_page,
-            "results": self.current_results
-        }
+        return self._render_results("next_search_page", f"query: {self.current_query} | page {self.current_page}")
 
     def get_tools(self):
         return [
             self.search_tool,
+            self.batch_search_tool,
             self.select_tool,
+            self.batch_open_tool,
+            self.keyword_tool,
+            self.passages_tool,
+            self.next_win_tool,
+            self.prev_win_tool,
+            self.go_win_tool,
             self.next_page_tool
         ]
-    
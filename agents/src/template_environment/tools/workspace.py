@@ -0,0 +1,200 @@
+from collections import OrderedDict
+
+from tools.document_reader import DocumentReader
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+# ------------------------------------------------------------
+# Multi-Document Reading Workspace
+# ------------------------------------------------------------
+class DocumentWorkspace:
+    """
+    Keeps several opened documents resident at once, each addressed by a
+    document id, so an agent can move between them without re-fetching.
+
+    Resident documents are evicted least-recently-used once their combined
+    size exceeds `max_bytes`. An evicted document keeps its id, metadata and
+    reading position; the next access reloads it with the loader it was
+    opened with (e.g. from the local paper store) and restores the position.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Memory budget for resident documents.
+    current : str or None
+        Id of the most recently opened or accessed document.
+    resident_bytes : int
+        Combined size of the resident documents, updated as they are loaded
+        and evicted.
+    """
+
+    def __init__(self, create_reader, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Parameters
+        ----------
+        create_reader : Callable[[], DocumentReader]
+            Factory for the reader of a newly opened document.
+        max_bytes : int, optional
+            Combined size above which least-recently-used documents are evicted.
+        """
+        self.create_reader = create_reader
+        self.max_bytes = max_bytes
+        self.current = None
+        self.resident_bytes = 0
+        self.metrics = {"opened": 0, "evictions": 0, "reloads": 0}
+
+        self._resident = OrderedDict()
+        self._documents = {}
+        self._sizes = {}
+        # resident documents still being extracted, whose size keeps growing
+        self._loading = set()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def is_resident(self, doc_id: str) -> bool:
+        return doc_id in self._resident
+
+    # ------------------- OPEN / ACCESS -------------------
+
+    async def open(self, doc_id: str, load, **meta) -> DocumentReader:
+        """
+        Load a document into a fresh reader and make it current.
+
+        Parameters
+        ----------
+        doc_id : str
+            Stable id of the document.
+        load : Callable[[DocumentReader], Awaitable[int]]
+            Loads the document into the given reader; kept for reloading
+            after eviction, so it should be cheap to repeat.
+        **meta
+            Extra fields shown by `list()` (e.g. title, url).
+
+        Returns
+        -------
+        DocumentReader
+            The reader holding the document.
+        """
+        reader = self.create_reader()
+        await load(reader)
+
+        self._documents[doc_id] = {"load": load, "meta": meta, "position": 0, "total_windows": None}
+        self._resident[doc_id] = reader
+        self._resident.move_to_end(doc_id)
+        self._track(doc_id, reader)
+        self.current = doc_id
+        self.metrics["opened"] += 1
+
+        self._enforce_budget()
+        return reader
+
+    async def get(self, doc_id: str = None):
+        """
+        Return the reader of a document, reloading it if it was evicted, and
+        make it current.
+
+        Parameters
+        ----------
+        doc_id : str, optional
+            Document id; the current document when omitted.
+
+        Returns
+        -------
+        DocumentReader or None
+            None if the id is unknown (or nothing is open).
+        """
+        doc_id = doc_id or self.current
+        if doc_id not in self._documents:
+            return None
+
+        reader = self._resident.get(doc_id)
+        if reader is None:
+            reader = await self._reload(doc_id)
+        else:
+            self._resident.move_to_end(doc_id)
+
+        self.current = doc_id
+        self._enforce_budget()
+        return reader
+
+    async def _reload(self, doc_id: str) -> DocumentReader:
+        document = self._documents[doc_id]
+        reader = self.create_reader()
+        await document["load"](reader)
+        await reader.wait_until_loaded()
+        reader.position = min(document["position"], max(0, len(reader.windows) - 1))
+
+        self._resident[doc_id] = reader
+        self._track(doc_id, reader)
+        self.metrics["reloads"] += 1
+        logger.debug("Reloaded %s into the workspace", doc_id)
+        return reader
+
+    # ------------------- EVICTION -------------------
+
+    def _track(self, doc_id: str, reader: DocumentReader):
+        size = reader.memory_bytes()
+        self.resident_bytes += size - self._sizes.get(doc_id, 0)
+        self._sizes[doc_id] = size
+        if reader.complete:
+            self._loading.discard(doc_id)
+        else:
+            self._loading.add(doc_id)
+
+    def _enforce_budget(self):
+        # complete documents keep the size measured when they were loaded
+        for doc_id in list(self._loading):
+            self._track(doc_id, self._resident[doc_id])
+
+        for doc_id in list(self._resident):
+            if self.resident_bytes <= self.max_bytes:
+                break
+            reader = self._resident[doc_id]
+            # never drop the document in use, nor one still being extracted
+            if doc_id == self.current or not reader.complete:
+                continue
+
+            document = self._documents[doc_id]
+            document["position"] = reader.position
+            document["total_windows"] = len(reader.windows)
+            del self._resident[doc_id]
+            self.resident_bytes -= self._sizes.pop(doc_id)
+            self.metrics["evictions"] += 1
+            logger.debug("Evicted %s from the workspace", doc_id)
+
+    # ------------------- LISTING -------------------
+
+    def list(self) -> list:
+        """
+        Describe every document opened in this session, most recent last.
+
+        Returns
+        -------
+        list[dict]
+            doc_id, metadata, window count, reading position and whether the
+            document is currently resident in memory.
+        """
+        listing = []
+        for doc_id, document in self._documents.items():
+            reader = self._resident.get(doc_id)
+            listing.append({
+                "doc_id": doc_id,
+                **document["meta"],
+                "total_windows": len(reader.windows) if reader is not None else document["total_windows"],
+                "position": reader.position if reader is not None else document["position"],
+                "resident": reader is not None,
+                "current": doc_id == self.current,
+            })
+        return listing
+
+    def stats(self) -> dict:
+        """Return workspace counters and the current resident size."""
+        return {
+            **self.metrics,
+            "documents": len(self._documents),
+            "resident": len(self._resident),
+            "resident_bytes": self.resident_bytes,
+        }